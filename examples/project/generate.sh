@@ -20,7 +20,7 @@ RUN_DIR="$SCRIPT_DIR/../.."
 OUT_DIR="$SCRIPT_DIR/cloc_tree"
 
 
-"$SRC_DIR"/clocdirtree/main.py --clocdir "$RUN_DIR" --outdir "$OUT_DIR" \
+"$SRC_DIR"/clocdirtree/main.py generate --clocdir "$RUN_DIR" --outdir "$OUT_DIR" \
 							   --exclude "*/venv*" "*/.git*" "*/tmp*" "$SCRIPT_DIR/*"
 
 
@@ -0,0 +1,231 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Benchmark of stages of generating pages on synthetic source tree:
+## walk, exclude filtering, counting, tree building, graph layout and page writing.
+##
+## Results are written to JSON file, so results of different versions can be compared.
+## If cloc is not installed, then fake cloc (see 'fakecloc.py') is used.
+##
+## Example:
+##   python3 -m benchclocdirtree.bench_pipeline --depth 4 --fanout 6 --output bench-new.json --compare bench-old.json
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import sys
+import argparse
+import time
+import json
+import platform
+import tempfile
+import functools
+import logging
+
+from clocdirtree.dirwalk import walk_tree, get_subtree_sizes
+from clocdirtree.excludefilter import ExcludeItemFilter
+from clocdirtree.clocparser import cloc_dirs, cloc_dirs_by_files, get_dirs_files
+from clocdirtree.linecounter import count_files
+from clocdirtree.treebuilder import iterate_tree_pages
+from clocdirtree.graph import generate_graph, generate_pack_graph, render_graph_svg, set_node_html_attribs
+from clocdirtree.pagelayout import PageLayout
+from clocdirtree.gitrepo import get_head_revision
+from clocdirtree.main import generate_page_content
+
+from benchclocdirtree.synthtree import generate_tree, parse_languages, DEFAULT_LANGUAGES
+from benchclocdirtree.fakecloc import install_fake_cloc, has_cloc
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+## patterns used in exclude filtering stage
+EXCLUDE_PATTERNS = ["*/dir1/dir2", "*.md", "*/dir3/*/file0.py"]
+
+
+##
+class StageTimer:
+    """Measures wall and CPU time (including child processes) of stages."""
+
+    def __init__(self):
+        self.stages_dict = {}
+
+    def measure(self, name, function):
+        """Execute function, returns its result. Function result has to be sized (number of processed items)."""
+        start_wall = time.perf_counter()
+        start_cpu = get_cpu_time()
+        result = function()
+        cpu_time = get_cpu_time() - start_cpu
+        wall_time = time.perf_counter() - start_wall
+        self.stages_dict[name] = {"wall": wall_time, "cpu": cpu_time, "items": len(result)}
+        print(f"    {name:<8} wall: {wall_time:8.3f}s cpu: {cpu_time:8.3f}s items: {len(result)}")
+        return result
+
+
+## CPU time of process and its finished children
+def get_cpu_time():
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def run_stages(run_dir, out_dir, args):
+    timer = StageTimer()
+
+    dirs_dict = timer.measure("walk", lambda: walk_tree(run_dir, jobs=args.jobs))
+    dirs_list = list(dirs_dict.keys())
+
+    def exclude_stage():
+        exclude_filter = ExcludeItemFilter([os.path.join(run_dir, item) for item in EXCLUDE_PATTERNS])
+        checked_list = []
+        for dir_path in dirs_list:
+            if exclude_filter.excluded_tree(dir_path, run_dir):
+                continue
+            checked_list.append(dir_path)
+            for file_path, _ in get_dirs_files([dir_path]):
+                exclude_filter.excluded(file_path)
+                checked_list.append(file_path)
+        return checked_list
+
+    timer.measure("exclude", exclude_stage)
+
+    def count_stage():
+        if args.engine == "native":
+            files_counter = functools.partial(count_files, jobs=args.jobs)
+            return list(cloc_dirs_by_files(run_dir, dirs_list, files_counter))
+        size_dict = get_subtree_sizes(dirs_dict)
+        return list(cloc_dirs(dirs_list, jobs=args.jobs, size_dict=size_dict, batch_size=args.batch_files))
+
+    results_list = timer.measure("count", count_stage)
+    pages_list = timer.measure("tree", lambda: list(iterate_tree_pages(run_dir, dirs_list, iter(results_list))))
+
+    page_layout = PageLayout("flat")
+
+    def layout_stage():
+        images_list = []
+        for page_name, graph_dict, _ in pages_list:
+            img_content = None
+            if graph_dict:
+                path_prefix = page_layout.get_page_path(page_name)
+                links_dict = {name: page_layout.get_link(page_name, page_name + "/" + name) for name in graph_dict}
+                if args.layout == "pack":
+                    pack_data = generate_pack_graph(graph_dict, None, path_prefix, links_dict=links_dict)
+                    if pack_data:
+                        img_content = pack_data[0]
+                else:
+                    graph = generate_graph(graph_dict)
+                    graph.setName(path_prefix)
+                    set_node_html_attribs(graph, None, links_dict=links_dict)
+                    img_content = render_graph_svg(graph)
+            images_list.append(img_content)
+        return images_list
+
+    images_list = timer.measure("layout", layout_stage)
+
+    def write_stage():
+        for (page_name, _, cloc_result), img_content in zip(pages_list, images_list):
+            path_prefix = page_layout.get_page_path(page_name)
+            generate_page_content(page_name, path_prefix, cloc_result.to_text(), out_dir, img_content, page_layout)
+        return pages_list
+
+    timer.measure("write", write_stage)
+    return timer.stages_dict
+
+
+## print ratios of times of stages to times of previous results
+def compare_results(results_dict, previous_dict):
+    print("comparison with previous results (current / previous):")
+    previous_stages = previous_dict.get("stages", {})
+    for name, stage_dict in results_dict["stages"].items():
+        previous_stage = previous_stages.get(name)
+        if not previous_stage:
+            continue
+        line = f"    {name:<8}"
+        for key in ("wall", "cpu"):
+            previous_time = previous_stage[key]
+            if previous_time > 0:
+                line += f" {key}: {stage_dict[key] / previous_time:6.2f}x"
+            else:
+                line += f" {key}:     n/a"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark of stages of generating pages")
+    parser.add_argument("--depth", type=int, default=4, help="Depth of synthetic tree")
+    parser.add_argument("--fanout", type=int, default=5, help="Number of subdirectories of each directory")
+    parser.add_argument("--files", type=int, default=5, help="Number of files in each directory")
+    parser.add_argument("--lines", type=int, default=50, help="Average number of lines of file")
+    parser.add_argument("--languages", default=DEFAULT_LANGUAGES, help="Mix of languages with weights")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of random generator")
+    parser.add_argument("--treedir", default=None, help="Use existing source tree instead of synthetic one")
+    parser.add_argument("--engine", choices=["cloc", "native"], default="cloc", help="Counting engine")
+    parser.add_argument("--fakecloc", action="store_true", help="Use fake cloc even if cloc is installed")
+    parser.add_argument("--batch-files", type=int, default=None, help="Batch size of counting by cloc")
+    parser.add_argument("--layout", choices=["pack", "neato"], default="pack", help="Layout of graphs")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of parallel jobs")
+    parser.add_argument("--output", default=None, help="Path of JSON file with results")
+    parser.add_argument("--compare", default=None, help="Path of JSON file with previous results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="clocdirtree-bench-") as temp_dir:
+        fake_cloc = False
+        if args.engine == "cloc" and (args.fakecloc or not has_cloc()):
+            bin_dir = install_fake_cloc(os.path.join(temp_dir, "bin"))
+            os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+            fake_cloc = True
+
+        run_dir = args.treedir
+        tree_dict = None
+        if run_dir is None:
+            run_dir = os.path.join(temp_dir, "tree")
+            languages_dict = parse_languages(args.languages)
+            dirs_num, files_num = generate_tree(
+                run_dir, args.depth, args.fanout, args.files, args.lines, languages_dict, args.seed
+            )
+            tree_dict = {"dirs": dirs_num, "files": files_num}
+            print(f"synthetic tree: {dirs_num} directories, {files_num} files")
+        run_dir = os.path.normpath(run_dir)
+
+        out_dir = os.path.join(temp_dir, "out")
+        os.makedirs(out_dir)
+        stages_dict = run_stages(run_dir, out_dir, args)
+
+    results_dict = {
+        "benchmark": "pipeline",
+        "revision": get_head_revision(SCRIPT_DIR),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "fake_cloc": fake_cloc,
+        "params": vars(args),
+        "tree": tree_dict,
+        "stages": stages_dict,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out_file:
+            json.dump(results_dict, out_file, indent=4)
+        print(f"results written to: {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as in_file:
+            compare_results(results_dict, json.load(in_file))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
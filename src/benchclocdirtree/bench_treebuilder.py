@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Benchmark of building directories tree and iterating its pages on synthetic trees.
+##
+## Compares previous recursive implementation with iterative tree builder.
+## Example: python3 -m benchclocdirtree.bench_treebuilder --paths 100000 1000000
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import sys
+import argparse
+import time
+import tracemalloc
+
+from clocdirtree.treebuilder import build_tree, iterate_tree, iterate_tree_pages
+from clocdirtree.clocresult import ClocResult
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+## previous recursive implementation - reference for comparison
+def split_to_multi_dict_recursive(data_dict, split_string="/"):
+    def add_to_dict(container_dict, key_list, value):
+        if not key_list:
+            return
+
+        front_key = key_list.pop(0)
+        key_data = container_dict.get(front_key)
+        if key_data is None:
+            key_data = [None, {}]
+            container_dict[front_key] = key_data
+
+        if not key_list:
+            # bottom
+            key_data[0] = value
+        else:
+            sub_dict = key_data[1]
+            add_to_dict(sub_dict, key_list, value)
+
+    ret_dict = {}
+    for key, val in data_dict.items():
+        key_split = key.split(split_string)
+        add_to_dict(ret_dict, key_split, val)
+    return ret_dict
+
+
+## previous recursive implementation - reference for comparison
+def iterate_multidict_pages_recursive(multi_dict_data_list, key_prefix_list):
+    cloc_result = multi_dict_data_list[0]
+    multi_dict = multi_dict_data_list[1]
+    base_path_prefix = "/".join(key_prefix_list)
+    graph_dict = {}
+    for key, data_tuple in multi_dict.items():
+        sub_result = data_tuple[0]
+        if sub_result is not None:
+            graph_dict[key] = sub_result.code
+    yield (base_path_prefix, graph_dict, cloc_result)
+    for key, data_tuple in multi_dict.items():
+        sub_list = key_prefix_list.copy()
+        sub_list.append(key)
+        yield from iterate_multidict_pages_recursive(data_tuple, sub_list)
+
+
+## returns list of directories of synthetic tree in parent first order
+def generate_paths(paths_num, fanout, root_dir="/src"):
+    ret_list = [root_dir]
+    index = 0
+    while len(ret_list) < paths_num:
+        parent_path = ret_list[index]
+        index += 1
+        for child_index in range(0, fanout):
+            ret_list.append(f"{parent_path}/dir{child_index}")
+            if len(ret_list) >= paths_num:
+                break
+    return ret_list
+
+
+def generate_deep_paths(depth, root_dir="/src"):
+    ret_list = [root_dir]
+    for _ in range(1, depth):
+        ret_list.append(ret_list[-1] + "/d")
+    return ret_list
+
+
+def measure(function, trace_memory=False):
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    try:
+        function()
+        error = None
+    except RecursionError as exc:
+        error = exc
+    duration = time.perf_counter() - start_time
+    peak_memory = None
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return duration, peak_memory, error
+
+
+def run_recursive(dirs_list, result):
+    data_dict = {dir_path.removeprefix("/src"): result for dir_path in dirs_list}
+    multi_dict = split_to_multi_dict_recursive(data_dict)
+    for _ in iterate_multidict_pages_recursive(multi_dict[""], ["index"]):
+        pass
+
+
+def run_build_tree(dirs_list, result):
+    data_dict = {dir_path.removeprefix("/src"): result for dir_path in dirs_list}
+    top_node = build_tree(data_dict)
+    for _ in iterate_tree(top_node):
+        pass
+
+
+def run_streaming(dirs_list, result):
+    results_iter = ((dir_path, result) for dir_path in dirs_list)
+    for _ in iterate_tree_pages("/src", dirs_list, results_iter):
+        pass
+
+
+def run_benchmark(dirs_list, trace_memory=False):
+    result = ClocResult.from_lang_dict({"Python": [1, 0, 0, 10]})
+    for name, function in (
+        ("recursive", run_recursive),
+        ("build_tree", run_build_tree),
+        ("streaming", run_streaming),
+    ):
+        duration, peak_memory, error = measure(lambda func=function: func(dirs_list, result), trace_memory)
+        line = f"    {name:<12} time: {duration:8.3f}s"
+        if peak_memory is not None:
+            line += f" peak memory: {peak_memory / 1048576:8.1f}MiB"
+        if error is not None:
+            line += f" failed: {type(error).__name__}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark of directories tree builders")
+    parser.add_argument("--paths", nargs="+", type=int, default=[100000], help="Number of directories in tree")
+    parser.add_argument("--fanout", type=int, default=10, help="Number of subdirectories of each directory")
+    parser.add_argument("--depth", type=int, default=5000, help="Depth of additional deep tree")
+    parser.add_argument("--memory", action="store_true", help="Measure peak memory (slows down execution)")
+    args = parser.parse_args()
+
+    for paths_num in args.paths:
+        dirs_list = generate_paths(paths_num, args.fanout)
+        print(f"tree: {paths_num} directories, fan-out: {args.fanout}")
+        run_benchmark(dirs_list, args.memory)
+
+    if args.depth > 0:
+        dirs_list = generate_deep_paths(args.depth)
+        print(f"tree: {args.depth} directories in single chain")
+        run_benchmark(dirs_list, args.memory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
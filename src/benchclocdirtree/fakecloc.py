@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Stand-in of 'cloc' for benchmarks on hosts without cloc installed.
+##
+## Supports subset of cloc parameters used by the project ('--json' output only). Lines are counted
+## by built-in line counter. Environment variable 'FAKE_CLOC_DELAY' adds delay (in seconds) to each
+## execution to simulate startup time of cloc. Environment variable 'FAKE_CLOC_FAIL' contains name
+## of file on which execution fails (to simulate cloc failing on pathological file).
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import sys
+import argparse
+import json
+import re
+import time
+import stat
+import shutil
+
+from clocdirtree.linecounter import count_file
+from clocdirtree.dirwalk import VCS_DIR_NAMES
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+## returns list of files of given sources (files and directories)
+def list_sources(sources_list, follow_links=False, not_match_d=None, not_match_f=None, fullpath=False):
+    dir_regex = re.compile(not_match_d) if not_match_d else None
+    file_regex = re.compile(not_match_f) if not_match_f else None
+
+    def matches(regex, path):
+        if regex is None:
+            return False
+        if fullpath:
+            return regex.search(path) is not None
+        return regex.search(os.path.basename(path)) is not None
+
+    files_list = []
+    for source in sources_list:
+        if os.path.isfile(source):
+            files_list.append(source)
+            continue
+        for dir_path, dir_names, file_names in os.walk(source, followlinks=follow_links):
+            dir_names[:] = sorted(
+                name
+                for name in dir_names
+                if name not in VCS_DIR_NAMES and not matches(dir_regex, os.path.join(dir_path, name))
+            )
+            for name in sorted(file_names):
+                file_path = os.path.join(dir_path, name)
+                if not matches(file_regex, file_path):
+                    files_list.append(file_path)
+    return files_list
+
+
+def prepare_output(files_list, by_file=False, include_langs=None, exclude_langs=None):
+    counts_dict = {}
+    for file_path in files_list:
+        counts = count_file(file_path)
+        if counts is None:
+            continue
+        language = counts[0]
+        if include_langs and language not in include_langs:
+            continue
+        if exclude_langs and language in exclude_langs:
+            continue
+        counts_dict[file_path] = counts
+    if not counts_dict:
+        ## cloc prints nothing if no files found
+        return ""
+
+    out_dict = {"header": {"cloc_url": "fakecloc", "n_files": len(counts_dict)}}
+    sum_dict = {"blank": 0, "comment": 0, "code": 0, "nFiles": 0}
+    for file_path, (language, blank, comment, code) in counts_dict.items():
+        if by_file:
+            out_dict[file_path] = {"blank": blank, "comment": comment, "code": code, "language": language}
+        else:
+            lang_dict = out_dict.setdefault(language, {"nFiles": 0, "blank": 0, "comment": 0, "code": 0})
+            lang_dict["nFiles"] += 1
+            lang_dict["blank"] += blank
+            lang_dict["comment"] += comment
+            lang_dict["code"] += code
+        sum_dict["nFiles"] += 1
+        sum_dict["blank"] += blank
+        sum_dict["comment"] += comment
+        sum_dict["code"] += code
+    out_dict["SUM"] = sum_dict
+    return json.dumps(out_dict, indent=1)
+
+
+## create directory with 'cloc' executable running fake cloc, returns the directory (to be put in PATH)
+def install_fake_cloc(bin_dir):
+    os.makedirs(bin_dir, exist_ok=True)
+    script_path = os.path.join(bin_dir, "cloc")
+    with open(script_path, "w", encoding="utf-8") as script_file:
+        script_file.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n')
+    os.chmod(script_path, os.stat(script_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
+
+
+## check if real cloc is available
+def has_cloc():
+    return shutil.which("cloc") is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fake cloc")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--by-file", action="store_true")
+    parser.add_argument("--sum-one", action="store_true")
+    parser.add_argument("--hide-rate", action="store_true")
+    parser.add_argument("--skip-uniqueness", action="store_true")
+    parser.add_argument("--follow-links", action="store_true")
+    parser.add_argument("--fullpath", action="store_true")
+    parser.add_argument("--list-file", default=None)
+    parser.add_argument("--not-match-d", default=None)
+    parser.add_argument("--not-match-f", default=None)
+    parser.add_argument("--include-lang", default="")
+    parser.add_argument("--exclude-lang", default="")
+    parser.add_argument("sources", nargs="*")
+    args = parser.parse_args()
+
+    if not args.json:
+        print("fakecloc: only '--json' output is supported", file=sys.stderr)
+        return 1
+
+    delay = float(os.environ.get("FAKE_CLOC_DELAY", "0"))
+    if delay > 0:
+        time.sleep(delay)
+
+    sources_list = list(args.sources)
+    if args.list_file:
+        with open(args.list_file, "r", encoding="utf-8") as list_file:
+            sources_list.extend(line.strip() for line in list_file if line.strip())
+
+    files_list = list_sources(sources_list, args.follow_links, args.not_match_d, args.not_match_f, args.fullpath)
+    fail_name = os.environ.get("FAKE_CLOC_FAIL")
+    if fail_name and any(os.path.basename(file_path) == fail_name for file_path in files_list):
+        print(f"fakecloc: simulated failure on file: {fail_name}", file=sys.stderr)
+        return 1
+    include_langs = set(item for item in args.include_lang.split(",") if item)
+    exclude_langs = set(item for item in args.exclude_lang.split(",") if item)
+    print(prepare_output(files_list, args.by_file, include_langs, exclude_langs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
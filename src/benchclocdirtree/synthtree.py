@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Generator of synthetic source trees for benchmarks.
+##
+## Example: python3 -m benchclocdirtree.synthtree --depth 4 --fanout 5 --files 10 /tmp/synth
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import sys
+import argparse
+import random
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+## language -> (file extension, code line, comment line)
+LANGUAGE_SAMPLES_DICT = {
+    "Python": (".py", "value = compute(value, 1)", "# comment"),
+    "C": (".c", "value = compute(value, 1);", "// comment"),
+    "JavaScript": (".js", "value = compute(value, 1);", "// comment"),
+    "Bourne Shell": (".sh", 'echo "$value"', "# comment"),
+    "Markdown": (".md", "Some text of documentation.", None),
+}
+
+DEFAULT_LANGUAGES = "Python:3,C:2,JavaScript:2,Markdown:1"
+
+
+## parse languages mix, e.g. 'Python:3,C:1' -> {"Python": 3, "C": 1}
+def parse_languages(languages_mix):
+    ret_dict = {}
+    for item in languages_mix.split(","):
+        language, _, weight = item.partition(":")
+        language = language.strip()
+        if language not in LANGUAGE_SAMPLES_DICT:
+            raise ValueError(f"unsupported language: {language}")
+        ret_dict[language] = int(weight) if weight else 1
+    return ret_dict
+
+
+def generate_file_content(language, lines_num, rand):
+    _, code_line, comment_line = LANGUAGE_SAMPLES_DICT[language]
+    lines_list = []
+    for _ in range(0, lines_num):
+        line_type = rand.random()
+        if line_type < 0.1:
+            lines_list.append("")
+        elif line_type < 0.25 and comment_line is not None:
+            lines_list.append(comment_line)
+        else:
+            lines_list.append(code_line)
+    lines_list.append(code_line)
+    return "\n".join(lines_list) + "\n"
+
+
+def generate_tree(root_dir, depth=3, fanout=4, files_num=5, lines_num=50, languages_dict=None, seed=0):
+    """Generate tree of directories with source files.
+
+    Each directory up to given depth has 'fanout' subdirectories and 'files_num' files of languages
+    drawn with weights of 'languages_dict' (language -> weight). Content is deterministic for given seed.
+    Returns tuple: (number of directories, number of files).
+    """
+    if languages_dict is None:
+        languages_dict = parse_languages(DEFAULT_LANGUAGES)
+    languages_list = list(languages_dict.keys())
+    weights_list = list(languages_dict.values())
+    rand = random.Random(seed)
+
+    dirs_num = 0
+    all_files = 0
+    stack = [(root_dir, 1)]
+    while stack:
+        dir_path, level = stack.pop()
+        os.makedirs(dir_path, exist_ok=True)
+        dirs_num += 1
+        for file_index in range(0, files_num):
+            language = rand.choices(languages_list, weights_list)[0]
+            extension = LANGUAGE_SAMPLES_DICT[language][0]
+            file_lines = rand.randint(max(1, lines_num // 2), lines_num * 3 // 2 + 1)
+            content = generate_file_content(language, file_lines, rand)
+            with open(os.path.join(dir_path, f"file{file_index}{extension}"), "w", encoding="utf-8") as out_file:
+                out_file.write(content)
+        all_files += files_num
+        if level < depth:
+            for sub_index in range(0, fanout):
+                stack.append((os.path.join(dir_path, f"dir{sub_index}"), level + 1))
+    return dirs_num, all_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="generate synthetic source tree")
+    parser.add_argument("--depth", type=int, default=3, help="Depth of tree")
+    parser.add_argument("--fanout", type=int, default=4, help="Number of subdirectories of each directory")
+    parser.add_argument("--files", type=int, default=5, help="Number of files in each directory")
+    parser.add_argument("--lines", type=int, default=50, help="Average number of lines of file")
+    parser.add_argument(
+        "--languages", default=DEFAULT_LANGUAGES, help=f"Mix of languages with weights (default: {DEFAULT_LANGUAGES})"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of random generator")
+    parser.add_argument("outdir", help="Output directory")
+    args = parser.parse_args()
+
+    languages_dict = parse_languages(args.languages)
+    dirs_num, files_num = generate_tree(
+        args.outdir, args.depth, args.fanout, args.files, args.lines, languages_dict, args.seed
+    )
+    print(f"generated directories: {dirs_num}, files: {files_num}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
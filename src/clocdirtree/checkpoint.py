@@ -0,0 +1,197 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Checkpoint of run: results of directories and generated pages are appended to journals as soon as
+## they are finished, so interrupted run can be resumed without counting directories and generating
+## pages again. Files which failed to count are recorded in quarantine file.
+##
+
+import os
+import logging
+
+import json
+import threading
+
+from clocdirtree.clocresult import ClocResult
+from clocdirtree.export import get_export_path, get_import_path
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+CHECKPOINT_DIR_NAME = "checkpoint"
+COUNTS_FILE_NAME = "counts.jsonl"
+PAGES_FILE_NAME = "pages.jsonl"
+QUARANTINE_FILE_NAME = "quarantine.json"
+
+
+##
+class JournalFile:
+    """Append-only file of JSON lines stored in checkpoint directory of output directory.
+
+    First line contains parameters of run, journal written with different parameters is discarded.
+    Each line is flushed, so line written partially (when run was interrupted) can only be the last one.
+    """
+
+    def __init__(self, out_dir, file_name, params_dict, resume=False):
+        self.file_path = os.path.join(out_dir, CHECKPOINT_DIR_NAME, file_name)
+        self.lock = threading.Lock()
+        ## items loaded from journal of interrupted run
+        self.items_list = []
+        params_line = json.dumps(params_dict, sort_keys=True)
+        if resume:
+            self.items_list = self._load(params_line)
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        if self.items_list:
+            self.out_file = open(self.file_path, "a", encoding="utf-8")  # pylint: disable=R1732
+        else:
+            self.out_file = open(self.file_path, "w", encoding="utf-8")  # pylint: disable=R1732
+            self.out_file.write(params_line)
+            self.out_file.write("\n")
+            self.out_file.flush()
+
+    def _load(self, params_line):
+        if not os.path.isfile(self.file_path):
+            return []
+        items_list = []
+        lines_list = []
+        with open(self.file_path, "r", encoding="utf-8") as in_file:
+            if in_file.readline().strip() != params_line:
+                _LOGGER.warning("parameters of run changed, discarding checkpoint: %s", self.file_path)
+                return []
+            for line in in_file:
+                if not line.endswith("\n"):
+                    ## last line written partially when run was interrupted
+                    break
+                try:
+                    items_list.append(json.loads(line))
+                except ValueError:
+                    break
+                lines_list.append(line)
+        if items_list:
+            ## rewrite journal to drop partially written line
+            temp_path = self.file_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as out_file:
+                out_file.write(params_line)
+                out_file.write("\n")
+                out_file.writelines(lines_list)
+            os.replace(temp_path, self.file_path)
+        return items_list
+
+    def add(self, item_dict):
+        line = json.dumps(item_dict) + "\n"
+        with self.lock:
+            self.out_file.write(line)
+            self.out_file.flush()
+
+    ## close journal, if 'remove' is True then journal is removed (run finished successfully)
+    def close(self, remove=False):
+        with self.lock:
+            if self.out_file is not None:
+                self.out_file.close()
+                self.out_file = None
+        if remove and os.path.isfile(self.file_path):
+            os.remove(self.file_path)
+            try:
+                os.rmdir(os.path.dirname(self.file_path))
+            except OSError:
+                ## directory contains other journals
+                pass
+
+
+##
+class CountsJournal(JournalFile):
+    """Journal of counted directories (in the same format as 'jsonl' export)."""
+
+    def __init__(self, out_dir, root_dir, params_dict, resume=False):
+        super().__init__(out_dir, COUNTS_FILE_NAME, params_dict, resume)
+        self.root_dir = root_dir
+        ## directory path -> ClocResult
+        self.done_dict = {}
+        for item_dict in self.items_list:
+            dir_path = get_import_path(item_dict["path"], root_dir)
+            self.done_dict[dir_path] = ClocResult.from_lang_dict(item_dict["languages"])
+        if self.done_dict:
+            _LOGGER.info("resuming counting, directories already counted: %s", len(self.done_dict))
+
+    def add_result(self, dir_path, result):
+        export_path = get_export_path(dir_path, self.root_dir)
+        self.add({"path": export_path, "code": result.code, "languages": result.get_lang_dict()})
+
+    def journal_results(self, results_iter):
+        """Pass results through and append them to journal."""
+        for dir_path, result in results_iter:
+            if dir_path not in self.done_dict:
+                self.add_result(dir_path, result)
+            yield dir_path, result
+
+
+##
+class PagesJournal(JournalFile):
+    """Journal of generated pages with hashes of their inputs (see 'pagemanifest')."""
+
+    def __init__(self, out_dir, params_dict, resume=False):
+        super().__init__(out_dir, PAGES_FILE_NAME, params_dict, resume)
+        ## page name -> hash of page inputs
+        self.done_dict = {item_dict["page"]: item_dict["hash"] for item_dict in self.items_list}
+        if self.done_dict:
+            _LOGGER.info("resuming rendering, pages already generated: %s", len(self.done_dict))
+
+    ## record page, has to be called after all files of page are written
+    def add_page(self, page_name, page_hash):
+        self.add({"page": page_name, "hash": page_hash})
+
+
+##
+class Quarantine:
+    """Files failed to count with reasons of failures. Methods can be called from many threads."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        ## file path -> reason
+        self.paths_dict = {}
+        if os.path.isfile(self.file_path):
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as in_file:
+                    self.paths_dict = json.load(in_file)
+            except (OSError, ValueError) as exc:
+                _LOGGER.warning("unable to load quarantine %s: %s", self.file_path, exc)
+
+    def contains(self, path):
+        with self.lock:
+            return path in self.paths_dict
+
+    ## returns list of quarantined paths inside given directory
+    def get_subtree(self, dir_path):
+        dir_path = os.path.normpath(dir_path)
+        with self.lock:
+            if dir_path == os.curdir:
+                ## normalized paths of files in current directory are relative without prefix
+                return [path for path in self.paths_dict if not os.path.isabs(path)]
+            prefix = os.path.join(dir_path, "")
+            return [path for path in self.paths_dict if path.startswith(prefix)]
+
+    def add(self, path, reason):
+        with self.lock:
+            self.paths_dict[path] = reason
+            self._save()
+
+    def clear(self):
+        with self.lock:
+            self.paths_dict = {}
+            if os.path.isfile(self.file_path):
+                os.remove(self.file_path)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, "w", encoding="utf-8") as out_file:
+            json.dump(self.paths_dict, out_file, indent=4, sort_keys=True)
@@ -0,0 +1,347 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Built-in layout of circles - alternative to graphviz 'neato' for graphs with many nodes.
+##
+## Circles are placed by front-chain packing algorithm (Wang et al. "Visualization of large hierarchical
+## data by circle packing") and enclosed by smallest enclosing circle (Welzl's algorithm), the same way
+## as in d3-hierarchy 'packSiblings'. Layout is deterministic.
+##
+
+import os
+import logging
+
+import math
+import random
+import html
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+##
+class Circle:
+    """Circle placed by packing, 'next' and 'previous' link circles of front-chain."""
+
+    __slots__ = ("x", "y", "r", "next", "previous")
+
+    def __init__(self, r, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
+        self.r = r
+        self.next = None
+        self.previous = None
+
+
+def pack_circles(radius_list):
+    """Pack circles of given radii around point (0, 0) without overlapping.
+
+    Returns tuple: (list of circles in order of given radii, enclosing circle).
+    """
+    circles_list = [Circle(radius) for radius in radius_list]
+    circles_num = len(circles_list)
+    if circles_num < 1:
+        return circles_list, Circle(0.0)
+
+    first = circles_list[0]
+    if circles_num == 1:
+        return circles_list, Circle(first.r)
+
+    second = circles_list[1]
+    first.x = -second.r
+    second.x = first.r
+    if circles_num == 2:
+        enclosing = Circle(first.r + second.r)
+        return circles_list, enclosing
+
+    place_circle(second, first, circles_list[2])
+
+    ## front-chain initialized with first three circles
+    node_a, node_b, node_c = first, second, circles_list[2]
+    node_a.next = node_c.previous = node_b
+    node_b.next = node_a.previous = node_c
+    node_c.next = node_b.previous = node_a
+
+    index = 3
+    while index < circles_num:
+        node_c = circles_list[index]
+        place_circle(node_a, node_b, node_c)
+
+        ## find the closest intersecting circle on the front-chain
+        intersected = False
+        node_j = node_b.next
+        node_k = node_a.previous
+        size_j = node_b.r
+        size_k = node_a.r
+        while True:
+            if size_j <= size_k:
+                if intersects(node_j, node_c):
+                    node_b = node_j
+                    node_a.next = node_b
+                    node_b.previous = node_a
+                    intersected = True
+                    break
+                size_j += node_j.r
+                node_j = node_j.next
+            else:
+                if intersects(node_k, node_c):
+                    node_a = node_k
+                    node_a.next = node_b
+                    node_b.previous = node_a
+                    intersected = True
+                    break
+                size_k += node_k.r
+                node_k = node_k.previous
+            if node_j is node_k.next:
+                break
+        if intersected:
+            ## try to place the same circle again
+            continue
+
+        ## insert new circle between 'a' and 'b'
+        node_c.previous = node_a
+        node_c.next = node_b
+        node_a.next = node_c
+        node_b.previous = node_c
+        node_b = node_c
+
+        ## find new pair of circles closest to centroid
+        best_score = chain_score(node_a)
+        node_c = node_c.next
+        while node_c is not node_b:
+            curr_score = chain_score(node_c)
+            if curr_score < best_score:
+                node_a = node_c
+                best_score = curr_score
+            node_c = node_c.next
+        node_b = node_a.next
+        index += 1
+
+    ## enclose front-chain and move circles to put enclosing circle around origin
+    chain_list = [node_b]
+    node_c = node_b.next
+    while node_c is not node_b:
+        chain_list.append(node_c)
+        node_c = node_c.next
+    enclosing = enclose_circles(chain_list)
+    for circle in circles_list:
+        circle.x -= enclosing.x
+        circle.y -= enclosing.y
+        circle.next = None
+        circle.previous = None
+    enclosing.x = 0.0
+    enclosing.y = 0.0
+    return circles_list, enclosing
+
+
+## place circle 'c' tangent to circles 'a' and 'b'
+def place_circle(circle_b, circle_a, circle_c):
+    dx = circle_b.x - circle_a.x
+    dy = circle_b.y - circle_a.y
+    d2 = dx * dx + dy * dy
+    if not d2:
+        circle_c.x = circle_a.x + circle_c.r
+        circle_c.y = circle_a.y
+        return
+    a2 = circle_a.r + circle_c.r
+    a2 *= a2
+    b2 = circle_b.r + circle_c.r
+    b2 *= b2
+    if a2 > b2:
+        x = (d2 + b2 - a2) / (2 * d2)
+        y = math.sqrt(max(0.0, b2 / d2 - x * x))
+        circle_c.x = circle_b.x - x * dx - y * dy
+        circle_c.y = circle_b.y - x * dy + y * dx
+    else:
+        x = (d2 + a2 - b2) / (2 * d2)
+        y = math.sqrt(max(0.0, a2 / d2 - x * x))
+        circle_c.x = circle_a.x + x * dx - y * dy
+        circle_c.y = circle_a.y + x * dy + y * dx
+
+
+def intersects(circle_a, circle_b):
+    dr = circle_a.r + circle_b.r - 1e-6
+    dx = circle_b.x - circle_a.x
+    dy = circle_b.y - circle_a.y
+    return dr > 0 and dr * dr > dx * dx + dy * dy
+
+
+## distance to origin of weighted centroid of circle and its next circle in front-chain
+def chain_score(circle):
+    next_circle = circle.next
+    ab = circle.r + next_circle.r
+    dx = (circle.x * next_circle.r + next_circle.x * circle.r) / ab
+    dy = (circle.y * next_circle.r + next_circle.y * circle.r) / ab
+    return dx * dx + dy * dy
+
+
+def enclose_circles(circles_list):
+    """Calculate the smallest circle enclosing given circles (Welzl's algorithm)."""
+    circles_list = list(circles_list)
+    ## fixed seed - layout has to be deterministic
+    random.Random(0).shuffle(circles_list)
+    basis = []
+    enclosing = None
+    index = 0
+    while index < len(circles_list):
+        circle = circles_list[index]
+        if enclosing is not None and encloses_weak(enclosing, circle):
+            index += 1
+            continue
+        basis = extend_basis(basis, circle)
+        enclosing = enclose_basis(basis)
+        index = 0
+    return enclosing
+
+
+def extend_basis(basis, circle):
+    if encloses_weak_all(circle, basis):
+        return [circle]
+
+    for item in basis:
+        if encloses_not(circle, item) and encloses_weak_all(enclose_basis2(item, circle), basis):
+            return [item, circle]
+
+    for index_i in range(0, len(basis) - 1):
+        item_i = basis[index_i]
+        for index_j in range(index_i + 1, len(basis)):
+            item_j = basis[index_j]
+            if (
+                encloses_not(enclose_basis2(item_i, item_j), circle)
+                and encloses_not(enclose_basis2(item_i, circle), item_j)
+                and encloses_not(enclose_basis2(item_j, circle), item_i)
+                and encloses_weak_all(enclose_basis3(item_i, item_j, circle), basis)
+            ):
+                return [item_i, item_j, circle]
+
+    raise RuntimeError("unable to find enclosing circle")
+
+
+def encloses_not(circle_a, circle_b):
+    dr = circle_a.r - circle_b.r
+    dx = circle_b.x - circle_a.x
+    dy = circle_b.y - circle_a.y
+    return dr < 0 or dr * dr < dx * dx + dy * dy
+
+
+def encloses_weak(circle_a, circle_b):
+    dr = circle_a.r - circle_b.r + max(circle_a.r, circle_b.r, 1) * 1e-9
+    dx = circle_b.x - circle_a.x
+    dy = circle_b.y - circle_a.y
+    return dr > 0 and dr * dr > dx * dx + dy * dy
+
+
+def encloses_weak_all(circle, basis):
+    for item in basis:
+        if not encloses_weak(circle, item):
+            return False
+    return True
+
+
+def enclose_basis(basis):
+    if len(basis) == 1:
+        return Circle(basis[0].r, basis[0].x, basis[0].y)
+    if len(basis) == 2:
+        return enclose_basis2(basis[0], basis[1])
+    return enclose_basis3(basis[0], basis[1], basis[2])
+
+
+def enclose_basis2(circle_a, circle_b):
+    x1, y1, r1 = circle_a.x, circle_a.y, circle_a.r
+    x2, y2, r2 = circle_b.x, circle_b.y, circle_b.r
+    x21 = x2 - x1
+    y21 = y2 - y1
+    r21 = r2 - r1
+    length = math.sqrt(x21 * x21 + y21 * y21)
+    return Circle((length + r1 + r2) / 2, (x1 + x2 + x21 / length * r21) / 2, (y1 + y2 + y21 / length * r21) / 2)
+
+
+def enclose_basis3(circle_a, circle_b, circle_c):
+    # pylint: disable=R0914
+    x1, y1, r1 = circle_a.x, circle_a.y, circle_a.r
+    x2, y2, r2 = circle_b.x, circle_b.y, circle_b.r
+    x3, y3, r3 = circle_c.x, circle_c.y, circle_c.r
+    a2 = x1 - x2
+    a3 = x1 - x3
+    b2 = y1 - y2
+    b3 = y1 - y3
+    c2 = r2 - r1
+    c3 = r3 - r1
+    d1 = x1 * x1 + y1 * y1 - r1 * r1
+    d2 = d1 - x2 * x2 - y2 * y2 + r2 * r2
+    d3 = d1 - x3 * x3 - y3 * y3 + r3 * r3
+    ab = a3 * b2 - a2 * b3
+    xa = (b2 * d3 - b3 * d2) / (ab * 2) - x1
+    xb = (b3 * c2 - b2 * c3) / ab
+    ya = (a3 * d2 - a2 * d3) / (ab * 2) - y1
+    yb = (a2 * c3 - a3 * c2) / ab
+    coeff_a = xb * xb + yb * yb - 1
+    coeff_b = 2 * (r1 + xa * xb + ya * yb)
+    coeff_c = xa * xa + ya * ya - r1 * r1
+    if abs(coeff_a) > 1e-6:
+        radius = -(coeff_b + math.sqrt(coeff_b * coeff_b - 4 * coeff_a * coeff_c)) / (2 * coeff_a)
+    else:
+        radius = -coeff_c / coeff_b
+    return Circle(radius, x1 + xa + xb * radius, y1 + ya + yb * radius)
+
+
+## =============================================================
+
+
+## padding between circles and around the picture (in pixels)
+PACK_PADDING = 4
+
+
+def render_pack(nodes_list, map_name):
+    """Layout nodes by circle packing, returns tuple: (SVG content, HTML map content).
+
+    'nodes_list' contains tuples: (label lines list, radius in pixels, link url, tooltip).
+    Coordinates of map areas match image rendered in natural size.
+    """
+    ## the largest circles first gives the most compact layout
+    order_list = sorted(range(0, len(nodes_list)), key=lambda index: -nodes_list[index][1])
+    radius_list = [nodes_list[index][1] + PACK_PADDING / 2 for index in order_list]
+    circles_list, enclosing = pack_circles(radius_list)
+
+    size = int(math.ceil(2 * enclosing.r + PACK_PADDING))
+    center = size / 2
+
+    svg_lines = [
+        f'<svg width="{size}px" height="{size}px" viewBox="0 0 {size} {size}"'
+        ' xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+    ]
+    map_lines = [f'<map id="{map_name}" name="{map_name}">']
+    for circle, node_index in zip(circles_list, order_list):
+        label_list, radius, url, tooltip = nodes_list[node_index]
+        x = center + circle.x
+        y = center + circle.y
+        url = html.escape(url)
+        tooltip = html.escape(tooltip)
+        svg_lines.append('<g class="node">')
+        svg_lines.append(f'<a xlink:href="{url}" xlink:title="{tooltip}">')
+        svg_lines.append(f"<title>{tooltip}</title>")
+        svg_lines.append(f'<circle fill="none" stroke="gray" cx="{x:.2f}" cy="{y:.2f}" r="{radius:.2f}"/>')
+        line_y = y - 7 * (len(label_list) - 1) + 4.5
+        for label in label_list:
+            svg_lines.append(
+                f'<text text-anchor="middle" x="{x:.2f}" y="{line_y:.2f}" font-family="Times,serif"'
+                f' font-size="14.00">{html.escape(label)}</text>'
+            )
+            line_y += 14
+        svg_lines.append("</a>")
+        svg_lines.append("</g>")
+        map_lines.append(
+            f'<area shape="circle" href="{url}" title="{tooltip}" alt=""'
+            f' coords="{int(round(x))},{int(round(y))},{int(round(radius))}"/>'
+        )
+    svg_lines.append("</svg>")
+    map_lines.append("</map>")
+    return "\n".join(svg_lines) + "\n", "\n".join(map_lines) + "\n"
@@ -10,13 +10,18 @@ import os
 import logging
 
 import re
+import stat
 import json
+import time
+import tempfile
+import functools
 import subprocess  # nosec
 
-# from multiprocessing import Pool
-from multiprocessing.pool import ThreadPool as Pool
-
-from clocdirtree.io import read_file
+from clocdirtree.io import read_file, write_dict
+from clocdirtree.clocresult import ClocResult
+from clocdirtree.taskpool import execute_prioritized
+from clocdirtree.runstats import get_run_stats
+from clocdirtree.dirwalk import is_vcs_path, VCS_DIR_NAMES
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,15 +29,34 @@ _LOGGER = logging.getLogger(__name__)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+## policy of executing cloc: timeout of single execution (in seconds, None means no limit),
+## number of retries of failed execution and delay before first retry (doubled on each retry)
+CLOC_POLICY = {"timeout": None, "retries": 1, "retry_delay": 1.0}
+
+
+## number of files counted between stores to cache, so counts of interrupted run are not lost
+CACHE_STORE_CHUNK = 2000
+
+
+def configure_cloc_policy(timeout=None, retries=1, retry_delay=1.0):
+    CLOC_POLICY["timeout"] = timeout
+    CLOC_POLICY["retries"] = retries
+    CLOC_POLICY["retry_delay"] = retry_delay
+
+
+##
+class ClocError(RuntimeError):
+    """Execution of cloc failed (error or timeout) despite retries."""
+
+
 ## ===================================================================
 
 
 def run_cloc(cloc_dir, out_path, recursive=False):
     """Run cloc recursively on given directory and write results to given path."""
     dirs_list = get_dirs_list(cloc_dir, recursive)
-    data_dir = cloc_dirs(dirs_list)
-    with open(out_path, "w", encoding="utf8") as json_file:
-        json.dump(data_dir, json_file, allow_nan=False)
+    data_dict = {dir_path: result for dir_path, result in cloc_dirs(dirs_list) if result.code > 0}
+    write_dict(data_dict, out_path)
 
 
 def get_dirs_list(start_dir, recursive=False):
@@ -52,33 +76,485 @@ def get_dirs_list(start_dir, recursive=False):
     return dirs_list
 
 
-def cloc_dirs(dirs_list, cloc_params_dict=None):
-    """Run cloc against given list of directory paths."""
+def cloc_dirs(
+    dirs_list,
+    cloc_params_dict=None,
+    jobs=None,
+    size_dict=None,
+    heavy_jobs=None,
+    heavy_size=None,
+    batch_size=None,
+    quarantine=None,
+):
+    """Run cloc against given list of directory paths.
+
+    Yields tuples (directory path, ClocResult) of all given directories in order of completion
+    (directories without code have empty result), so results can be consumed while cloc is running.
+
+    Heavy directories (with size greater or equal 'heavy_size' according to 'size_dict', e.g. number
+    of files in subtree) are counted first, starting from the largest ones, and no more than 'heavy_jobs'
+    cloc processes run on them at the same time. Other directories are counted children first (in reversed
+    order of 'dirs_list', which is expected parent first as returned by 'walk_tree'), so subtrees complete
+    one after another and tree pages can be built while results of only few directories are kept.
+
+    If 'batch_size' is given, then subtrees with no more files than 'batch_size' are grouped
+    into batches and each batch is counted by single cloc process in '--by-file' mode.
+
+    If 'quarantine' is given (see 'checkpoint.Quarantine'), then failure of counting directory does
+    not raise ClocError: files of the directory are counted separately, files failing cloc are added
+    to quarantine and the directory result is sum of the other files. Quarantined files are not counted.
+    """
     _LOGGER.info("checking directories:\n%s", "\n".join(dirs_list))
+    if size_dict is None:
+        size_dict = {}
+
+    single_list = dirs_list
+    batches_list = []
+    if batch_size:
+        single_list, batches_list = split_to_batches(dirs_list, size_dict, batch_size)
+        _LOGGER.info(
+            "directories counted separately: %s, batches: %s, directories in batches: %s",
+            len(single_list),
+            len(batches_list),
+            len(dirs_list) - len(single_list),
+        )
+
+    ## batch is counted when its first subtree is reached in children first order
+    roots_batches = {}
+    for index, batch_dict in enumerate(batches_list):
+        for root_path in batch_dict:
+            roots_batches[root_path] = index
+    single_set = set(single_list)
+    queued_set = set()
+    tasks_list = []
+    for dir_path in reversed(dirs_list):
+        if dir_path in single_set:
+            tasks_list.append((dir_path, [False, [dir_path], cloc_params_dict, quarantine], size_dict.get(dir_path, 0)))
+            continue
+        index = roots_batches.get(dir_path)
+        if index is None or index in queued_set:
+            continue
+        queued_set.add(index)
+        batch_dict = batches_list[index]
+        batch_weight = sum(size_dict.get(root_path, 0) for root_path in batch_dict)
+        tasks_list.append((index, [True, batch_dict, cloc_params_dict, quarantine], batch_weight))
+
+    results_iter = execute_prioritized(
+        execute_cloc_task, tasks_list, jobs, heavy_jobs, heavy_size, keep_light_order=True
+    )
+    for _, result in results_iter:
+        yield from result.items()
+
+
+def split_to_batches(dirs_list, size_dict, batch_size):
+    """Split directories to ones counted separately and to batches of small subtrees.
+
+    Returns tuple: (list of directories, list of batches).
+    Each batch is dict: subtree root -> list of subtree directories.
+    """
+    ## symbolic links are followed by cloc - count them separately
+    small_set = set()
+    for dir_path in dirs_list:
+        if size_dict.get(dir_path, batch_size + 1) <= batch_size and not os.path.islink(dir_path):
+            small_set.add(dir_path)
+
+    single_list = []
+    subtrees_dict = {}
+    for dir_path in dirs_list:
+        if dir_path not in small_set:
+            single_list.append(dir_path)
+            continue
+        ## find root of small subtree
+        root_path = dir_path
+        while True:
+            parent_path = os.path.dirname(root_path)
+            if parent_path == root_path or parent_path not in small_set:
+                break
+            root_path = parent_path
+        subtrees_dict.setdefault(root_path, []).append(dir_path)
+
+    batches_list = []
+    batch_dict = {}
+    batch_files = 0
+    for root_path, subtree_list in subtrees_dict.items():
+        root_files = size_dict.get(root_path, 0)
+        if batch_dict and batch_files + root_files > batch_size:
+            batches_list.append(batch_dict)
+            batch_dict = {}
+            batch_files = 0
+        batch_dict[root_path] = subtree_list
+        batch_files += root_files
+    if batch_dict:
+        batches_list.append(batch_dict)
+
+    return single_list, batches_list
+
+
+## returns dict: directory path -> ClocResult
+def execute_cloc_task(is_batch, dirs_data, cloc_params_dict=None, quarantine=None):
+    if not is_batch:
+        dir_path = dirs_data[0]
+        with get_run_stats().measure("count", dir_path):
+            return {dir_path: execute_cloc_quarantined(dir_path, cloc_params_dict, quarantine)}
+    batch_item = f"batch of {len(dirs_data)} subtrees: {next(iter(dirs_data), '')}"
+    with get_run_stats().measure("count", batch_item):
+        return execute_cloc_batch(dirs_data, cloc_params_dict, quarantine)
+
+
+def execute_cloc_quarantined(dir_path, cloc_params_dict=None, quarantine=None):
+    """Run cloc on given directory and return ClocResult.
+
+    If counting fails and 'quarantine' is given, then files of directory subtree are counted
+    separately and failing files are quarantined, so only the files are missing in results
+    of the directory and its parents. Directories containing quarantined files are counted
+    by files at once.
+    """
+    if quarantine is None:
+        return execute_cloc_result(dir_path, cloc_params_dict)
+    if not quarantine.get_subtree(dir_path):
+        try:
+            return execute_cloc_result(dir_path, cloc_params_dict)
+        except ClocError as exc:
+            _LOGGER.warning("unable to count directory %s (%s), counting its files separately", dir_path, exc)
+    files_list = [file_path for file_path, _ in get_dirs_files(list_subtree_dirs(dir_path))]
+    files_dict = execute_cloc_isolated(files_list, cloc_params_dict, quarantine)
+    dirs_data = aggregate_files(files_dict, dir_path)
+    return ClocResult.from_lang_dict(dirs_data.get(os.path.normpath(dir_path), {}))
+
+
+def execute_cloc_isolated(files_list, cloc_params_dict, quarantine):
+    """Run cloc in '--by-file' mode on given files, failing files are found by bisection and quarantined.
+
+    Returns dict with counts of files counted successfully.
+    """
+    files_list = [file_path for file_path in files_list if not quarantine.contains(file_path)]
+    if not files_list:
+        return {}
+    try:
+        return execute_cloc_files(files_list, cloc_params_dict)
+    except ClocError as exc:
+        if len(files_list) == 1:
+            _LOGGER.error("unable to count file %s - file quarantined: %s", files_list[0], exc)
+            quarantine.add(files_list[0], str(exc))
+            get_run_stats().add("files_quarantined")
+            return {}
+    middle = len(files_list) // 2
+    ret_dict = execute_cloc_isolated(files_list[:middle], cloc_params_dict, quarantine)
+    ret_dict.update(execute_cloc_isolated(files_list[middle:], cloc_params_dict, quarantine))
+    return ret_dict
+
+
+## returns list of directories of subtree (links to directories are not entered - the same as cloc)
+def list_subtree_dirs(dir_path):
+    dirs_list = [dir_path]
+    for parent_path, dir_names, _ in os.walk(dir_path):
+        dir_names[:] = [name for name in dir_names if name not in VCS_DIR_NAMES]
+        dirs_list.extend(os.path.join(parent_path, name) for name in dir_names)
+    return dirs_list
+
+
+def execute_cloc_batch(batch_dict, cloc_params_dict=None, quarantine=None):
+    """Count subtrees of batch by single cloc process and split results to directories.
+
+    'batch_dict' is dict: subtree root -> list of subtree directories.
+    If 'quarantine' is given, then files failing cloc are quarantined (see 'execute_cloc_isolated').
+    Returns dict: directory path -> ClocResult, directories of each subtree are ordered children first.
+    """
+    roots_files = {}
+    files_list = []
+    for root_path, subtree_list in batch_dict.items():
+        root_files = [file_path for file_path, _ in get_dirs_files(subtree_list)]
+        roots_files[root_path] = root_files
+        files_list.extend(root_files)
+
+    counted_dict = {}
+    if quarantine is not None:
+        counted_dict = execute_cloc_isolated(files_list, cloc_params_dict, quarantine)
+    elif files_list:
+        counted_dict = execute_cloc_files(files_list, cloc_params_dict)
+
     ret_dict = {}
-    with Pool() as process_pool:
-        # with Pool(processes=1) as process_pool:
-        result_queue = []
+    for root_path, subtree_list in batch_dict.items():
+        files_dict = {}
+        for file_path in roots_files[root_path]:
+            counts = counted_dict.get(file_path)
+            if counts is not None:
+                files_dict[file_path] = counts
+        dirs_data = aggregate_files(files_dict, root_path)
+        ## children first - the same as other results
+        for dir_path in reversed(subtree_list):
+            lang_dict = dirs_data.get(os.path.normpath(dir_path), {})
+            ret_dict[dir_path] = ClocResult.from_lang_dict(lang_dict)
+    return ret_dict
 
-        for dir_path in dirs_list:
-            async_result = process_pool.apply_async(execute_cloc, [dir_path, "raw", cloc_params_dict])
-            result_queue.append((dir_path, async_result))
 
-        # wait for results
-        for dir_path, async_result in result_queue:
-            lines, content = async_result.get()
-            if lines < 1:
-                continue
-            ret_dict[dir_path] = [lines, content]
+def cloc_dirs_singlepass(run_dir, dirs_list, cloc_params_dict=None, quarantine=None):
+    """Run cloc once on given root directory and calculate results of all directories from per-file counts.
+
+    If 'quarantine' is given and cloc fails, then files of given directories are counted separately
+    and failing files are quarantined (see 'execute_cloc_isolated').
+    Returns iterator over tuples (directory path, ClocResult) of given directories.
+    """
+    files_dict = None
+    if quarantine is None:
+        files_dict = execute_cloc_by_file(run_dir, cloc_params_dict)
+    elif not quarantine.get_subtree(run_dir):
+        try:
+            files_dict = execute_cloc_by_file(run_dir, cloc_params_dict)
+        except ClocError as exc:
+            _LOGGER.warning("unable to count directory %s (%s), counting its files separately", run_dir, exc)
+    if files_dict is None:
+        files_list = [file_path for file_path, _ in get_dirs_files(dirs_list)]
+        files_dict = execute_cloc_isolated(files_list, cloc_params_dict, quarantine)
+    dirs_data = aggregate_files(files_dict, run_dir)
+    return iterate_dirs_results(dirs_data, dirs_list)
+
+
+def cloc_dirs_by_files(run_dir, dirs_list, files_counter):
+    """Count all files of given directories with given counter and calculate results of all directories.
+
+    'files_counter' is callable taking list of files and returning dict: file path -> (language, blank, comment, code).
+    Returns iterator over tuples (directory path, ClocResult) of given directories.
+    """
+    files_list = [file_path for file_path, _ in get_dirs_files(dirs_list)]
+    files_dict = files_counter(files_list)
+    dirs_data = aggregate_files(files_dict, run_dir)
+    return iterate_dirs_results(dirs_data, dirs_list)
+
+
+def cloc_dirs_cached(run_dir, dirs_list, count_cache, cloc_params_dict=None, files_counter=None, quarantine=None):
+    """Count files of given directories using cache and calculate results of all directories.
+
+    Only new and modified files are passed to cloc (or to given 'files_counter').
+    If 'quarantine' is given, then files failing cloc are quarantined (see 'execute_cloc_isolated').
+    Returns iterator over tuples (directory path, ClocResult) of given directories.
+    """
+    files_counter = get_files_counter(cloc_params_dict, files_counter, quarantine)
+    files_dict = {}
+    missing_list = []
+    found_set = set()
+    for file_path, stat_result in get_dirs_files(dirs_list):
+        found_set.add(file_path)
+        counts = count_cache.lookup(file_path, stat_result)
+        if counts is None:
+            missing_list.append(file_path)
+            continue
+        if counts[0] is None:
+            ## file ignored by cloc
+            continue
+        files_dict[file_path] = counts
+
+    _LOGGER.info("cached files: %s, files to count: %s", count_cache.hits, len(missing_list))
+    if missing_list:
+        files_dict.update(count_missing_files(missing_list, files_counter, count_cache, quarantine))
+
+    ## forget removed files
+    removed_list = [file_path for file_path in count_cache.load_dir(run_dir) if file_path not in found_set]
+    if removed_list:
+        count_cache.remove(removed_list)
+
+    dirs_data = aggregate_files(files_dict, run_dir)
+    return iterate_dirs_results(dirs_data, dirs_list)
+
+
+def cloc_dirs_incremental(
+    run_dir, changed_list, count_cache, cloc_params_dict=None, files_counter=None, quarantine=None
+):
+    """Recount given changed files and calculate results of all directories using cached counts of other files.
+
+    Requires cache filled by previous run on the same directory.
+    If 'quarantine' is given, then files failing cloc are quarantined (see 'execute_cloc_isolated').
+    Returns iterator over tuples (directory path, ClocResult) of directories containing counted files.
+    """
+    files_counter = get_files_counter(cloc_params_dict, files_counter, quarantine)
+    files_dict = count_cache.load_dir(run_dir)
+
+    removed_list = []
+    missing_list = []
+    for file_path in changed_list:
+        files_dict.pop(file_path, None)
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError:
+            removed_list.append(file_path)
+            continue
+        if not stat.S_ISREG(stat_result.st_mode):
+            continue
+        counts = count_cache.lookup(file_path, stat_result)
+        if counts is None:
+            missing_list.append(file_path)
+            continue
+        if counts[0] is None:
+            ## file ignored by cloc
+            continue
+        files_dict[file_path] = counts
+
+    _LOGGER.info("changed files: %s, files to count: %s", len(changed_list), len(missing_list))
+    if removed_list:
+        count_cache.remove(removed_list)
+    if missing_list:
+        files_dict.update(count_missing_files(missing_list, files_counter, count_cache, quarantine))
+
+    run_dir = os.path.normpath(run_dir)
+    dirs_data = aggregate_files(files_dict, run_dir)
+    dirs_list = [run_dir]
+    for dir_path in dirs_data:
+        if dir_path == run_dir:
+            continue
+        dirs_list.append(os.path.join(run_dir, os.path.relpath(dir_path, run_dir)))
+    return iterate_dirs_results(dirs_data, dirs_list)
+
 
+## returns callable counting list of files: given 'files_counter' or cloc (quarantining failing files
+## if 'quarantine' is given)
+def get_files_counter(cloc_params_dict=None, files_counter=None, quarantine=None):
+    if files_counter is not None:
+        return files_counter
+    if quarantine is not None:
+        return functools.partial(execute_cloc_isolated, cloc_params_dict=cloc_params_dict, quarantine=quarantine)
+    return functools.partial(execute_cloc_files, cloc_params_dict=cloc_params_dict)
+
+
+def count_missing_files(missing_list, files_counter, count_cache, quarantine=None):
+    """Count given files not found in cache and store their counts in cache.
+
+    Files are counted in chunks and counts of each chunk are stored immediately, so interrupted run
+    can be continued from the cache. Files ignored by cloc are also stored (to prevent counting them
+    again), quarantined files are not stored, so they are counted again when quarantine is cleared.
+    Returns dict with counts of counted files.
+    """
+    ret_dict = {}
+    for chunk_start in range(0, len(missing_list), CACHE_STORE_CHUNK):
+        chunk_list = missing_list[chunk_start : chunk_start + CACHE_STORE_CHUNK]
+        counted_dict = files_counter(chunk_list)
+        new_dict = {}
+        for file_path in chunk_list:
+            if quarantine is not None and quarantine.contains(file_path):
+                continue
+            new_dict[file_path] = counted_dict.get(file_path)
+        count_cache.store(new_dict)
+        ret_dict.update(counted_dict)
+        _LOGGER.info("counted files: %s/%s", chunk_start + len(chunk_list), len(missing_list))
     return ret_dict
 
 
+def get_dirs_files(dirs_list):
+    """Yield tuples (normalized file path, stat) of files directly contained in given directories.
+
+    Files are listed to be counted, so their sizes are added to 'bytes_read' counter of run statistics.
+    Directories of version control systems are skipped (the same as cloc does).
+    """
+    files_num = 0
+    files_size = 0
+    try:
+        for dir_path in dirs_list:
+            if is_vcs_path(dir_path):
+                continue
+            try:
+                with os.scandir(dir_path) as dir_iter:
+                    for entry in dir_iter:
+                        if not entry.is_file():
+                            continue
+                        stat_result = entry.stat()
+                        files_num += 1
+                        files_size += stat_result.st_size
+                        yield os.path.normpath(entry.path), stat_result
+            except OSError as exc:
+                _LOGGER.warning("unable to list directory %s: %s", dir_path, exc)
+    finally:
+        run_stats = get_run_stats()
+        run_stats.add("files_listed", files_num)
+        run_stats.add("bytes_read", files_size)
+
+
+def iterate_dirs_results(dirs_data, dirs_list):
+    """Convert aggregated directories data to results of given directories.
+
+    Yields tuples (directory path, ClocResult) children first (in reversed order of 'dirs_list', which
+    is parent first), so subtrees complete one after another. Directories without code have empty result.
+    Converted data is removed from 'dirs_data'.
+    """
+    for dir_path in reversed(dirs_list):
+        lang_dict = dirs_data.pop(os.path.normpath(dir_path), None)
+        if not lang_dict:
+            yield dir_path, ClocResult()
+            continue
+        yield dir_path, ClocResult.from_lang_dict(lang_dict)
+
+
 def execute_cloc(sources_dir, mode, cloc_params_dict=None):
     _LOGGER.info(f"counting code on: {sources_dir}")  # pylint: disable=W1203
 
     command = ["cloc", "--sum-one", "--hide-rate"]
 
+    if mode == "raw":
+        # do nothing
+        pass
+    elif mode == "json":
+        command.append("--json")
+    else:
+        raise RuntimeError(f"unhandled mode: '{mode}'")
+
+    output = run_cloc_command(command, sources_dir, cloc_params_dict)
+
+    # _LOGGER.info( "cloc output:\n%s", output )
+
+    return parse_cloc_output(output, mode)
+
+
+def execute_cloc_result(sources_dir, cloc_params_dict=None):
+    """Run cloc on given directory and return ClocResult."""
+    _LOGGER.info(f"counting code on: {sources_dir}")  # pylint: disable=W1203
+
+    command = ["cloc", "--hide-rate", "--json"]
+    output = run_cloc_command(command, sources_dir, cloc_params_dict)
+    if not output.strip():
+        ## no files found
+        return ClocResult()
+    return ClocResult.from_cloc_json(json.loads(output))
+
+
+def execute_cloc_by_file(sources_dir, cloc_params_dict=None):
+    """Run cloc in '--by-file' mode and return dict with counts of each file."""
+    _LOGGER.info(f"counting code by file on: {sources_dir}")  # pylint: disable=W1203
+
+    command = ["cloc", "--hide-rate", "--by-file", "--json"]
+    output = run_cloc_command(command, sources_dir, cloc_params_dict)
+    if not output.strip():
+        ## no files found
+        return {}
+    return parse_cloc_by_file(json.loads(output))
+
+
+def execute_cloc_files(files_list, cloc_params_dict=None):
+    """Run cloc in '--by-file' mode on given list of files and return dict with counts of each file."""
+    _LOGGER.info("counting code of %s files", len(files_list))
+
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False) as list_file:
+        list_file.write("\n".join(files_list))
+        list_file.write("\n")
+    try:
+        ## count duplicated files separately - counts of file can not depend on other files
+        command = ["cloc", "--hide-rate", "--by-file", "--json", "--skip-uniqueness", f"--list-file={list_file.name}"]
+        sources_name = f"list of {len(files_list)} files (first: {files_list[0]})"
+        output = run_cloc_command(command, None, cloc_params_dict, sources_name=sources_name)
+    finally:
+        os.remove(list_file.name)
+
+    if not output.strip():
+        ## no files found
+        return {}
+    files_dict = parse_cloc_by_file(json.loads(output))
+    ## cloc may report paths in slightly different form than given
+    return {os.path.normpath(file_path): counts for file_path, counts in files_dict.items()}
+
+
+## sources_name - description of sources in logs, if None then 'sources_dir' is used
+def run_cloc_command(command, sources_dir, cloc_params_dict=None, sources_name=None):
+    """Append parameters and sources to cloc command, execute it and return output."""
+    if sources_name is None:
+        sources_name = sources_dir
+    command = command.copy()
     if cloc_params_dict:
         cloc_params_list = []
         for key, val in cloc_params_dict.items():
@@ -87,33 +563,110 @@ def execute_cloc(sources_dir, mode, cloc_params_dict=None):
                 cloc_params_list.append(val)
         command.extend(cloc_params_list)
 
-    if mode == "raw":
-        # do nothing
+    if sources_dir is None:
+        ## sources passed by other parameter (e.g. '--list-file')
         pass
-    elif mode == "json":
-        command.append("--json")
-    else:
-        raise RuntimeError(f"unhandled mode: '{mode}'")
-
-    if os.path.islink(sources_dir):
+    elif os.path.islink(sources_dir):
         command.extend(["--follow-links", sources_dir])
     else:
         command.extend([sources_dir])
 
     _LOGGER.debug("starting cloc with parameters: %s", command)
 
-    try:
-        result = subprocess.run(command, capture_output=True, check=True)  # nosec
-    except subprocess.CalledProcessError as exc:
-        output = exc.stderr.decode("utf-8")
-        _LOGGER.error("cloc error: %s", output)
-        raise
-
-    output = result.stdout.decode("utf-8")
+    run_stats = get_run_stats()
+    timeout = CLOC_POLICY["timeout"]
+    retries = CLOC_POLICY["retries"]
+    retry_delay = CLOC_POLICY["retry_delay"]
+    attempt = 0
+    while True:
+        run_stats.add("cloc_invocations")
+        try:
+            result = subprocess.run(command, capture_output=True, check=True, timeout=timeout)  # nosec
+            break
+        except subprocess.TimeoutExpired:
+            reason = f"timeout after {timeout}s"
+            run_stats.add("cloc_timeouts")
+        except subprocess.CalledProcessError as exc:
+            output = exc.stderr.decode("utf-8")
+            _LOGGER.error("cloc error: %s", output)
+            reason = f"exit code {exc.returncode}: {output.strip()}"
+        if attempt >= retries:
+            raise ClocError(f"cloc failed on {sources_name} ({reason})")
+        attempt += 1
+        run_stats.add("cloc_retries")
+        delay = retry_delay * 2 ** (attempt - 1)
+        _LOGGER.warning("cloc failed on %s (%s), retry %s/%s in %ss", sources_name, reason, attempt, retries, delay)
+        time.sleep(delay)
+
+    run_stats.add("cloc_output_bytes", len(result.stdout))
+    return result.stdout.decode("utf-8")
+
+
+def parse_cloc_by_file(content_dict):
+    """Convert cloc '--by-file --json' output to dict: file path -> (language, blank, comment, code)."""
+    ret_dict = {}
+    for file_path, file_data in content_dict.items():
+        if file_path in ("header", "SUM"):
+            continue
+        ret_dict[file_path] = (file_data["language"], file_data["blank"], file_data["comment"], file_data["code"])
+    return ret_dict
 
-    # _LOGGER.info( "cloc output:\n%s", output )
 
-    return parse_cloc_output(output, mode)
+def aggregate_files(files_dict, root_dir):
+    """Sum per-file counts bottom-up into totals of each directory under given root.
+
+    Returns dict: normalized directory path -> {language: [files, blank, comment, code]}.
+    """
+    root_dir = os.path.normpath(root_dir)
+    dirs_data = {root_dir: {}}
+
+    ## sum files directly contained in directories
+    for file_path, file_data in files_dict.items():
+        dir_path = os.path.dirname(os.path.normpath(file_path)) or os.curdir
+        lang_dict = dirs_data.get(dir_path)
+        if lang_dict is None:
+            lang_dict = {}
+            dirs_data[dir_path] = lang_dict
+        language, blank, comment, code = file_data
+        counts = lang_dict.get(language)
+        if counts is None:
+            lang_dict[language] = [1, blank, comment, code]
+        else:
+            counts[0] += 1
+            counts[1] += blank
+            counts[2] += comment
+            counts[3] += code
+
+    ## register intermediate directories without files
+    for dir_path in list(dirs_data.keys()):
+        while dir_path != root_dir:
+            parent_path = os.path.dirname(dir_path) or os.curdir
+            if parent_path == dir_path:
+                ## reached filesystem root - file outside of root directory
+                break
+            if parent_path in dirs_data:
+                break
+            dirs_data[parent_path] = {}
+            dir_path = parent_path
+
+    ## propagate totals from the deepest directories up to the root
+    depth_list = sorted(dirs_data.keys(), key=lambda item: item.count(os.sep), reverse=True)
+    for dir_path in depth_list:
+        if dir_path == root_dir:
+            continue
+        parent_path = os.path.dirname(dir_path) or os.curdir
+        parent_dict = dirs_data.get(parent_path)
+        if parent_dict is None:
+            continue
+        for language, counts in dirs_data[dir_path].items():
+            parent_counts = parent_dict.get(language)
+            if parent_counts is None:
+                parent_dict[language] = counts.copy()
+            else:
+                for index in range(0, 4):
+                    parent_counts[index] += counts[index]
+
+    return dirs_data
 
 
 def parse_cloc_file(file_path):
@@ -0,0 +1,129 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+import re
+import sys
+from array import array
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## number of counters per language: files, blank, comment, code
+COUNTERS_NUM = 4
+
+TABLE_ROW_REGEX = re.compile(r"^(.*?)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s*$")
+
+
+##
+class ClocResult:
+    """Compact counts of directory.
+
+    Languages are stored in tuple of (interned) names, counters in flat array:
+    [files, blank, comment, code] for each language, ordered by code lines.
+    """
+
+    __slots__ = ("languages", "counts", "code")
+
+    def __init__(self, languages=(), counts=None):
+        self.languages = languages
+        if counts is None:
+            counts = array("q")
+        self.counts = counts
+        self.code = sum(counts[COUNTERS_NUM - 1 :: COUNTERS_NUM])
+
+    @staticmethod
+    def from_lang_dict(lang_dict):
+        """Create object from dict: language -> [files, blank, comment, code]."""
+        ## cloc orders languages by code lines
+        lang_list = sorted(lang_dict.items(), key=lambda item: (-item[1][3], item[0]))
+        languages = tuple(sys.intern(item[0]) for item in lang_list)
+        counts = array("q")
+        for _, lang_counts in lang_list:
+            counts.extend(lang_counts)
+        return ClocResult(languages, counts)
+
+    @staticmethod
+    def from_cloc_json(content_dict):
+        """Create object from output of cloc in '--json' mode."""
+        lang_dict = {}
+        for language, lang_data in content_dict.items():
+            if language in ("header", "SUM"):
+                continue
+            lang_dict[language] = [lang_data["nFiles"], lang_data["blank"], lang_data["comment"], lang_data["code"]]
+        return ClocResult.from_lang_dict(lang_dict)
+
+    @staticmethod
+    def from_cloc_table(content):
+        """Create object from text table printed by cloc."""
+        lang_dict = {}
+        separators = 0
+        for line in content.splitlines():
+            if line.startswith("----------"):
+                separators += 1
+                continue
+            if separators != 2:
+                ## language rows are placed between second and third separator
+                continue
+            matched = TABLE_ROW_REGEX.match(line)
+            if matched is None:
+                _LOGGER.warning("invalid state for line: %s", line)
+                continue
+            lang_dict[matched.group(1)] = [int(matched.group(index)) for index in range(2, 6)]
+        return ClocResult.from_lang_dict(lang_dict)
+
+    def get_lang_dict(self):
+        ret_dict = {}
+        for index, language in enumerate(self.languages):
+            start = index * COUNTERS_NUM
+            ret_dict[language] = list(self.counts[start : start + COUNTERS_NUM])
+        return ret_dict
+
+    def get_sum(self):
+        """Return list of summed counters: [files, blank, comment, code]."""
+        return [sum(self.counts[index::COUNTERS_NUM]) for index in range(0, COUNTERS_NUM)]
+
+    def to_text(self):
+        """Render counts in form of cloc text table."""
+        return format_cloc_raw(self.get_lang_dict())
+
+    ## required for JSON serialization
+    def toJSON(self):  # pylint: disable=C0103
+        return {"code": self.code, "languages": self.get_lang_dict()}
+
+    def __eq__(self, other):
+        if not isinstance(other, ClocResult):
+            return False
+        return self.languages == other.languages and self.counts == other.counts
+
+    def __repr__(self):
+        return f"ClocResult({self.get_lang_dict()})"
+
+
+def format_cloc_raw(lang_dict):
+    """Render language counts in form of cloc text table."""
+    separator = "-" * 80
+    lines = [separator]
+    lines.append(f"{'Language':<25}{'files':>10}{'blank':>15}{'comment':>15}{'code':>15}")
+    lines.append(separator)
+    sum_counts = [0, 0, 0, 0]
+    ## cloc orders languages by code lines
+    lang_list = sorted(lang_dict.items(), key=lambda item: (-item[1][3], item[0]))
+    for language, counts in lang_list:
+        lines.append(f"{language:<25}{counts[0]:>10}{counts[1]:>15}{counts[2]:>15}{counts[3]:>15}")
+        for index in range(0, 4):
+            sum_counts[index] += counts[index]
+    lines.append(separator)
+    lines.append(f"{'SUM:':<25}{sum_counts[0]:>10}{sum_counts[1]:>15}{sum_counts[2]:>15}{sum_counts[3]:>15}")
+    lines.append(separator)
+    return "\n".join(lines)
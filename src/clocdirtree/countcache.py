@@ -0,0 +1,166 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+import hashlib
+import sqlite3
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+CACHE_FILE_NAME = "clocdirtree-cache.sqlite"
+
+
+## calculate hash of file content
+def file_hash(file_path):
+    hash_obj = hashlib.sha1(usedforsecurity=False)
+    with open(file_path, "rb") as content_file:
+        while True:
+            chunk = content_file.read(1048576)
+            if not chunk:
+                break
+            hash_obj.update(chunk)
+    return hash_obj.hexdigest()
+
+
+##
+class FileCountCache:
+    """Persistent storage of per-file counts.
+
+    Entries are identified by absolute path and validated by file size, modification time
+    and content hash. Files ignored by cloc are stored with empty language.
+    """
+
+    def __init__(self, db_path, params_key=""):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, hash TEXT,"
+            " language TEXT, blank INTEGER, comment INTEGER, code INTEGER)"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        stored_params = self.get_meta("params")
+        if stored_params != params_key:
+            ## counts depend on cloc parameters (e.g. included languages) - drop outdated entries
+            if stored_params is not None:
+                _LOGGER.info("cloc parameters changed - clearing cache: %s", db_path)
+            self.connection.execute("DELETE FROM files")
+            self.connection.execute("DELETE FROM meta")
+            self.set_meta("params", params_key)
+        self.connection.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        if self.connection is None:
+            return
+        self.connection.commit()
+        self.connection.close()
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_meta(self, key):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def set_meta(self, key, value):
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    ## returns tuple (language, blank, comment, code) or None if file is not cached or changed
+    ## language is None for files ignored by cloc
+    def lookup(self, file_path, stat_result=None):
+        abs_path = os.path.abspath(file_path)
+        row = self.connection.execute(
+            "SELECT size, mtime, hash, language, blank, comment, code FROM files WHERE path = ?", (abs_path,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        if stat_result is None:
+            stat_result = os.stat(file_path)
+        if row[0] != stat_result.st_size:
+            self.misses += 1
+            return None
+        if row[1] != stat_result.st_mtime_ns:
+            ## file touched - compare content
+            if row[2] != file_hash(file_path):
+                self.misses += 1
+                return None
+            self.connection.execute(
+                "UPDATE files SET mtime = ? WHERE path = ?", (stat_result.st_mtime_ns, abs_path)
+            )
+        self.hits += 1
+        language = row[3]
+        if not language:
+            return (None, 0, 0, 0)
+        return (language, row[4], row[5], row[6])
+
+    ## returns list of given files which are not cached, changed or removed (validated by size and modification time)
+    def get_changed(self, files_list):
+        ret_list = []
+        for file_path in files_list:
+            try:
+                stat_result = os.stat(file_path)
+            except FileNotFoundError:
+                ret_list.append(file_path)
+                continue
+            if self.lookup(file_path, stat_result) is None:
+                ret_list.append(file_path)
+        return ret_list
+
+    ## returns counts of all counted files under given directory (files ignored by cloc are skipped)
+    ## paths of returned files are joined with given directory
+    def load_dir(self, root_dir):
+        abs_root = os.path.abspath(root_dir)
+        prefix = os.path.join(abs_root, "")
+        rows = self.connection.execute(
+            "SELECT path, language, blank, comment, code FROM files WHERE substr(path, 1, ?) = ? AND language != ''",
+            (len(prefix), prefix),
+        )
+        ret_dict = {}
+        for row in rows:
+            rel_path = row[0][len(prefix) :]
+            file_path = os.path.normpath(os.path.join(root_dir, rel_path))
+            ret_dict[file_path] = (row[1], row[2], row[3], row[4])
+        return ret_dict
+
+    ## store counts of files: dict file path -> (language, blank, comment, code) or None
+    def store(self, files_dict):
+        rows = []
+        for file_path, counts in files_dict.items():
+            try:
+                stat_result = os.stat(file_path)
+                content_hash = file_hash(file_path)
+            except OSError:
+                _LOGGER.warning("unable to read file: %s", file_path)
+                continue
+            if counts is None or counts[0] is None:
+                counts = ("", 0, 0, 0)
+            abs_path = os.path.abspath(file_path)
+            rows.append((abs_path, stat_result.st_size, stat_result.st_mtime_ns, content_hash, *counts))
+        self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.connection.commit()
+
+    def remove(self, files_list):
+        rows = [(os.path.abspath(file_path),) for file_path in files_list]
+        self.connection.executemany("DELETE FROM files WHERE path = ?", rows)
+        self.connection.commit()
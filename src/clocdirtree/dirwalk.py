@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+from multiprocessing.pool import ThreadPool as Pool
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+## directories of version control systems - always skipped by cloc
+VCS_DIR_NAMES = {".git", ".svn", ".hg", ".bzr", "CVS"}
+
+
+def walk_tree(start_dir, exclude_filter=None, jobs=1):
+    """Walk directories tree and return dict: directory path -> number of files directly inside the directory.
+
+    Excluded directories and directories of version control systems are not entered, so whole
+    subtrees are skipped (the same as cloc does). Symbolic links to
+    directories are listed, but not entered (same as 'os.walk'). Directories are ordered parent first.
+    If 'jobs' is greater than 1, then top level subtrees are walked in parallel threads.
+    """
+    if exclude_filter is not None and exclude_filter.excluded(start_dir):
+        return {}
+
+    files_count, sub_dirs = scan_dir(start_dir, exclude_filter)
+    ret_dict = {start_dir: files_count}
+    walk_list = []
+    for entry in sub_dirs:
+        if entry.is_symlink():
+            ret_dict[entry.path] = 0
+            continue
+        walk_list.append(entry.path)
+
+    if jobs is None or jobs > 1:
+        with Pool(processes=jobs) as walk_pool:
+            results_list = walk_pool.map(walk_subtree, [(dir_path, exclude_filter) for dir_path in walk_list])
+    else:
+        results_list = [walk_subtree((dir_path, exclude_filter)) for dir_path in walk_list]
+
+    for sub_dict in results_list:
+        ret_dict.update(sub_dict)
+    return ret_dict
+
+
+## walk subtree iteratively in pre-order, argument is tuple (directory path, exclude filter)
+def walk_subtree(walk_args):
+    top_dir, exclude_filter = walk_args
+    ret_dict = {}
+    stack = [top_dir]
+    while stack:
+        dir_path = stack.pop()
+        files_count, sub_dirs = scan_dir(dir_path, exclude_filter)
+        ret_dict[dir_path] = files_count
+        for entry in reversed(sub_dirs):
+            if entry.is_symlink():
+                ## do not follow links - the same as 'os.walk'
+                ret_dict[entry.path] = 0
+                continue
+            stack.append(entry.path)
+    return ret_dict
+
+
+## returns tuple: (number of files, list of not excluded subdirectories entries)
+def scan_dir(dir_path, exclude_filter=None):
+    files_count = 0
+    sub_dirs = []
+    try:
+        with os.scandir(dir_path) as dir_iter:
+            for entry in dir_iter:
+                try:
+                    ## entry type is taken from directory listing - no additional 'stat' call
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if not is_dir:
+                    files_count += 1
+                    continue
+                if entry.name in VCS_DIR_NAMES:
+                    continue
+                if exclude_filter is not None and exclude_filter.excluded(entry.path):
+                    continue
+                sub_dirs.append(entry)
+    except OSError as exc:
+        _LOGGER.warning("unable to list directory %s: %s", dir_path, exc)
+    return files_count, sub_dirs
+
+
+## check if path is inside directory of version control system
+def is_vcs_path(path):
+    return not VCS_DIR_NAMES.isdisjoint(path.split(os.sep))
+
+
+def get_subtree_sizes(dirs_dict):
+    """Sum number of files of directories bottom-up, returns dict: directory path -> number of files in subtree.
+
+    Expects dict ordered parent first, as returned by 'walk_tree'.
+    """
+    ret_dict = dict(dirs_dict)
+    for dir_path in reversed(list(ret_dict.keys())):
+        parent_path = os.path.dirname(dir_path)
+        if parent_path in ret_dict and parent_path != dir_path:
+            ret_dict[parent_path] += ret_dict[dir_path]
+    return ret_dict
@@ -16,32 +16,135 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _LOGGER = logging.getLogger(__name__)
 
 
+## convert wildcard pattern to regex: '*' matches any string (including '/'), '?' matches any character except '/'
+def wildcard_to_regex(pattern):
+    regex_parts = []
+    for part in re.split(r"([*?])", pattern):
+        if part == "*":
+            regex_parts.append(".*")
+        elif part == "?":
+            regex_parts.append("[^/]")
+        elif part:
+            regex_parts.append(re.escape(part))
+    return "".join(regex_parts)
+
+
+def is_wildcard(pattern):
+    return "*" in pattern or "?" in pattern
+
+
+## convert exclude patterns to regex for cloc ('--not-match-d' and '--not-match-f' with '--fullpath')
+## matching the same paths as 'ExcludeItemFilter', returns None if there are no patterns
+def exclude_to_cloc_regex(exclude_list):
+    regex_list = []
+    for item in sorted(set(exclude_list)):
+        if not item:
+            continue
+        if is_wildcard(item):
+            regex_list.append(wildcard_to_regex(item))
+        else:
+            ## literal path excludes also its content
+            regex_list.append(re.escape(item) + "(?:/|$)")
+    if not regex_list:
+        return None
+    return "^(?:" + "|".join(regex_list) + ")"
+
+
 ##
 class ExcludeItemFilter:
+    """Filter of excluded paths.
+
+    Wildcard patterns are compiled into one regex matched against beginning of path, so pattern
+    excludes also paths starting with matching string (e.g. '*/build' excludes '/src/build/aaa'
+    and '/src/buildx'). Literal paths are stored in set and in prefix tree of path components,
+    so checking if any parent of path is excluded takes time proportional to path depth.
+    """
+
     def __init__(self, exclude_set=None):
+        if exclude_set is None:
+            exclude_set = []
         self.raw_exclude = set(exclude_set)
         for item in self.raw_exclude.copy():
             if len(item) < 1:
                 self.raw_exclude.remove(item)
 
         self.exclude_set = set()
-        self.regex_set = set()
+        ## nested dicts of path components, None key marks excluded path
+        self.exclude_trie = {}
+        self.regex = None
 
-        for excl in self.raw_exclude:
-            if "*" in excl:
+        regex_list = []
+        for excl in sorted(self.raw_exclude):
+            if is_wildcard(excl):
                 ## wildcard found
-                pattern = excl
-                pattern = pattern.replace("*", ".*")
-                regex_obj = re.compile(pattern)
-                self.regex_set.add(regex_obj)
+                regex_list.append(wildcard_to_regex(excl))
             else:
                 self.exclude_set.add(excl)
+                self._add_to_trie(excl)
+
+        if regex_list:
+            pattern = "|".join(f"(?:{item})" for item in regex_list)
+            self.regex = re.compile(pattern, re.DOTALL)
+
+    def _add_to_trie(self, path):
+        node = self.exclude_trie
+        for component in path.split("/"):
+            node = node.setdefault(component, {})
+        node[None] = True
 
     ## is item excluded?
     def excluded(self, item):
         if item in self.exclude_set:
             return True
-        for regex in self.regex_set:
-            if regex.match(item):
-                return True
+        if self.regex is not None and self.regex.match(item):
+            return True
         return False
+
+    ## is directory or any of its parents (up to given root directory) excluded?
+    def excluded_tree(self, dir_path, root_dir):
+        if self.exclude_trie:
+            ## parents above root directory are not taken into account
+            root_depth = len(root_dir.split("/"))
+            node = self.exclude_trie
+            for depth, component in enumerate(dir_path.split("/"), start=1):
+                node = node.get(component)
+                if node is None:
+                    break
+                if None in node and depth >= root_depth:
+                    return True
+
+        if self.regex is None:
+            return False
+        ## pattern matching beginning of parent path matches also the path
+        return self.regex.match(dir_path) is not None
+
+
+def load_exclude_file(file_path, root_dir):
+    """Load exclude patterns from file in gitignore syntax.
+
+    Patterns without slash match file or directory on any level, other patterns are relative
+    to given root directory. Negated patterns ('!') are not supported and are skipped.
+    """
+    ret_list = []
+    with open(file_path, "r", encoding="utf-8") as content_file:
+        for line in content_file:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("!"):
+                _LOGGER.warning("negated exclude patterns are not supported, skipping: %s", line)
+                continue
+            if line.startswith("\\"):
+                ## escaped first character ('\#' or '\!')
+                line = line[1:]
+            line = line.rstrip("/")
+            if not line:
+                continue
+            ## '*' matches also '/'
+            line = line.replace("**", "*")
+            if "/" in line:
+                line = line.lstrip("/")
+                ret_list.append(root_dir.rstrip("/") + "/" + line)
+            else:
+                ret_list.append("*/" + line)
+    return ret_list
@@ -0,0 +1,250 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Machine-readable export of counted directories.
+##
+## 'jsonl' format: one JSON object per line: {"path": ..., "code": ..., "languages": {language: [files, blank,
+## comment, code]}}.
+##
+## 'npy' format: directory of columns stored in NumPy '.npy' files (readable by 'numpy.load(mmap_mode="r")'
+## or by 'load_column' without numpy):
+##  - path_offsets, path_data - UTF-8 paths of directories, path of directory 'i' is
+##    'path_data[path_offsets[i]:path_offsets[i + 1]]'
+##  - dir_code - code lines of directories
+##  - lang_offsets - rows of languages of directory 'i' are 'lang_offsets[i]:lang_offsets[i + 1]'
+##  - lang_id, files, blank, comment, code - rows of languages, 'lang_id' is index in 'languages.json'
+##
+
+import os
+import logging
+
+import sys
+import json
+import mmap
+import ast
+from array import array
+
+from clocdirtree.clocresult import ClocResult
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+EXPORT_FORMATS = ["jsonl", "npy"]
+
+JSONL_FILE_NAME = "tree.jsonl"
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+## space reserved for header, so shape can be written after all rows are known
+NPY_HEADER_SIZE = 128
+
+## array type code -> numpy type description
+NPY_TYPES_DICT = {
+    "q": ("<" if sys.byteorder == "little" else ">") + "i8",
+    "B": "|u1",
+}
+
+LANG_COLUMNS = ["lang_id", "files", "blank", "comment", "code"]
+
+
+def get_export_path(dir_path, root_dir):
+    if dir_path == root_dir:
+        return "."
+    rel_path = dir_path.removeprefix(root_dir).lstrip(os.sep)
+    return rel_path.replace(os.sep, "/")
+
+
+## inverse of 'get_export_path'
+def get_import_path(export_path, root_dir):
+    if export_path == ".":
+        return root_dir
+    return os.path.join(root_dir, export_path.replace("/", os.sep))
+
+
+def export_results(results_iter, out_dir, formats_list, root_dir):
+    """Write results of directories to given formats while passing them through.
+
+    'results_iter' yields tuples (directory path, ClocResult), directories without code are not exported.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    writers_list = []
+    if "jsonl" in formats_list:
+        writers_list.append(JsonLinesWriter(os.path.join(out_dir, JSONL_FILE_NAME)))
+    if "npy" in formats_list:
+        writers_list.append(ColumnsWriter(os.path.join(out_dir, "columns")))
+    try:
+        for dir_path, result in results_iter:
+            if result.code > 0:
+                export_path = get_export_path(dir_path, root_dir)
+                for writer in writers_list:
+                    writer.write(export_path, result)
+            yield dir_path, result
+    finally:
+        for writer in writers_list:
+            writer.close()
+
+
+##
+class JsonLinesWriter:
+    """Writes one JSON object per directory."""
+
+    def __init__(self, file_path):
+        _LOGGER.info("exporting results to: %s", file_path)
+        self.out_file = open(file_path, "w", encoding="utf-8")  # pylint: disable=R1732
+
+    def write(self, export_path, result):
+        item_dict = {"path": export_path, "code": result.code, "languages": result.get_lang_dict()}
+        self.out_file.write(json.dumps(item_dict))
+        self.out_file.write("\n")
+
+    def close(self):
+        if self.out_file is None:
+            return
+        self.out_file.close()
+        self.out_file = None
+
+
+##
+class NpyColumnWriter:
+    """Appends values to one-dimensional '.npy' file, shape is written on close."""
+
+    def __init__(self, file_path, type_code="q", buffer_size=65536):
+        self.file_path = file_path
+        self.type_code = type_code
+        self.buffer_size = buffer_size
+        self.buffer = array(type_code)
+        self.size = 0
+        self.out_file = open(file_path, "wb")  # pylint: disable=R1732
+        self.out_file.write(self._prepare_header())
+
+    def _prepare_header(self):
+        descr = NPY_TYPES_DICT[self.type_code]
+        header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({self.size},), }}"
+        header_len = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2
+        header = header.ljust(header_len - 1) + "\n"
+        return NPY_MAGIC + header_len.to_bytes(2, "little") + header.encode("latin1")
+
+    def append(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def extend(self, values):
+        self.buffer.extend(values)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.size += len(self.buffer)
+        self.buffer.tofile(self.out_file)
+        self.buffer = array(self.type_code)
+
+    def close(self):
+        if self.out_file is None:
+            return
+        self.flush()
+        self.out_file.seek(0)
+        self.out_file.write(self._prepare_header())
+        self.out_file.close()
+        self.out_file = None
+
+
+##
+class ColumnsWriter:
+    """Writes directories and their languages counts to columns of '.npy' files."""
+
+    def __init__(self, out_dir):
+        _LOGGER.info("exporting results to: %s", out_dir)
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.languages_dict = {}
+        self.path_data = NpyColumnWriter(os.path.join(out_dir, "path_data.npy"), "B")
+        self.path_offsets = NpyColumnWriter(os.path.join(out_dir, "path_offsets.npy"))
+        self.dir_code = NpyColumnWriter(os.path.join(out_dir, "dir_code.npy"))
+        self.lang_offsets = NpyColumnWriter(os.path.join(out_dir, "lang_offsets.npy"))
+        self.lang_columns = [NpyColumnWriter(os.path.join(out_dir, f"{name}.npy")) for name in LANG_COLUMNS]
+        self.path_offset = 0
+        self.lang_offset = 0
+        self.path_offsets.append(0)
+        self.lang_offsets.append(0)
+
+    def write(self, export_path, result):
+        path_bytes = export_path.encode("utf-8")
+        self.path_data.extend(path_bytes)
+        self.path_offset += len(path_bytes)
+        self.path_offsets.append(self.path_offset)
+        self.dir_code.append(result.code)
+
+        lang_ids = self.lang_columns[0]
+        for index, language in enumerate(result.languages):
+            lang_id = self.languages_dict.setdefault(language, len(self.languages_dict))
+            lang_ids.append(lang_id)
+            start = index * 4
+            for column_index in range(0, 4):
+                self.lang_columns[column_index + 1].append(result.counts[start + column_index])
+        self.lang_offset += len(result.languages)
+        self.lang_offsets.append(self.lang_offset)
+
+    def close(self):
+        if self.path_data is None:
+            return
+        for writer in [self.path_data, self.path_offsets, self.dir_code, self.lang_offsets, *self.lang_columns]:
+            writer.close()
+        self.path_data = None
+        languages_path = os.path.join(self.out_dir, "languages.json")
+        with open(languages_path, "w", encoding="utf-8") as out_file:
+            json.dump(list(self.languages_dict.keys()), out_file)
+
+
+def load_jsonl(file_path, skip_results=False):
+    """Read 'jsonl' export line by line, yields tuples (exported path, ClocResult or None if 'skip_results')."""
+    with open(file_path, "r", encoding="utf-8") as in_file:
+        for line in in_file:
+            if not line.strip():
+                continue
+            item_dict = json.loads(line)
+            if skip_results:
+                yield item_dict["path"], None
+                continue
+            yield item_dict["path"], ClocResult.from_lang_dict(item_dict["languages"])
+
+
+def load_column(file_path):
+    """Memory-map '.npy' column written by 'NpyColumnWriter', returns memoryview of values."""
+    with open(file_path, "rb") as in_file:
+        data = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[: len(NPY_MAGIC)] != NPY_MAGIC:
+        raise ValueError(f"invalid npy file: {file_path}")
+    header_len = int.from_bytes(data[len(NPY_MAGIC) : len(NPY_MAGIC) + 2], "little")
+    data_offset = len(NPY_MAGIC) + 2 + header_len
+    header_dict = ast.literal_eval(data[len(NPY_MAGIC) + 2 : data_offset].decode("latin1"))
+    for type_code, descr in NPY_TYPES_DICT.items():
+        if descr == header_dict["descr"]:
+            return memoryview(data)[data_offset:].cast(type_code)
+    raise ValueError(f"unsupported type {header_dict['descr']} of npy file: {file_path}")
+
+
+def load_columns(columns_dir):
+    """Memory-map all columns of 'npy' export, returns dict: column name -> memoryview, 'languages' -> list."""
+    ret_dict = {}
+    for file_name in sorted(os.listdir(columns_dir)):
+        name, extension = os.path.splitext(file_name)
+        if extension == ".npy":
+            ret_dict[name] = load_column(os.path.join(columns_dir, file_name))
+    with open(os.path.join(columns_dir, "languages.json"), "r", encoding="utf-8") as in_file:
+        ret_dict["languages"] = json.load(in_file)
+    return ret_dict
+
+
+## returns path of directory with given index from loaded columns
+def get_column_path(columns_dict, index):
+    path_offsets = columns_dict["path_offsets"]
+    return bytes(columns_dict["path_data"][path_offsets[index] : path_offsets[index + 1]]).decode("utf-8")
@@ -0,0 +1,101 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+import subprocess  # nosec
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def execute_git(repo_dir, args_list):
+    command = ["git", "-C", repo_dir]
+    command.extend(args_list)
+    _LOGGER.debug("executing git: %s", command)
+    try:
+        result = subprocess.run(command, capture_output=True, check=True)  # nosec
+    except subprocess.CalledProcessError as exc:
+        output = exc.stderr.decode("utf-8")
+        _LOGGER.error("git error: %s", output)
+        raise
+    return result.stdout.decode("utf-8")
+
+
+## returns hash of HEAD commit or None if given directory is not inside git repository
+def get_head_revision(repo_dir):
+    try:
+        output = execute_git(repo_dir, ["rev-parse", "HEAD"])
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip()
+
+
+## returns hash of commit of given revision or None if revision is unknown
+def resolve_revision(repo_dir, rev):
+    try:
+        output = execute_git(repo_dir, ["rev-parse", "--verify", "--quiet", rev + "^{commit}"])
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip()
+
+
+def get_changed_files(repo_dir, since_rev):
+    """Return paths of files changed since given revision (including deleted and untracked files).
+
+    Paths are joined with given directory.
+    """
+    output = execute_git(repo_dir, ["diff", "--name-only", "--relative", "--no-renames", "-z", since_rev, "--"])
+    changed_list = output.split("\0")
+    output = execute_git(repo_dir, ["ls-files", "--others", "--exclude-standard", "-z"])
+    changed_list.extend(output.split("\0"))
+    return join_paths(repo_dir, changed_list)
+
+
+## returns paths of files tracked by git, paths are joined with given directory
+def get_tracked_files(repo_dir):
+    output = execute_git(repo_dir, ["ls-files", "-z"])
+    return join_paths(repo_dir, output.split("\0"))
+
+
+def get_ignored_files(repo_dir, skip_dir=None):
+    """Return paths of untracked files ignored by git, paths are joined with given directory.
+
+    Untracked directories are listed by git as single entries. Such directory is skipped if 'skip_dir'
+    returns True for its path, otherwise its files are listed (skipping subdirectories the same way).
+    """
+    output = execute_git(repo_dir, ["ls-files", "--others", "--ignored", "--exclude-standard", "--directory", "-z"])
+    files_list = []
+    for item in output.split("\0"):
+        if not item:
+            continue
+        item_path = os.path.normpath(os.path.join(repo_dir, item))
+        if not item.endswith("/"):
+            files_list.append(item_path)
+            continue
+        if skip_dir is not None and skip_dir(item_path):
+            continue
+        for root, dirs, files in os.walk(item_path):
+            if skip_dir is not None:
+                dirs[:] = [name for name in dirs if not skip_dir(os.path.join(root, name))]
+            files_list.extend(os.path.join(root, name) for name in files)
+    return list(dict.fromkeys(files_list))
+
+
+## join paths with directory, keep order and remove duplicates
+def join_paths(repo_dir, paths_list):
+    ret_dict = {}
+    for item in paths_list:
+        if not item:
+            continue
+        file_path = os.path.normpath(os.path.join(repo_dir, item))
+        ret_dict[file_path] = None
+    return list(ret_dict.keys())
@@ -10,9 +10,13 @@ import os
 import logging
 
 import math
+import subprocess  # nosec
 
 from showgraph.graphviz import Graph, get_node_label, unquote_name
-from clocdirtree.io import prepare_filesystem_name
+from clocdirtree.io import prepare_filesystem_name, get_temp_path, commit_temp_files
+from clocdirtree.treebuilder import build_tree
+from clocdirtree.circlepack import render_pack
+from clocdirtree.runstats import get_run_stats
 
 # from showgraph.io import prepare_filesystem_name
 
@@ -22,9 +26,15 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _LOGGER = logging.getLogger(__name__)
 
 
+GRAPH_ENGINE = "neato"
+
+## maximum width of node (in inches)
+NODE_MAX_SIZE = 8
+
+
 def generate_graph(cloc_dict) -> Graph:
     dot_graph = Graph()
-    dot_graph.setEngine("neato")
+    dot_graph.setEngine(GRAPH_ENGINE)
     base_graph = dot_graph.base_graph
     base_graph.set_type("digraph")
     #     base_graph.set_rankdir( 'LR' )
@@ -36,13 +46,31 @@ def generate_graph(cloc_dict) -> Graph:
         else:
             lines_dict[key] = val
 
+    width_dict = calculate_nodes_widths(lines_dict)
+    if not width_dict:
+        return dot_graph
+
+    ## generate main graph
+    for name, lines_num in lines_dict.items():
+        node = dot_graph.addNode(name, shape="circle")
+        node.set("label", f"{name}\n{lines_num}")
+        # node  = dot_graph.addNode( f"{name}\n{lines_num}", shape="circle" )
+        width = width_dict[name]
+        node.set("width", width)
+        node.set("fixedsize", "true")
+        node.set("color", "gray")
+
+    return dot_graph
+
+
+## returns dict: node name -> width of node (in inches), None if there is nothing to draw
+def calculate_nodes_widths(lines_dict):
     max_val = -1
     for key, val in lines_dict.items():
         max_val = max(max_val, val)
     if max_val < 1:
-        return dot_graph
+        return None
 
-    MAX_SIZE = 8
     width_dict = {}
     for key, val in lines_dict.items():
         #### make circles areas proportional
@@ -55,38 +83,94 @@ def generate_graph(cloc_dict) -> Graph:
         ## sqrt( val / max ) = w / W
         ## w = sqrt( val / max ) * W
         factor = float(val) / max_val
-        new_val = math.sqrt(factor) * MAX_SIZE
+        new_val = math.sqrt(factor) * NODE_MAX_SIZE
         width_dict[key] = new_val
+    return width_dict
 
-    ## generate main graph
-    for name, lines_num in lines_dict.items():
-        node = dot_graph.addNode(name, shape="circle")
-        node.set("label", f"{name}\n{lines_num}")
-        # node  = dot_graph.addNode( f"{name}\n{lines_num}", shape="circle" )
-        width = width_dict[name]
-        node.set("width", width)
-        node.set("fixedsize", "true")
-        node.set("color", "gray")
 
-    return dot_graph
+def generate_pack_graph(lines_dict, local_dir, graph_name, links_dict=None):
+    """Layout nodes by built-in circle packing (without graphviz).
+
+    Returns tuple (SVG content, HTML map content) or None if there is nothing to draw.
+    Circles have the same sizes and links as nodes of graph returned by 'generate_graph'.
+    'links_dict' (name -> url) overrides links prepared from 'local_dir'.
+    """
+    width_dict = calculate_nodes_widths(lines_dict)
+    if not width_dict:
+        return None
+    nodes_list = []
+    for name, lines_num in lines_dict.items():
+        ## radius in pixels (72 per inch - the same as in graphviz SVG)
+        radius = width_dict[name] * 72 / 2
+        if links_dict is not None:
+            node_url = links_dict[name]
+        else:
+            node_url = local_dir + prepare_filesystem_name(name) + ".html"
+        nodes_list.append(([name, str(lines_num)], radius, node_url, f"node: {name}"))
+    run_stats = get_run_stats()
+    run_stats.add("graphs_rendered")
+    with run_stats.measure("pack"):
+        return render_pack(nodes_list, graph_name)
 
 
-def store_graph_to_html(graph: Graph, output_dir):
+## item_filename - name of output files (without extension), if None then it is prepared from name of graph
+def store_graph_to_html(graph: Graph, output_dir, item_filename=None):
     if graph.empty():
         ## empty graph -- do not store
         return
-    graph_name = graph.getName()
-    item_filename = prepare_filesystem_name(graph_name)
+    if item_filename is None:
+        graph_name = graph.getName()
+        item_filename = prepare_filesystem_name(graph_name)
 
     # data_out = os.path.join( output_dir, item_filename + ".gv.txt" )
     # graph.writeRAW( data_out )
-    data_out = os.path.join(output_dir, item_filename + ".png")
-    graph.writePNG(data_out)
-    data_out = os.path.join(output_dir, item_filename + ".map")
-    graph.writeMap(data_out)
-
-
-def set_node_html_attribs(graph, local_dir, filter_nodes=None):
+    png_out = os.path.join(output_dir, item_filename + ".png")
+    map_out = os.path.join(output_dir, item_filename + ".map")
+    ## graphviz writes temporary files, so interrupted run does not leave partially written files
+    files_list = [(get_temp_path(png_out), png_out), (get_temp_path(map_out), map_out)]
+
+    ## layout graph once and write both image and map
+    command = [GRAPH_ENGINE, "-Tpng", "-o", files_list[0][0], "-Tcmapx", "-o", files_list[1][0]]
+    try:
+        execute_graphviz(command, graph)
+    except BaseException:
+        commit_temp_files(files_list, success=False)
+        raise
+    commit_temp_files(files_list)
+
+
+def render_graph_svg(graph: Graph):
+    """Layout graph and return SVG content (with links of nodes) ready to be inlined into HTML page."""
+    if graph.empty():
+        return None
+    command = [GRAPH_ENGINE, "-Tsvg"]
+    content = execute_graphviz(command, graph)
+    ## skip XML prolog and doctype - not allowed inside HTML
+    svg_pos = content.find("<svg")
+    if svg_pos > 0:
+        content = content[svg_pos:]
+    return content
+
+
+## run graphviz with graph passed through standard input, returns standard output
+def execute_graphviz(command, graph: Graph):
+    graph_data = graph.toString()
+    run_stats = get_run_stats()
+    run_stats.add("graphs_rendered")
+    try:
+        with run_stats.measure("graphviz"):
+            result = subprocess.run(  # nosec
+                command, input=graph_data.encode("utf-8"), capture_output=True, check=True
+            )
+    except subprocess.CalledProcessError as exc:
+        output = exc.stderr.decode("utf-8")
+        _LOGGER.error("graphviz error: %s", output)
+        raise
+    return result.stdout.decode("utf-8")
+
+
+## links_dict - dict: node name -> url, if None then url is prepared from 'local_dir' and node name
+def set_node_html_attribs(graph, local_dir, filter_nodes=None, links_dict=None):
     all_nodes = graph.getNodesAll()
     for node_obj in all_nodes:
         node_name = node_obj.get_name()
@@ -96,33 +180,30 @@ def set_node_html_attribs(graph, local_dir, filter_nodes=None):
                 continue
         node_label = get_node_label(node_obj)
         node_obj.set("tooltip", "node: " + node_label)
-        node_filename = prepare_filesystem_name(raw_name)
-        node_url = local_dir + node_filename + ".html"
+        if links_dict is not None:
+            node_url = links_dict[raw_name]
+        else:
+            node_filename = prepare_filesystem_name(raw_name)
+            node_url = local_dir + node_filename + ".html"
         node_obj.set("href", node_url)
 
 
 def split_to_multi_dict(data_dict, split_string="/"):
-    def add_to_dict(container_dict, key_list, value):
-        if not key_list:
-            return
-
-        front_key = key_list.pop(0)
-        key_data = container_dict.get(front_key)
-        if key_data is None:
-            key_data = [None, {}]
-            container_dict[front_key] = key_data
-
-        if not key_list:
-            # bottom
-            key_data[0] = value
-        else:
-            sub_dict = key_data[1]
-            add_to_dict(sub_dict, key_list, value)
+    """Split paths to nested dicts: path item -> [value, dict of subitems].
 
+    Tree is built and converted iteratively, so depth of paths is not limited by recursion limit.
+    """
+    top_node = build_tree(data_dict, split_string)
     ret_dict = {}
-    for key, val in data_dict.items():
-        key_split = key.split(split_string)
-        add_to_dict(ret_dict, key_split, val)
+    stack = [(top_node, ret_dict)]
+    while stack:
+        node, container_dict = stack.pop()
+        if not node.children:
+            continue
+        for name, child_node in node.children.items():
+            sub_dict = {}
+            container_dict[name] = [child_node.value, sub_dict]
+            stack.append((child_node, sub_dict))
     return ret_dict
 
 
@@ -11,6 +11,8 @@ import logging
 
 import json
 
+from clocdirtree.runstats import get_run_stats
+
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -65,9 +67,36 @@ def write_dict(dict_obj, out_file, indent=None):
     write_file(out_file, content)
 
 
+## path of temporary file written in place of given file (in the same directory, so file can be renamed)
+def get_temp_path(file_path):
+    return f"{file_path}.{os.getpid()}.tmp"
+
+
+## replace files with temporary files, 'files_list' contains tuples (temporary path, target path)
+## if 'success' is False, then temporary files are removed
+def commit_temp_files(files_list, success=True):
+    for temp_path, file_path in files_list:
+        if success:
+            os.replace(temp_path, file_path)
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+## write content atomically: interrupted write does not leave partially written file
 def write_file(file_path, content):
-    with open(file_path, "w", encoding="utf-8") as content_file:
-        content_file.write(content)
+    run_stats = get_run_stats()
+    temp_path = get_temp_path(file_path)
+    with run_stats.measure("write"):
+        try:
+            with open(temp_path, "w", encoding="utf-8") as content_file:
+                content_file.write(content)
+                written_size = content_file.tell()
+        except BaseException:
+            commit_temp_files([(temp_path, file_path)], success=False)
+            raise
+        commit_temp_files([(temp_path, file_path)])
+    run_stats.add("files_written")
+    run_stats.add("bytes_written", written_size)
 
 
 def prepare_filesystem_name(name):
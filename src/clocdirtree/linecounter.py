@@ -0,0 +1,339 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Built-in counter of blank, comment and code lines - alternative to cloc.
+##
+## Classification of lines is simplified compared to cloc: string literals are not parsed,
+## so comment markers inside strings are treated as comments.
+##
+
+import os
+import logging
+
+import mmap
+import multiprocessing
+
+from clocdirtree.progress import ProgressTracker
+from clocdirtree.dirwalk import is_vcs_path
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+C_STYLE = (("//",), (("/*", "*/"),))
+HASH_STYLE = (("#",), ())
+XML_STYLE = ((), (("<!--", "-->"),))
+NO_COMMENTS = ((), ())
+
+
+## language name (the same as in cloc) -> (line comments markers, block comments markers)
+LANGUAGES_DICT = {
+    "Python": (("#",), (('"""', '"""'), ("'''", "'''"))),
+    "C": C_STYLE,
+    "C++": C_STYLE,
+    "C/C++ Header": C_STYLE,
+    "C#": C_STYLE,
+    "Java": C_STYLE,
+    "JavaScript": C_STYLE,
+    "TypeScript": C_STYLE,
+    "Go": C_STYLE,
+    "Rust": C_STYLE,
+    "Kotlin": C_STYLE,
+    "Swift": C_STYLE,
+    "Scala": C_STYLE,
+    "Dart": C_STYLE,
+    "SCSS": C_STYLE,
+    "PHP": (("//", "#"), (("/*", "*/"),)),
+    "CSS": ((), (("/*", "*/"),)),
+    "SQL": (("--",), (("/*", "*/"),)),
+    "Lua": (("--",), (("--[[", "]]"),)),
+    "Haskell": (("--",), (("{-", "-}"),)),
+    "PowerShell": (("#",), (("<#", "#>"),)),
+    "Bourne Shell": HASH_STYLE,
+    "Bourne Again Shell": HASH_STYLE,
+    "Perl": HASH_STYLE,
+    "Ruby": HASH_STYLE,
+    "R": HASH_STYLE,
+    "Julia": HASH_STYLE,
+    "YAML": HASH_STYLE,
+    "TOML": HASH_STYLE,
+    "make": HASH_STYLE,
+    "CMake": HASH_STYLE,
+    "Dockerfile": HASH_STYLE,
+    "INI": ((";", "#"), ()),
+    "DOS Batch": (("::", "REM ", "rem "), ()),
+    "Fortran 90": (("!",), ()),
+    "HTML": XML_STYLE,
+    "XML": XML_STYLE,
+    "Markdown": NO_COMMENTS,
+    "JSON": NO_COMMENTS,
+    "Text": NO_COMMENTS,
+    "reStructuredText": NO_COMMENTS,
+}
+
+EXTENSIONS_DICT = {
+    ".py": "Python",
+    ".pyw": "Python",
+    ".c": "C",
+    ".cpp": "C++",
+    ".cc": "C++",
+    ".cxx": "C++",
+    ".c++": "C++",
+    ".h": "C/C++ Header",
+    ".hh": "C/C++ Header",
+    ".hpp": "C/C++ Header",
+    ".hxx": "C/C++ Header",
+    ".cs": "C#",
+    ".java": "Java",
+    ".js": "JavaScript",
+    ".mjs": "JavaScript",
+    ".cjs": "JavaScript",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".kt": "Kotlin",
+    ".kts": "Kotlin",
+    ".swift": "Swift",
+    ".scala": "Scala",
+    ".dart": "Dart",
+    ".scss": "SCSS",
+    ".php": "PHP",
+    ".css": "CSS",
+    ".sql": "SQL",
+    ".lua": "Lua",
+    ".hs": "Haskell",
+    ".ps1": "PowerShell",
+    ".sh": "Bourne Shell",
+    ".bash": "Bourne Again Shell",
+    ".pl": "Perl",
+    ".pm": "Perl",
+    ".rb": "Ruby",
+    ".r": "R",
+    ".jl": "Julia",
+    ".yml": "YAML",
+    ".yaml": "YAML",
+    ".toml": "TOML",
+    ".mk": "make",
+    ".cmake": "CMake",
+    ".ini": "INI",
+    ".bat": "DOS Batch",
+    ".cmd": "DOS Batch",
+    ".f90": "Fortran 90",
+    ".html": "HTML",
+    ".htm": "HTML",
+    ".xml": "XML",
+    ".md": "Markdown",
+    ".json": "JSON",
+    ".txt": "Text",
+    ".rst": "reStructuredText",
+}
+
+FILENAMES_DICT = {
+    "Makefile": "make",
+    "makefile": "make",
+    "GNUmakefile": "make",
+    "CMakeLists.txt": "CMake",
+    "Dockerfile": "Dockerfile",
+}
+
+## interpreter in shebang line -> language
+SHEBANG_DICT = {
+    "python": "Python",
+    "python2": "Python",
+    "python3": "Python",
+    "sh": "Bourne Shell",
+    "dash": "Bourne Shell",
+    "bash": "Bourne Again Shell",
+    "perl": "Perl",
+    "ruby": "Ruby",
+    "node": "JavaScript",
+}
+
+
+## read first line of file if it is a shebang
+def read_shebang(data):
+    if not data.startswith(b"#!"):
+        return None
+    line_end = data.find(b"\n")
+    if line_end < 0:
+        line_end = len(data)
+    line = data[2:line_end].decode("utf-8", errors="replace")
+    items = line.split()
+    if not items:
+        return None
+    interpreter = os.path.basename(items[0])
+    if interpreter == "env" and len(items) > 1:
+        interpreter = items[1]
+    return SHEBANG_DICT.get(interpreter)
+
+
+## classify file by name or extension, returns language name or None
+def classify_file(file_path):
+    file_name = os.path.basename(file_path)
+    language = FILENAMES_DICT.get(file_name)
+    if language is not None:
+        return language
+    extension = os.path.splitext(file_name)[1].lower()
+    return EXTENSIONS_DICT.get(extension)
+
+
+def count_lines(lines_iter, language):
+    """Count blank, comment and code lines of given language, returns tuple (blank, comment, code)."""
+    line_markers, block_markers = LANGUAGES_DICT.get(language, NO_COMMENTS)
+    start_markers = [(marker, None) for marker in line_markers]
+    start_markers.extend(block_markers)
+
+    blank = 0
+    comment = 0
+    code = 0
+    block_end = None
+    for line in lines_iter:
+        line = line.strip()
+        if not line:
+            blank += 1
+            continue
+        has_code = False
+        has_comment = False
+        index = 0
+        line_len = len(line)
+        while index < line_len:
+            if block_end is not None:
+                has_comment = True
+                end_pos = line.find(block_end, index)
+                if end_pos < 0:
+                    break
+                index = end_pos + len(block_end)
+                block_end = None
+                continue
+
+            ## find the earliest (and the longest) comment marker
+            found_pos = -1
+            found_marker = None
+            for marker in start_markers:
+                marker_pos = line.find(marker[0], index)
+                if marker_pos < 0:
+                    continue
+                if found_pos < 0 or marker_pos < found_pos:
+                    found_pos = marker_pos
+                    found_marker = marker
+                elif marker_pos == found_pos and len(marker[0]) > len(found_marker[0]):
+                    found_marker = marker
+            if found_marker is None:
+                has_code = True
+                break
+            if found_pos > index and line[index:found_pos].strip():
+                has_code = True
+            has_comment = True
+            if found_marker[1] is None:
+                ## line comment
+                break
+            block_end = found_marker[1]
+            index = found_pos + len(found_marker[0])
+
+        if has_code:
+            code += 1
+        elif has_comment:
+            comment += 1
+        else:
+            blank += 1
+    return blank, comment, code
+
+
+def read_file_counts(file_path):
+    """Count lines of given file, returns tuple (language, blank, comment, code) or None if file is not recognized.
+
+    Raises OSError or ValueError if file cannot be read.
+    """
+    language = classify_file(file_path)
+    with open(file_path, "rb") as content_file:
+        file_size = os.fstat(content_file.fileno()).st_size
+        if file_size < 1:
+            ## empty files are ignored (the same as cloc)
+            return None
+        with mmap.mmap(content_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if language is None:
+                language = read_shebang(data[:256])
+                if language is None:
+                    return None
+            if data.find(b"\0", 0, 8192) >= 0:
+                ## binary file
+                return None
+            lines_iter = (line.decode("utf-8", errors="replace") for line in iter(data.readline, b""))
+            counts = count_lines(lines_iter, language)
+    return (language, *counts)
+
+
+## count lines of file, returns tuple (counts, error message)
+## errors are not logged here, because in worker process logging configuration of main process is not present
+def count_file_task(file_path):
+    try:
+        return read_file_counts(file_path), None
+    except (OSError, ValueError) as exc:
+        return None, str(exc)
+
+
+def count_file(file_path):
+    """Count lines of given file, returns tuple (language, blank, comment, code) or None if file is not recognized."""
+    counts, error = count_file_task(file_path)
+    if error is not None:
+        _LOGGER.warning("unable to read file %s: %s", file_path, error)
+    return counts
+
+
+## context of worker processes
+## processes are not forked, because forking process with running threads (e.g. progress reporter
+## holding lock of logging handler) can deadlock child process
+def get_pool_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def count_files(files_list, include_langs=None, exclude_langs=None, exclude_filter=None, jobs=None):
+    """Count lines of given files using pool of processes.
+
+    Returns dict: file path -> (language, blank, comment, code) containing only recognized files.
+    Files inside directories of version control systems are skipped (the same as cloc does).
+    """
+    files_list = [file_path for file_path in files_list if not is_vcs_path(os.path.dirname(file_path))]
+    if exclude_filter is not None:
+        files_list = [file_path for file_path in files_list if not exclude_filter.excluded(file_path)]
+    _LOGGER.info("counting code of %s files", len(files_list))
+    counts_list = []
+    if len(files_list) < 64 or jobs == 1:
+        ## not worth starting processes
+        with ProgressTracker("counting files", len(files_list)) as progress:
+            for file_path in files_list:
+                counts_list.append(count_file(file_path))
+                progress.update()
+    else:
+        ## pool is started before progress thread
+        with get_pool_context().Pool(processes=jobs) as process_pool:
+            results_iter = process_pool.imap(count_file_task, files_list, chunksize=64)
+            with ProgressTracker("counting files", len(files_list)) as progress:
+                for file_path, (counts, error) in zip(files_list, results_iter):
+                    if error is not None:
+                        _LOGGER.warning("unable to read file %s: %s", file_path, error)
+                    counts_list.append(counts)
+                    progress.update()
+
+    ret_dict = {}
+    for file_path, counts in zip(files_list, counts_list):
+        if counts is None:
+            continue
+        language = counts[0]
+        if include_langs and language not in include_langs:
+            continue
+        if exclude_langs and language in exclude_langs:
+            continue
+        ret_dict[file_path] = counts
+    return ret_dict
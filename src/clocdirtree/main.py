@@ -21,16 +21,44 @@ import os
 import sys
 import argparse
 import logging
+import json
+import functools
+import itertools
 
 from clocdirtree import logger
-from clocdirtree.clocparser import get_dirs_list, cloc_dirs
-from clocdirtree.excludefilter import ExcludeItemFilter
-from clocdirtree.graph import generate_graph, store_graph_to_html, set_node_html_attribs, split_to_multi_dict
-from clocdirtree.io import write_file, prepare_filesystem_name, read_file
+from clocdirtree.clocparser import cloc_dirs, cloc_dirs_singlepass, cloc_dirs_cached
+from clocdirtree.clocparser import cloc_dirs_incremental, cloc_dirs_by_files, configure_cloc_policy
+from clocdirtree.checkpoint import CountsJournal, PagesJournal, Quarantine, QUARANTINE_FILE_NAME
+from clocdirtree.linecounter import count_files
+from clocdirtree.countcache import FileCountCache, CACHE_FILE_NAME
+from clocdirtree.excludefilter import ExcludeItemFilter, load_exclude_file, exclude_to_cloc_regex
+from clocdirtree.dirwalk import walk_tree, get_subtree_sizes, is_vcs_path
+from clocdirtree.gitrepo import get_head_revision, get_changed_files, resolve_revision
+from clocdirtree.gitrepo import get_tracked_files, get_ignored_files
+from clocdirtree.graph import generate_graph, generate_pack_graph, store_graph_to_html, render_graph_svg
+from clocdirtree.graph import set_node_html_attribs, GRAPH_ENGINE
+from clocdirtree.pagemanifest import PageManifest, get_page_hash
+from clocdirtree.pagelayout import PageLayout, PAGE_LAYOUTS
+from clocdirtree.treebuilder import iterate_tree_pages
+from clocdirtree.export import export_results, load_jsonl, get_import_path, EXPORT_FORMATS, JSONL_FILE_NAME
+from clocdirtree.viewer import generate_viewer
+from clocdirtree.taskpool import execute_bounded, get_jobs_number
+from clocdirtree.runstats import get_run_stats
+from clocdirtree.progress import ProgressTracker, track_progress, configure_progress, PROGRESS_MODES, PROGRESS_INTERVAL
+from clocdirtree.io import write_file, read_file
 
 
 _LOGGER = logging.getLogger(__name__)
 
+## version of pages content - has to be increased when templates of pages change
+PAGES_VERSION = 2
+
+## default number of subdirectories above which circle packing is used instead of graphviz
+PACK_THRESHOLD = 100
+
+## extensions of files of single page
+PAGE_FILES_EXTENSIONS = [".html", ".png", ".svg", ".map"]
+
 
 # =======================================================================
 
@@ -40,21 +68,318 @@ def process_cloc(args):
     run_dir = os.path.normpath(run_dir)
     out_dir = args.outdir
 
-    exclude_filter = ExcludeItemFilter(args.exclude)
-    dirs_list = []
-    potential_dirs_list = get_dirs_list(run_dir, recursive=True)
-    potential_dirs_list.insert(0, run_dir)
-    for item in potential_dirs_list:
-        if exclude_filter.excluded(item):
-            continue
-        dirs_list.append(item)
+    exclude_list = list(args.exclude)
+    for exclude_path in args.exclude_file:
+        exclude_list.extend(load_exclude_file(exclude_path, run_dir))
+
+    exclude_filter = ExcludeItemFilter(exclude_list)
+    cloc_params_dict = prepare_cloc_params(args, exclude_list)
+    configure_cloc_policy(timeout=args.cloc_timeout, retries=args.cloc_retries)
+
+    quarantine = Quarantine(os.path.join(out_dir, QUARANTINE_FILE_NAME))
+    if not args.resume:
+        quarantine.clear()
+    ## counted directories are journaled, so interrupted run can be resumed
+    journal_params = {"root": os.path.abspath(run_dir), "engine": args.engine, "params": cloc_params_dict}
+    counts_journal = CountsJournal(out_dir, run_dir, journal_params, resume=args.resume)
+    try:
+        dirs_list, results_iter, update_set = count_dirs(
+            args, run_dir, exclude_filter, cloc_params_dict, counts_journal.done_dict, quarantine
+        )
+        results_iter = counts_journal.journal_results(results_iter)
+        ## results are reported in order of completion
+        results_iter = track_progress(results_iter, "counting", total=len(dirs_list))
+
+        if args.export:
+            export_dir = os.path.join(out_dir, "export")
+            results_iter = export_results(results_iter, export_dir, args.export, run_dir)
+
+        ## pages are generated while counting results arrive
+        render_settings = get_render_settings(args)
+        generate_site(
+            out_dir,
+            run_dir,
+            dirs_list,
+            results_iter,
+            update_set,
+            jobs=args.jobs,
+            render_settings=render_settings,
+            site=args.site,
+            resume=args.resume,
+        )
+    except BaseException:
+        ## keep journal for '--resume'
+        counts_journal.close()
+        raise
+    counts_journal.close(remove=True)
+
+    if quarantine.paths_dict:
+        _LOGGER.warning(
+            "unable to count %s files (see %s):\n%s",
+            len(quarantine.paths_dict),
+            quarantine.file_path,
+            "\n".join(sorted(quarantine.paths_dict)),
+        )
+    save_run_report(out_dir)
+
+
+def process_render(args):
+    out_dir = args.outdir
+    snapshot_path = args.snapshot
+    if not snapshot_path:
+        snapshot_path = os.path.join(out_dir, "export", JSONL_FILE_NAME)
+    if os.path.isdir(snapshot_path):
+        snapshot_path = os.path.join(snapshot_path, JSONL_FILE_NAME)
+    if not os.path.isfile(snapshot_path):
+        _LOGGER.error("unable to find exported counts: %s (run 'generate' with '--export jsonl')", snapshot_path)
+        return 1
 
+    _LOGGER.info("loading counts from: %s", snapshot_path)
+    root_dir = os.curdir
+    ## file is read twice: to get list of directories and then to stream results
+    dirs_list = [get_import_path(export_path, root_dir) for export_path, _ in load_jsonl(snapshot_path, True)]
+    results_iter = (
+        (get_import_path(export_path, root_dir), result) for export_path, result in load_jsonl(snapshot_path)
+    )
+    render_settings = get_render_settings(args)
+    generate_site(
+        out_dir, root_dir, dirs_list, results_iter, jobs=args.jobs, render_settings=render_settings, site=args.site
+    )
+    save_run_report(out_dir)
+    return 0
+
+
+def save_run_report(out_dir):
+    run_stats = get_run_stats()
+    run_stats.save(out_dir)
+    report_dict = run_stats.to_dict()
+    stages_list = [f"{name}: {stage['wall']:.2f}s" for name, stage in report_dict["stages"].items()]
+    _LOGGER.info("run time: %.2fs, stages (summed over workers): %s", report_dict["wall"], ", ".join(stages_list))
+
+
+## results_iter - iterator over tuples (directory path, ClocResult) of directories from dirs_list
+## site - 'pages' (page with graph per directory) or 'viewer' (single page treemap/sunburst viewer)
+## resume - skip pages generated by interrupted run (journaled in checkpoint directory)
+def generate_site(
+    out_dir,
+    root_dir,
+    dirs_list,
+    results_iter,
+    update_set=None,
+    jobs=None,
+    render_settings=None,
+    site="pages",
+    resume=False,
+):
+    get_run_stats().add("directories", len(dirs_list))
+    if site == "viewer":
+        ## viewer does not need graphviz, whole tree is written every time
+        os.makedirs(out_dir, exist_ok=True)
+        pages_iter = iterate_tree_pages(root_dir, dirs_list, results_iter, root_name="index")
+        title = os.path.basename(os.path.abspath(root_dir))
+        generate_viewer(pages_iter, out_dir, title=title)
+        return
+
+    if render_settings is None:
+        render_settings = get_render_settings()
+    graph_dir = os.path.join(out_dir, "graphs")
+    os.makedirs(graph_dir, exist_ok=True)
+    pages_iter = iterate_tree_pages(root_dir, dirs_list, results_iter, root_name="index")
+    pages_journal = PagesJournal(out_dir, render_settings, resume=resume)
+    try:
+        generate_pages(
+            pages_iter, graph_dir, update_set, jobs=jobs, render_settings=render_settings, pages_journal=pages_journal
+        )
+    except BaseException:
+        ## keep journal for resuming
+        pages_journal.close()
+        raise
+    pages_journal.close(remove=True)
+
+    page_layout = PageLayout(render_settings["page_layout"])
+    if not os.path.isfile(page_layout.get_page_file(graph_dir, "index") + ".html"):
+        ## e.g. no code found
+        _LOGGER.error("page of root directory not generated - index page not written")
+        return
+    generate_page_index(out_dir, "graphs/" + page_layout.get_page_path("index") + ".html")
+
+
+## returns tuple: (list of directories, iterator over tuples (directory path, ClocResult),
+##                 set of pages to update or None if all pages should be updated)
+## done_dict - results of directories counted by interrupted run (directory path -> ClocResult),
+##             directories are resumed only in default per-directory counting: native and single-pass
+##             engines count all files at once (results are reused only if all directories were counted),
+##             in cache mode progress of interrupted run is kept in the cache
+## quarantine - 'Quarantine' of files failed to count
+def count_dirs(args, run_dir, exclude_filter, cloc_params_dict, done_dict=None, quarantine=None):
+    cache_dir = args.cache_dir
+    if not cache_dir and (args.use_cache or args.since is not None):
+        cache_dir = args.outdir
+
+    files_counter = None
+    if args.engine == "native":
+        files_counter = functools.partial(
+            count_files,
+            include_langs=set(args.include_lang),
+            exclude_langs=set(args.exclude_lang),
+            exclude_filter=exclude_filter,
+            jobs=args.jobs,
+        )
+
+    run_stats = get_run_stats()
+    if not cache_dir:
+        with run_stats.measure("walk"):
+            dirs_dict = walk_tree(run_dir, exclude_filter, jobs=args.walk_jobs)
+        dirs_list = list(dirs_dict.keys())
+        if done_dict and all(dir_path in done_dict for dir_path in dirs_list):
+            _LOGGER.info("all directories counted by previous run")
+            return dirs_list, ((dir_path, done_dict[dir_path]) for dir_path in reversed(dirs_list)), None
+        if done_dict and (files_counter is not None or args.singlepass):
+            _LOGGER.info("engine counts all files at once - unable to resume partially counted run")
+        if files_counter is not None:
+            with run_stats.measure("count"):
+                results_iter = cloc_dirs_by_files(run_dir, dirs_list, files_counter)
+            return dirs_list, results_iter, None
+        if args.singlepass:
+            with run_stats.measure("count"):
+                results_iter = cloc_dirs_singlepass(
+                    run_dir, dirs_list, cloc_params_dict=cloc_params_dict, quarantine=quarantine
+                )
+            return dirs_list, results_iter, None
+
+        ## count heavy directories first (the largest first), other directories children first
+        size_dict = get_subtree_sizes(dirs_dict)
+        jobs = get_jobs_number(args.jobs)
+        heavy_jobs = args.heavy_jobs
+        if heavy_jobs is None:
+            heavy_jobs = max(1, jobs // 2)
+        if done_dict is None:
+            done_dict = {}
+        ## count only directories not counted by interrupted run
+        remaining_list = [dir_path for dir_path in dirs_list if dir_path not in done_dict]
+        results_iter = cloc_dirs(
+            remaining_list,
+            cloc_params_dict=cloc_params_dict,
+            jobs=jobs,
+            size_dict=size_dict,
+            heavy_jobs=heavy_jobs,
+            heavy_size=args.heavy_files,
+            batch_size=args.batch_files,
+            quarantine=quarantine,
+        )
+        if len(remaining_list) < len(dirs_list):
+            done_iter = ((dir_path, done_dict[dir_path]) for dir_path in reversed(dirs_list) if dir_path in done_dict)
+            results_iter = itertools.chain(done_iter, results_iter)
+        return dirs_list, results_iter, None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, CACHE_FILE_NAME)
+    ## counts depend on counting engine and its parameters
+    params_key = json.dumps({"engine": args.engine, "params": cloc_params_dict}, sort_keys=True)
+    update_set = None
+    with FileCountCache(cache_path, params_key) as count_cache:
+        baseline_key = "baseline:" + os.path.abspath(run_dir)
+        baseline_rev = count_cache.get_meta(baseline_key)
+        if args.since is not None and baseline_rev is not None:
+            ## incremental mode
+            changed_list = get_incremental_files(run_dir, args.since, baseline_rev, count_cache, exclude_filter)
+            changed_list = [item for item in changed_list if not is_excluded_file(exclude_filter, item, run_dir)]
+            ## directories are known after aggregation of cached counts
+            with run_stats.measure("count"):
+                cloc_data_dict = dict(
+                    cloc_dirs_incremental(
+                        run_dir,
+                        changed_list,
+                        count_cache,
+                        cloc_params_dict=cloc_params_dict,
+                        files_counter=files_counter,
+                        quarantine=quarantine,
+                    )
+                )
+            dirs_list = list(cloc_data_dict.keys())
+            results_iter = iter(cloc_data_dict.items())
+            update_set = get_changed_pages(run_dir, changed_list)
+        else:
+            if args.since is not None:
+                _LOGGER.warning("unable to find results of previous run - counting all files")
+            with run_stats.measure("walk"):
+                dirs_dict = walk_tree(run_dir, exclude_filter, jobs=args.walk_jobs)
+            dirs_list = list(dirs_dict.keys())
+            with run_stats.measure("count"):
+                results_iter = cloc_dirs_cached(
+                    run_dir,
+                    dirs_list,
+                    count_cache,
+                    cloc_params_dict=cloc_params_dict,
+                    files_counter=files_counter,
+                    quarantine=quarantine,
+                )
+
+        head_rev = get_head_revision(run_dir)
+        if head_rev:
+            count_cache.set_meta(baseline_key, head_rev)
+    return dirs_list, results_iter, update_set
+
+
+def get_incremental_files(run_dir, since_rev, baseline_rev, count_cache, exclude_filter=None):
+    """Returns list of files to recount in incremental mode.
+
+    Cached counts correspond to baseline revision (revision of previous run), so files changed since
+    the baseline are always recounted. Files ignored by git are validated by size and modification time,
+    except files in excluded directories and in directories of version control systems.
+    """
+    changed_list = get_changed_files(run_dir, baseline_rev)
+    if since_rev and resolve_revision(run_dir, since_rev) != baseline_rev:
+        _LOGGER.warning(
+            "cached counts correspond to revision %s - recounting files changed since it and since %s",
+            baseline_rev,
+            since_rev,
+        )
+        changed_list.extend(get_changed_files(run_dir, since_rev))
+
+    ## files not visible to git: ignored files and cached files which are not tracked anymore
+    def skip_dir(dir_path):
+        return is_excluded_dir(exclude_filter, dir_path, run_dir)
+
+    tracked_set = set(get_tracked_files(run_dir))
+    untracked_dict = dict.fromkeys(get_ignored_files(run_dir, skip_dir))
+    for file_path in count_cache.load_dir(run_dir):
+        if file_path not in tracked_set:
+            untracked_dict[file_path] = None
+    untracked_list = [file_path for file_path in untracked_dict if not skip_dir(os.path.dirname(file_path))]
+    changed_list.extend(count_cache.get_changed(untracked_list))
+    return list(dict.fromkeys(changed_list))
+
+
+## check if directory is excluded or is inside directory of version control system
+def is_excluded_dir(exclude_filter, dir_path, run_dir):
+    rel_path = os.path.relpath(dir_path, run_dir)
+    if rel_path == os.curdir:
+        return False
+    if is_vcs_path(rel_path):
+        return True
+    if exclude_filter is None:
+        return False
+    ## path has to be in the same form as paths of walked directories (joined with analyzed directory)
+    walk_path = os.path.join(run_dir, rel_path)
+    return exclude_filter.excluded_tree(walk_path, run_dir)
+
+
+## check if directory of file is excluded
+def is_excluded_file(exclude_filter, file_path, run_dir):
+    ## path has to be in the same form as paths of walked directories (joined with analyzed directory)
+    walk_path = os.path.join(run_dir, os.path.relpath(file_path, run_dir))
+    return exclude_filter.excluded_tree(os.path.dirname(walk_path), run_dir)
+
+
+def prepare_cloc_params(args, exclude_list):
     cloc_params_dict = {}
-    cloc_exclude = [item.replace("*", ".*") for item in args.exclude]
+    ## cloc excludes the same paths as walker
+    cloc_exclude = exclude_to_cloc_regex(exclude_list)
     if cloc_exclude:
         cloc_params_dict["--fullpath"] = None
-        cloc_params_dict["--not-match-d"] = "|".join(cloc_exclude)
-        cloc_params_dict["--not-match-f"] = "|".join(cloc_exclude)
+        cloc_params_dict["--not-match-d"] = cloc_exclude
+        cloc_params_dict["--not-match-f"] = cloc_exclude
 
     cloc_include_langs = ",".join(args.include_lang)
     if cloc_include_langs:
@@ -63,58 +388,196 @@ def process_cloc(args):
     cloc_exclude_langs = ",".join(args.exclude_lang)
     if cloc_exclude_langs:
         cloc_params_dict["--exclude-lang"] = cloc_exclude_langs
-
-    cloc_data_dict = cloc_dirs(dirs_list, cloc_params_dict=cloc_params_dict)
-    cloc_data_dict = {item_key.removeprefix(run_dir): item_val for item_key, item_val in cloc_data_dict.items()}
-
-    multi_dict = split_to_multi_dict(cloc_data_dict)
-    graph_dir = os.path.join(out_dir, "graphs")
-    os.makedirs(graph_dir, exist_ok=True)
-    multi_dict_data_list = multi_dict[""]
-    key_prefix_list = ["index"]
-    generate_page_multidict(multi_dict_data_list, graph_dir, key_prefix_list)
-
-    generate_page_index(out_dir, "graphs/index.html")
-
-    # data_dict = {item_key: item_val[0] for item_key, item_val in cloc_data_dict.items()}
-    # graph = generate_graph(data_dict)
-    # out_file = os.path.join(out_dir, "full_graph.txt")
-    # graph.writeRAW(out_file)
-
-
-def generate_page_multidict(multi_dict_data_list, out_graph_dir, key_prefix_list):
-    value_list = multi_dict_data_list[0]
-    cloc_summary = value_list[1]
-    multi_dict = multi_dict_data_list[1]
-
-    graph_dict = {}
-    for key, data_tuple in multi_dict.items():
-        val_list = data_tuple[0]
-        if val_list is not None:
-            graph_dict[key] = val_list[0]
-
-    base_path_prefix = "/".join(key_prefix_list)
-    path_prefix = prepare_filesystem_name(base_path_prefix)
-
-    _LOGGER.info("generating page: %s", path_prefix)
-
-    if graph_dict:
-        graph = generate_graph(graph_dict)
-        graph.setName(path_prefix)
-
-        node_prefix = path_prefix
-        if not node_prefix.endswith("_"):
-            node_prefix += "_"
-        set_node_html_attribs(graph, node_prefix)
-        store_graph_to_html(graph, out_graph_dir)
-
-    generate_page_content(base_path_prefix, path_prefix, cloc_summary, out_graph_dir)
-
-    # go recursive
-    for key, data_tuple in multi_dict.items():
-        sub_list = key_prefix_list.copy()
-        sub_list.append(key)
-        generate_page_multidict(data_tuple, out_graph_dir, sub_list)
+    return cloc_params_dict
+
+
+## returns set of names of pages affected by given changed files
+def get_changed_pages(run_dir, changed_list):
+    pages_set = set()
+    for file_path in changed_list:
+        dir_path = os.path.dirname(file_path) or os.curdir
+        while True:
+            if dir_path == run_dir:
+                pages_set.add("index")
+                break
+            rel_path = os.path.relpath(dir_path, run_dir)
+            if rel_path.startswith(os.pardir):
+                ## outside of analyzed directory
+                break
+            pages_set.add("index/" + rel_path.replace(os.sep, "/"))
+            dir_path = os.path.dirname(dir_path) or os.curdir
+    return pages_set
+
+
+## update_set - set of pages to generate, if None then all pages are generated
+def generate_pages(pages_iter, out_graph_dir, update_set=None, jobs=None, render_settings=None, pages_journal=None):
+    """Generate pages of directories tree using pool of workers.
+
+    'pages_iter' yields tuples: (page name, dict: subdirectory name -> code lines, ClocResult).
+    'render_settings' is dict returned by 'get_render_settings'.
+    Pages with the same inputs as in previous run (according to manifest) are not generated again.
+    Generated pages are recorded in 'pages_journal' (if given), pages recorded by interrupted run
+    are not generated again.
+    """
+    if update_set is not None:
+        pages_iter = (page_args for page_args in pages_iter if page_args[0] in update_set)
+
+    if render_settings is None:
+        render_settings = get_render_settings()
+    manifest = PageManifest(out_graph_dir)
+    if pages_journal is not None:
+        ## manifest of interrupted run was not stored - use journal of the run
+        manifest.stored_dict.update(pages_journal.done_dict)
+    ## layout is shared by all pages, so paths of pages are calculated once (when page is emitted)
+    page_layout = PageLayout(render_settings["page_layout"])
+
+    ## pack layout has no rasterizer - warn once when it overrides requested image format
+    vector_warning = render_settings["image_format"] != "svg"
+
+    def changed_pages():
+        nonlocal vector_warning
+        for page_args in pages_iter:
+            if vector_warning and select_layout(page_args[1], render_settings) == "pack":
+                _LOGGER.warning(
+                    "pack layout produces SVG images - pages with pack layout are not rendered as %s",
+                    render_settings["image_format"],
+                )
+                vector_warning = False
+            page_hash = get_page_hash(*page_args, render_settings)
+            page_path = page_layout.get_page_file(out_graph_dir, page_args[0]) + ".html"
+            if manifest.is_changed(page_args[0], page_hash, page_path):
+                yield page_args
+
+    ## number of pages is not known in advance - only completed and queued pages are tracked
+    progress = ProgressTracker("rendering")
+
+    def queue_pages():
+        for page_args in changed_pages():
+            progress.add_pending()
+            yield [*page_args, out_graph_dir, render_settings, page_layout]
+
+    def render_page(*task_args):
+        generate_page(*task_args)
+        if pages_journal is not None:
+            page_name = task_args[0]
+            pages_journal.add_page(page_name, manifest.current_dict[page_name])
+        progress.update()
+
+    with progress:
+        execute_bounded(render_page, queue_pages(), jobs)
+    ## manifest is stored only if all pages were generated successfully
+    manifest.save(merge=update_set is not None)
+    if update_set is None:
+        ## all pages were checked - remaining pages are of directories which do not exist anymore
+        remove_pages(manifest.get_stale_pages(), out_graph_dir, page_layout, manifest.current_dict)
+    _LOGGER.info("pages generated: %s, unchanged: %s", len(manifest.current_dict) - manifest.skipped, manifest.skipped)
+
+
+def remove_pages(pages_list, out_graph_dir, page_layout, keep_pages=()):
+    """Remove files of given pages and directories of pages which become empty.
+
+    Files of pages from 'keep_pages' are not removed.
+    """
+    keep_set = {page_layout.get_page_file(out_graph_dir, page_name) for page_name in keep_pages}
+    ## subpages first - directory of page in 'tree' layout contains files of subpages
+    for page_name in sorted(pages_list, reverse=True):
+        page_file = page_layout.get_page_file(out_graph_dir, page_name)
+        if page_file in keep_set:
+            continue
+        _LOGGER.info("removing page: %s", page_layout.get_page_path(page_name))
+        for extension in PAGE_FILES_EXTENSIONS:
+            file_path = page_file + extension
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+        page_dir = os.path.dirname(page_file)
+        if page_dir != out_graph_dir and os.path.isdir(page_dir) and not os.listdir(page_dir):
+            os.rmdir(page_dir)
+
+
+## settings affecting content of pages
+def get_render_settings(args=None):
+    settings_dict = {
+        "version": PAGES_VERSION,
+        "engine": GRAPH_ENGINE,
+        "image_format": "png",
+        "layout": "auto",
+        "pack_threshold": PACK_THRESHOLD,
+        "page_layout": "flat",
+    }
+    if args is not None:
+        settings_dict["image_format"] = args.image_format
+        settings_dict["layout"] = args.layout
+        settings_dict["pack_threshold"] = args.pack_threshold
+        settings_dict["page_layout"] = args.page_layout
+    return settings_dict
+
+
+## returns layout of graph with given subdirectories: 'neato' or 'pack'
+def select_layout(graph_dict, render_settings):
+    layout = render_settings["layout"]
+    if layout != "auto":
+        return layout
+    if len(graph_dict) > render_settings["pack_threshold"]:
+        return "pack"
+    return "neato"
+
+
+def generate_page(base_path_prefix, graph_dict, cloc_result, out_graph_dir, render_settings=None, page_layout=None):
+    ## time of rendering is measured for each page
+    with get_run_stats().measure("render", base_path_prefix):
+        if render_settings is None:
+            render_settings = get_render_settings()
+        image_format = render_settings["image_format"]
+        if page_layout is None:
+            page_layout = PageLayout(render_settings["page_layout"])
+
+        ## files of page are stored in directory of page (depends on layout)
+        page_dir, path_prefix = os.path.split(page_layout.get_page_file(out_graph_dir, base_path_prefix))
+        os.makedirs(page_dir, exist_ok=True)
+
+        _LOGGER.info("generating page: %s", page_layout.get_page_path(base_path_prefix))
+
+        img_content = None
+        if graph_dict:
+            links_dict = {}
+            for name in graph_dict:
+                links_dict[name] = page_layout.get_link(base_path_prefix, base_path_prefix + "/" + name)
+
+            if select_layout(graph_dict, render_settings) == "pack":
+                ## built-in layout - graphviz is not executed
+                pack_data = generate_pack_graph(graph_dict, None, path_prefix, links_dict=links_dict)
+                if pack_data:
+                    svg_content, map_content = pack_data
+                    if image_format == "svg":
+                        img_content = svg_content
+                    else:
+                        ## there is no rasterizer - store vector image with map of links
+                        write_file(os.path.join(page_dir, f"{path_prefix}.svg"), svg_content)
+                        img_content = prepare_image_content(path_prefix, f"{path_prefix}.svg", map_content)
+            else:
+                graph = generate_graph(graph_dict)
+                graph.setName(path_prefix)
+                set_node_html_attribs(graph, None, links_dict=links_dict)
+                if image_format == "svg":
+                    ## single graphviz pass, links are embedded in SVG
+                    img_content = render_graph_svg(graph)
+                elif not graph.empty():
+                    store_graph_to_html(graph, page_dir, path_prefix)
+                    map_content = read_file(os.path.join(page_dir, f"{path_prefix}.map"))
+                    img_content = prepare_image_content(path_prefix, f"{path_prefix}.png", map_content)
+
+        ## summary text is rendered only when page is written
+        cloc_summary = cloc_result.to_text()
+        generate_page_content(base_path_prefix, path_prefix, cloc_summary, page_dir, img_content, page_layout)
+
+
+def prepare_image_content(path_prefix, image_file, map_content):
+    if not map_content:
+        return None
+    return f"""\
+        <img src="{image_file}" alt="graph" usemap="#{path_prefix}">
+{map_content}
+"""
 
 
 def generate_page_index(out_dir, redirect_link):
@@ -143,32 +606,28 @@ Project is distributed under the BSD 3-Clause license.
 </html>
 """
     out_file = os.path.join(out_dir, "index.html")
+    if read_file(out_file) == content:
+        ## keep modification time of unchanged file
+        return
     _LOGGER.info("writing index page: %s", out_file)
     write_file(out_file, content)
 
 
-def generate_page_content(directory, path_prefix, cloc_summary, out_graph_dir):
-    map_path = os.path.join(out_graph_dir, f"{path_prefix}.map")
-    map_content = read_file(map_path)
-
+## out_graph_dir - directory of page files
+def generate_page_content(directory, path_prefix, cloc_summary, out_graph_dir, img_content=None, page_layout=None):
+    if page_layout is None:
+        page_layout = PageLayout()
     path_links_content = ""
     dir_items = directory.split("/")
     dir_items_len = len(dir_items)
     for index in range(0, dir_items_len):
         dir_item = dir_items[index]
-        item_file = "_".join(dir_items[: index + 1]) + ".html"
-        item_file = prepare_filesystem_name(item_file)
+        item_file = page_layout.get_link(directory, "/".join(dir_items[: index + 1]))
         path_links_content += f""" <a href="{item_file}">{dir_item}</a> /"""
     if path_links_content:
         path_links_content = path_links_content[:-1]
 
-    img_content = ""
-    if map_content:
-        img_content = f"""\
-        <img src="{path_prefix}.png" alt="graph" usemap="#{path_prefix}">
-{map_content}
-"""
-    else:
+    if not img_content:
         img_content = "no subdirs with results"
 
     content = f"""\
@@ -218,43 +677,288 @@ Project is distributed under the BSD 3-Clause license.
 
     out_file = os.path.join(out_graph_dir, f"{path_prefix}.html")
     write_file(out_file, content)
+    get_run_stats().add("pages_written")
 
 
 # =======================================================================
 
 
+## add arguments common for tools generating pages
+def add_render_args(subparser):
+    subparser.add_argument(
+        "--image-format",
+        action="store",
+        choices=["png", "svg"],
+        default="png",
+        help="Format of graphs: 'png' (image with map of links, pages with 'pack' layout use SVG image instead),"
+        " 'svg' (vector graph with links inlined into page)",
+    )
+    subparser.add_argument(
+        "--layout",
+        action="store",
+        choices=["neato", "pack", "auto"],
+        default="auto",
+        help="Layout of graphs: 'neato' (graphviz), 'pack' (built-in circle packing, much faster for many nodes,"
+        " always produces vector image), 'auto' (circle packing for directories with many subdirectories)",
+    )
+    subparser.add_argument(
+        "--pack-threshold",
+        action="store",
+        type=int,
+        default=PACK_THRESHOLD,
+        help="Number of subdirectories above which 'auto' layout uses circle packing",
+    )
+    subparser.add_argument(
+        "--page-layout",
+        action="store",
+        choices=PAGE_LAYOUTS,
+        default="flat",
+        help="Placement of pages in output directory: 'flat' (single directory), 'tree' (subdirectories mirroring"
+        " analyzed tree), 'hash' (256 subdirectories named by hash of page name)",
+    )
+    subparser.add_argument(
+        "--progress",
+        action="store",
+        choices=PROGRESS_MODES,
+        default="auto",
+        help="Reporting progress of counting and rendering: 'bar' (progress bar on standard error), 'log' (periodic"
+        " log lines), 'none', 'auto' (progress bar on terminal, otherwise log lines)",
+    )
+    subparser.add_argument(
+        "--progress-interval",
+        action="store",
+        type=float,
+        default=PROGRESS_INTERVAL,
+        help="Interval of progress log lines (in seconds)",
+    )
+    subparser.add_argument(
+        "--site",
+        action="store",
+        choices=["pages", "viewer"],
+        default="pages",
+        help="Kind of output: 'pages' (page with graph for each directory), 'viewer' (single page with interactive"
+        " treemap and sunburst loading data on demand, does not require graphviz)",
+    )
+
+
+## tool executed when command line does not contain tool (command line of versions without tools)
+DEFAULT_TOOL = "generate"
+
+
+def insert_default_tool(argv, tools_list, global_options):
+    """Insert default tool before first argument which is not global option, if tool is not given.
+
+    Returns list of arguments.
+    """
+    for index, item in enumerate(argv):
+        if item in global_options:
+            continue
+        if item in tools_list:
+            return argv
+        return argv[:index] + [DEFAULT_TOOL] + argv[index:]
+    return argv
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="python3 -m clocdirtree.main",
-        description="dump cloc data and navigate it as directory tree",
+        description="dump cloc data and navigate it as directory tree"
+        f" (if tool is not given, then '{DEFAULT_TOOL}' is used)",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
-    parser.set_defaults(func=process_cloc)
-    parser.add_argument("--clocdir", action="store", required=True, default="", help="Directory to analyze by 'cloc'")
-    parser.add_argument("--outdir", action="store", required=True, default="", help="Output directory")
+    parser.add_argument("--listtools", action="store_true", help="List tools")
     parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile execution with cProfile, profile is stored in output directory (run-profile.prof)",
+    )
+    parser.set_defaults(func=None)
+    global_options = [option for action in parser._actions for option in action.option_strings]  # pylint: disable=W0212
+
+    subparsers = parser.add_subparsers(help="one of tools", description="use one of tools", dest="tool", required=False)
+
+    ## =================================================
+
+    description = "count code of directories and generate pages"
+    subparser = subparsers.add_parser(
+        "generate", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    subparser.description = description
+    subparser.set_defaults(func=process_cloc)
+    subparser.add_argument(
+        "--clocdir", action="store", required=True, default="", help="Directory to analyze by 'cloc'"
+    )
+    subparser.add_argument("--outdir", action="store", required=True, default="", help="Output directory")
+    subparser.add_argument(
         "--exclude",
         nargs="+",
         default=[],
-        help="Space separated list of files and directories to exclude. e.g. --exclude '/usr/*' '*/tmp/*'",
+        help="Space separated list of files and directories to exclude. e.g. --exclude '/usr/*' '*/tmp/*'."
+        " Wildcard patterns are matched against beginning of path, e.g. '*/build' excludes also '*/build/*'"
+        " and '*/buildx'.",
     )
-    parser.add_argument(
+    subparser.add_argument(
+        "--exclude-file",
+        nargs="+",
+        default=[],
+        help="Space separated list of files with exclude patterns in gitignore syntax"
+        " (patterns containing slash are relative to analyzed directory, negation is not supported).",
+    )
+    subparser.add_argument(
         "--include-lang",
         nargs="+",
         default=[],
         help="Space separated list of languages to include.",
     )
-    parser.add_argument(
+    subparser.add_argument(
         "--exclude-lang",
         nargs="+",
         default=[],
         help="Space separated list of languages to exclude.",
     )
+    subparser.add_argument(
+        "--engine",
+        action="store",
+        choices=["cloc", "native"],
+        default="cloc",
+        help="Engine counting lines of code: 'cloc' runs cloc program, 'native' uses built-in counter"
+        " (faster, supports only common languages and does not parse string literals)",
+    )
+    subparser.add_argument(
+        "--singlepass",
+        action="store_true",
+        help="Run cloc once in '--by-file' mode and sum directories results instead of running cloc on each directory",
+    )
+    subparser.add_argument(
+        "--batch-files",
+        action="store",
+        type=int,
+        default=0,
+        help="Count directories subtrees having no more files than given number in batches"
+        " (one cloc process in '--by-file' mode per batch). Value 0 disables batching.",
+    )
+    subparser.add_argument(
+        "--export",
+        nargs="+",
+        choices=EXPORT_FORMATS,
+        default=[],
+        help="Space separated list of formats of counts export written to 'export' subdirectory of output directory:"
+        " 'jsonl' (JSON object per directory), 'npy' (columns in NumPy '.npy' files)",
+    )
+    subparser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="Store counts of files in cache inside output directory and count only new or modified files",
+    )
+    subparser.add_argument(
+        "--cache-dir",
+        action="store",
+        default=None,
+        help="Directory to store cache of counts of files (implies '--use-cache')",
+    )
+    subparser.add_argument(
+        "--since",
+        action="store",
+        nargs="?",
+        const="",
+        default=None,
+        help="Recount only files changed since revision of previous run and regenerate only affected pages"
+        " (requires cache of previous run, implies '--use-cache'). If git revision is given, then files changed"
+        " since the revision are also recounted. Files ignored by git are checked by size and modification time.",
+    )
+    add_render_args(subparser)
+    subparser.add_argument(
+        "--jobs",
+        action="store",
+        type=int,
+        default=None,
+        help="Number of parallel workers (cloc processes and rendering pages)."
+        " If not set, then number of CPUs is used.",
+    )
+    subparser.add_argument(
+        "--heavy-jobs",
+        action="store",
+        type=int,
+        default=None,
+        help="Maximum number of cloc processes running on heavy directories at the same time."
+        " If not set, then half of jobs is used.",
+    )
+    subparser.add_argument(
+        "--heavy-files",
+        action="store",
+        type=int,
+        default=10000,
+        help="Number of files in directory subtree making the directory heavy. Heavy directories are counted"
+        " first (the largest first), other directories are counted children first, so pages of completed"
+        " subtrees are generated while counting.",
+    )
+    subparser.add_argument(
+        "--walk-jobs",
+        action="store",
+        type=int,
+        default=1,
+        help="Number of threads walking top level subdirectories of analyzed directory",
+    )
+    subparser.add_argument(
+        "--cloc-timeout",
+        action="store",
+        type=float,
+        default=None,
+        help="Timeout of single cloc execution in seconds. If not set, then cloc is not limited.",
+    )
+    subparser.add_argument(
+        "--cloc-retries",
+        action="store",
+        type=int,
+        default=1,
+        help="Number of retries of failed or timed out cloc execution. Files of directory failed to count"
+        " are counted separately, files failing cloc are skipped and listed in 'quarantine.json' file"
+        " in output directory.",
+    )
+    subparser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume interrupted run: reuse counts and pages journaled in 'checkpoint' subdirectory of output"
+        " directory and skip quarantined files. Native engine and single-pass mode count all files at once,"
+        " so their counts are reused only if counting finished. With cache counts of interrupted run are"
+        " reused from the cache.",
+    )
+
+    ## =================================================
+
+    description = "generate pages from counts exported by previous run (without counting code again)"
+    subparser = subparsers.add_parser(
+        "render", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    subparser.description = description
+    subparser.set_defaults(func=process_render)
+    subparser.add_argument("--outdir", action="store", required=True, default="", help="Output directory")
+    subparser.add_argument(
+        "--snapshot",
+        action="store",
+        default=None,
+        help="Path to counts exported in 'jsonl' format ('generate --export jsonl')."
+        " If not set, then export inside output directory is used.",
+    )
+    add_render_args(subparser)
+    subparser.add_argument(
+        "--jobs",
+        action="store",
+        type=int,
+        default=None,
+        help="Number of parallel workers rendering pages. If not set, then number of CPUs is used.",
+    )
 
     ## =================================================
 
-    args = parser.parse_args()
+    argv = insert_default_tool(sys.argv[1:], subparsers.choices, global_options)
+    args = parser.parse_args(argv)
+
+    if args.listtools is True:
+        tools_list = list(subparsers.choices.keys())
+        print(", ".join(tools_list))
+        return 0
 
     if args.logall is True:
         logger.configure(logLevel=logging.DEBUG)
@@ -266,6 +970,10 @@ def main():
         parser.print_help()
         return 1
 
+    if args.profile:
+        get_run_stats().enable_profiling()
+    configure_progress(args.progress, args.progress_interval)
+
     return args.func(args)
 
 
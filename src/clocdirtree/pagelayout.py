@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Placement of pages inside output directory of graphs.
+##
+## 'flat' - all pages in one directory (e.g. 'index-dir-subdir.html'),
+## 'tree' - subdirectories mirroring directories tree (e.g. 'index/dir/subdir.html'),
+## 'hash' - subdirectories named by prefix of hash of page name (e.g. '3f/index-dir-subdir.html').
+##
+## Names of files are collision-free: letters, digits, '_' and '.' are kept, '/' is replaced by '-' and
+## other characters are escaped as '~' followed by hex code of each UTF-8 byte (e.g. 'a-b' -> 'a~2db').
+## Names longer than MAX_NAME_LENGTH are truncated and suffixed by '~~' and hash of the whole name.
+##
+
+import os
+import logging
+
+import re
+import posixpath
+import hashlib
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+PAGE_LAYOUTS = ["flat", "tree", "hash"]
+
+## number of hex digits of shard name (256 shards)
+HASH_SHARD_LENGTH = 2
+
+## maximum length of file name without extension (file systems limit names to 255 bytes)
+MAX_NAME_LENGTH = 200
+
+## number of hex digits of hash suffix of truncated names
+NAME_HASH_LENGTH = 16
+
+SAFE_NAME_REGEX = re.compile(r"[A-Za-z0-9_./]*")
+
+
+def encode_page_name(name):
+    """Convert page name (or its part) to file name (without extension) - stable, unique and bounded."""
+    if SAFE_NAME_REGEX.fullmatch(name):
+        file_name = name.replace("/", "-")
+    else:
+        items_list = []
+        for char in name:
+            if char == "/":
+                items_list.append("-")
+            elif char.isascii() and (char.isalnum() or char in "_."):
+                items_list.append(char)
+            else:
+                items_list.append("".join(f"~{code:02x}" for code in char.encode("utf-8")))
+        file_name = "".join(items_list)
+    if file_name.startswith("."):
+        ## prevent hidden files and special names '.' and '..'
+        file_name = "~2e" + file_name[1:]
+    if len(file_name) > MAX_NAME_LENGTH:
+        name_hash = hashlib.sha1(name.encode("utf-8"), usedforsecurity=False).hexdigest()[:NAME_HASH_LENGTH]
+        file_name = file_name[: MAX_NAME_LENGTH - NAME_HASH_LENGTH - 2] + "~~" + name_hash
+    return file_name
+
+
+##
+class PageLayout:
+    """Maps page names (e.g. 'index/dir/subdir') to files and links between pages.
+
+    Paths of pages are indexed, so path of page is calculated once, no matter how many pages link to it.
+    """
+
+    def __init__(self, layout="flat"):
+        if layout not in PAGE_LAYOUTS:
+            raise ValueError(f"unknown page layout: {layout}")
+        self.layout = layout
+        ## page name -> path of page file
+        self.paths_dict = {}
+
+    ## returns path of page file relative to output directory, with '/' separators and without extension
+    def get_page_path(self, page_name):
+        page_path = self.paths_dict.get(page_name)
+        if page_path is None:
+            page_path = self._calculate_page_path(page_name)
+            self.paths_dict[page_name] = page_path
+        return page_path
+
+    def _calculate_page_path(self, page_name):
+        if self.layout == "tree":
+            ## directory of page is path of parent page - find the nearest indexed parent
+            missing_list = []
+            parent_path = None
+            parent_name = page_name
+            while parent_path is None:
+                parent_name, _, dir_name = parent_name.rpartition("/")
+                missing_list.append(encode_page_name(dir_name))
+                if not parent_name:
+                    break
+                parent_path = self.paths_dict.get(parent_name)
+            items_list = [] if parent_path is None else [parent_path]
+            items_list.extend(reversed(missing_list))
+            return "/".join(items_list)
+        file_name = encode_page_name(page_name)
+        if self.layout == "hash":
+            name_hash = hashlib.sha1(page_name.encode("utf-8"), usedforsecurity=False).hexdigest()
+            return name_hash[:HASH_SHARD_LENGTH] + "/" + file_name
+        return file_name
+
+    ## returns path of page file in given output directory, without extension
+    def get_page_file(self, out_dir, page_name):
+        return os.path.join(out_dir, *self.get_page_path(page_name).split("/"))
+
+    ## returns relative URL of page 'to_page' used in page 'from_page'
+    def get_link(self, from_page, to_page):
+        if self.layout == "flat":
+            return self.get_page_path(to_page) + ".html"
+        from_dir = posixpath.dirname(self.get_page_path(from_page)) or posixpath.curdir
+        to_dir, to_name = posixpath.split(self.get_page_path(to_page))
+        rel_dir = posixpath.relpath(to_dir or posixpath.curdir, from_dir)
+        if rel_dir == posixpath.curdir:
+            return to_name + ".html"
+        return rel_dir + "/" + to_name + ".html"
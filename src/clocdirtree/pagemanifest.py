@@ -0,0 +1,72 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+import json
+import hashlib
+
+from clocdirtree.io import write_file
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+MANIFEST_FILE_NAME = "pages-manifest.json"
+
+
+## calculate hash of page inputs: subdirectories counts, cloc result and render settings
+def get_page_hash(page_name, graph_dict, cloc_result, settings_dict=None):
+    page_data = [page_name, sorted(graph_dict.items()), cloc_result.get_lang_dict(), settings_dict]
+    content = json.dumps(page_data, sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+##
+class PageManifest:
+    """Hashes of inputs of generated pages, stored in output directory.
+
+    Page is regenerated only if hash of its inputs differs from the stored one.
+    """
+
+    def __init__(self, out_dir):
+        self.file_path = os.path.join(out_dir, MANIFEST_FILE_NAME)
+        self.stored_dict = {}
+        self.current_dict = {}
+        self.skipped = 0
+        if os.path.isfile(self.file_path):
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as in_file:
+                    self.stored_dict = json.load(in_file)
+            except (OSError, ValueError) as exc:
+                _LOGGER.warning("unable to load pages manifest %s: %s", self.file_path, exc)
+
+    ## check if page has to be generated, 'page_path' is main file of page
+    def is_changed(self, page_name, page_hash, page_path):
+        self.current_dict[page_name] = page_hash
+        if self.stored_dict.get(page_name) != page_hash:
+            return True
+        if not os.path.exists(page_path):
+            return True
+        self.skipped += 1
+        return False
+
+    ## returns names of pages stored in manifest, but not checked in current run
+    def get_stale_pages(self):
+        return [page_name for page_name in self.stored_dict if page_name not in self.current_dict]
+
+    ## store manifest, if 'merge' is True then hashes of pages not generated in current run are kept
+    def save(self, merge=False):
+        data_dict = self.current_dict
+        if merge:
+            data_dict = dict(self.stored_dict)
+            data_dict.update(self.current_dict)
+        write_file(self.file_path, json.dumps(data_dict, sort_keys=True))
@@ -0,0 +1,197 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Progress of long running phases (counting, rendering) with throughput and ETA.
+##
+## Progress is reported periodically by background thread - as progress bar (on terminal) or as log
+## lines, so lack of progress (e.g. hung cloc process) is also reported.
+##
+
+import os
+import logging
+
+import sys
+import time
+import threading
+from collections import deque
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+PROGRESS_MODES = ["auto", "bar", "log", "none"]
+
+## default interval of log lines (in seconds)
+PROGRESS_INTERVAL = 10.0
+
+## interval of refreshing progress bar (in seconds)
+BAR_INTERVAL = 0.5
+
+## time window of calculating current throughput (in seconds)
+RATE_WINDOW = 60.0
+
+## time without progress after which warning is logged (in seconds)
+STALL_TIME = 300.0
+
+
+## progress is disabled until configured (e.g. when used as library)
+PROGRESS_CONFIG = {"mode": "none", "interval": PROGRESS_INTERVAL}
+
+
+def configure_progress(mode="auto", interval=PROGRESS_INTERVAL):
+    """Set mode of progress reporting: 'bar', 'log', 'none' or 'auto' (bar on terminal, otherwise log)."""
+    if mode == "auto":
+        mode = "bar" if sys.stderr.isatty() else "log"
+    if mode not in PROGRESS_MODES:
+        raise ValueError(f"unknown progress mode: {mode}")
+    PROGRESS_CONFIG["mode"] = mode
+    PROGRESS_CONFIG["interval"] = interval
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+##
+class ProgressTracker:
+    """Tracks completed and pending work units of phase. Methods can be called from many threads.
+
+    If 'total' is not known, then ETA is not calculated.
+    """
+
+    def __init__(self, name, total=None, mode=None, interval=None):
+        self.name = name
+        self.total = total
+        self.mode = PROGRESS_CONFIG["mode"] if mode is None else mode
+        self.interval = PROGRESS_CONFIG["interval"] if interval is None else interval
+        self.lock = threading.Lock()
+        self.done = 0
+        self.pending = 0
+        self.start_time = time.perf_counter()
+        self.last_progress = self.start_time
+        ## samples (time, done) for calculating current throughput
+        self.samples = deque([(self.start_time, 0)])
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        if self.mode == "none" or self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def add_pending(self, count=1):
+        with self.lock:
+            self.pending += count
+
+    def update(self, count=1):
+        with self.lock:
+            self.done += count
+            self.pending = max(0, self.pending - count)
+            self.last_progress = time.perf_counter()
+
+    def get_state(self):
+        """Returns dict: 'done', 'pending', 'total', 'elapsed', 'idle', 'rate' (units per second), 'eta'."""
+        now = time.perf_counter()
+        with self.lock:
+            done = self.done
+            pending = self.pending
+            idle = now - self.last_progress
+            self.samples.append((now, done))
+            while len(self.samples) > 2 and now - self.samples[1][0] > RATE_WINDOW:
+                self.samples.popleft()
+            sample_time, sample_done = self.samples[0]
+        rate = 0.0
+        if now > sample_time:
+            rate = (done - sample_done) / (now - sample_time)
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(0, self.total - done) / rate
+        return {
+            "done": done,
+            "pending": pending,
+            "total": self.total,
+            "elapsed": now - self.start_time,
+            "idle": idle,
+            "rate": rate,
+            "eta": eta,
+        }
+
+    def format_state(self, state_dict=None):
+        if state_dict is None:
+            state_dict = self.get_state()
+        done = state_dict["done"]
+        total = state_dict["total"]
+        if total:
+            text = f"{self.name}: {done}/{total} ({done * 100 / total:.1f}%)"
+        else:
+            text = f"{self.name}: {done} done"
+        if state_dict["pending"]:
+            text += f", {state_dict['pending']} pending"
+        text += f", {state_dict['rate']:.1f}/s, elapsed {format_duration(state_dict['elapsed'])}"
+        if state_dict["eta"] is not None:
+            text += f", ETA {format_duration(state_dict['eta'])}"
+        return text
+
+    def report(self):
+        state_dict = self.get_state()
+        text = self.format_state(state_dict)
+        if self.mode == "bar":
+            sys.stderr.write("\r" + text + "\033[K")
+            sys.stderr.flush()
+        elif self.mode == "log":
+            _LOGGER.info("progress: %s", text)
+        if state_dict["idle"] >= STALL_TIME and (state_dict["pending"] or state_dict["done"] != state_dict["total"]):
+            if self.mode == "bar":
+                sys.stderr.write("\n")
+            _LOGGER.warning("%s: no progress for %s", self.name, format_duration(state_dict["idle"]))
+            with self.lock:
+                ## warn again after next period of stall
+                self.last_progress = time.perf_counter()
+
+    def _run(self):
+        interval = BAR_INTERVAL if self.mode == "bar" else self.interval
+        while not self.stop_event.wait(interval):
+            self.report()
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        state_dict = self.get_state()
+        if self.mode == "bar":
+            sys.stderr.write("\r" + self.format_state(state_dict) + "\033[K\n")
+            sys.stderr.flush()
+        _LOGGER.info(
+            "%s finished: %s units in %s", self.name, state_dict["done"], format_duration(state_dict["elapsed"])
+        )
+
+
+def track_progress(items_iter, name, total=None):
+    """Pass items of iterator through and report progress of consumed items."""
+    with ProgressTracker(name, total) as progress:
+        for item in items_iter:
+            progress.update()
+            yield item
@@ -0,0 +1,181 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Statistics of run: timers of stages, counters and the slowest items, stored as JSON report.
+##
+## Stages measured by 'measure' can overlap (counting and rendering are streamed) and can be executed
+## in many threads - then wall time is sum of times of all calls. CPU time of stage is CPU time of
+## executing thread, time of subprocesses (cloc, graphviz) is reported as 'children_cpu' of whole run.
+##
+## Since Python 3.12 profiler is based on 'sys.monitoring': only one profiler can be active and it
+## covers all threads. Before 3.12 profiler covers only thread enabling it, so worker threads have
+## their own profilers merged when profile is stored.
+##
+
+import os
+import sys
+import logging
+
+import time
+import json
+import heapq
+import threading
+import contextlib
+import cProfile
+import pstats
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+REPORT_FILE_NAME = "run-report.json"
+PROFILE_FILE_NAME = "run-profile.prof"
+
+## number of the slowest items kept for each category
+SLOWEST_NUM = 20
+
+## profiler of main thread covers also other threads
+GLOBAL_PROFILER = sys.version_info >= (3, 12)
+
+
+##
+class RunStats:
+    """Thread-safe collector of statistics of run."""
+
+    def __init__(self, slowest_num=SLOWEST_NUM):
+        self.slowest_num = slowest_num
+        self.lock = threading.Lock()
+        self.start_wall = time.perf_counter()
+        self.start_times = os.times()
+        ## stage name -> dict: 'wall', 'cpu', 'calls'
+        self.stages = {}
+        ## counter name -> value
+        self.counters = {}
+        ## category -> heap of tuples (duration, item)
+        self.slowest = {}
+        self.profilers = None
+        self.thread_data = threading.local()
+
+    @contextlib.contextmanager
+    def measure(self, stage_name, item=None):
+        """Measure time of block of code, 'item' (e.g. directory) is recorded among the slowest of the stage."""
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_wall
+            cpu_time = time.thread_time() - start_cpu
+            with self.lock:
+                stage_dict = self.stages.get(stage_name)
+                if stage_dict is None:
+                    stage_dict = {"wall": 0.0, "cpu": 0.0, "calls": 0}
+                    self.stages[stage_name] = stage_dict
+                stage_dict["wall"] += wall_time
+                stage_dict["cpu"] += cpu_time
+                stage_dict["calls"] += 1
+                if item is not None:
+                    self._add_slowest(stage_name, item, wall_time)
+
+    def _add_slowest(self, category, item, duration):
+        heap = self.slowest.setdefault(category, [])
+        if len(heap) < self.slowest_num:
+            heapq.heappush(heap, (duration, item))
+        elif duration > heap[0][0]:
+            heapq.heapreplace(heap, (duration, item))
+
+    def add(self, counter_name, value=1):
+        with self.lock:
+            self.counters[counter_name] = self.counters.get(counter_name, 0) + value
+
+    ## start profiling of main thread and of threads executing functions wrapped by 'profiled'
+    def enable_profiling(self):
+        self.profilers = [cProfile.Profile()]
+        self.thread_data.profiler = self.profilers[0]
+        self.profilers[0].enable()
+
+    def profiled(self, function):
+        """Wrap function executed by worker thread, so it is profiled if profiling is enabled."""
+        if self.profilers is None or GLOBAL_PROFILER:
+            return function
+
+        def wrapper(*args):
+            profiler = getattr(self.thread_data, "profiler", None)
+            if profiler is None:
+                profiler = cProfile.Profile()
+                self.thread_data.profiler = profiler
+                with self.lock:
+                    self.profilers.append(profiler)
+            if profiler is self.profilers[0]:
+                ## executed in main thread - already profiled
+                return function(*args)
+            try:
+                profiler.enable()
+            except ValueError:
+                ## other profiler is active - thread is not profiled
+                return function(*args)
+            try:
+                return function(*args)
+            finally:
+                profiler.disable()
+
+        return wrapper
+
+    def to_dict(self):
+        end_times = os.times()
+        with self.lock:
+            slowest_dict = {}
+            for category, heap in self.slowest.items():
+                items_list = sorted(heap, reverse=True)
+                slowest_dict[category] = [{"item": item, "wall": duration} for duration, item in items_list]
+            return {
+                "wall": time.perf_counter() - self.start_wall,
+                "cpu": end_times.user + end_times.system - self.start_times.user - self.start_times.system,
+                "children_cpu": end_times.children_user
+                + end_times.children_system
+                - self.start_times.children_user
+                - self.start_times.children_system,
+                "stages": {name: dict(stage_dict) for name, stage_dict in self.stages.items()},
+                "counters": dict(self.counters),
+                "slowest": slowest_dict,
+            }
+
+    def save(self, out_dir):
+        """Write report (and profile if enabled) to given directory."""
+        os.makedirs(out_dir, exist_ok=True)
+        report_path = os.path.join(out_dir, REPORT_FILE_NAME)
+        _LOGGER.info("writing run report: %s", report_path)
+        with open(report_path, "w", encoding="utf-8") as out_file:
+            json.dump(self.to_dict(), out_file, indent=4)
+
+        if self.profilers is not None:
+            self.profilers[0].disable()
+            profile_stats = pstats.Stats(self.profilers[0])
+            for profiler in self.profilers[1:]:
+                profile_stats.add(profiler)
+            profile_path = os.path.join(out_dir, PROFILE_FILE_NAME)
+            _LOGGER.info("writing profile: %s", profile_path)
+            profile_stats.dump_stats(profile_path)
+
+
+RUN_STATS = RunStats()
+
+
+## returns statistics of current run
+def get_run_stats():
+    return RUN_STATS
+
+
+## start collecting statistics of new run, returns new statistics
+def reset_run_stats():
+    global RUN_STATS  # pylint: disable=W0603
+    RUN_STATS = RunStats()
+    return RUN_STATS
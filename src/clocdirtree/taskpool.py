@@ -0,0 +1,146 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+import threading
+import queue
+from collections import deque
+from multiprocessing.pool import ThreadPool as Pool
+
+from clocdirtree.runstats import get_run_stats
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_jobs_number(jobs=None):
+    if jobs is None or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def execute_bounded(function, args_iter, jobs=None, queue_size=None):
+    """Execute function for each arguments list from given iterable using pool of threads.
+
+    Number of queued tasks is limited, so items of iterable are consumed while workers complete tasks.
+    First error raised by task stops processing and is raised again.
+    """
+    jobs = get_jobs_number(jobs)
+    if queue_size is None:
+        queue_size = jobs * 2
+
+    slots = threading.BoundedSemaphore(queue_size)
+    errors_list = []
+    function = get_run_stats().profiled(function)
+
+    def on_done(_result):
+        slots.release()
+
+    def on_error(exc):
+        errors_list.append(exc)
+        slots.release()
+
+    with Pool(processes=jobs) as worker_pool:
+        for args in args_iter:
+            slots.acquire()  # pylint: disable=R1732
+            if errors_list:
+                slots.release()
+                break
+            worker_pool.apply_async(function, args, callback=on_done, error_callback=on_error)
+        worker_pool.close()
+        worker_pool.join()
+
+    if errors_list:
+        raise errors_list[0]
+
+
+def execute_prioritized(function, tasks_list, jobs=None, heavy_jobs=None, heavy_weight=None, keep_light_order=False):
+    """Execute tasks in pool of threads starting from the heaviest ones.
+
+    'tasks_list' contains tuples (key, arguments list, weight). Tasks with weight greater or equal
+    'heavy_weight' are heavy - no more than 'heavy_jobs' of them run at the same time, remaining
+    workers take lighter tasks meanwhile. If 'keep_light_order' is True, then only heavy tasks are
+    ordered by weight and light tasks are started in given order.
+    Yields tuples (key, result) in order of completion.
+    First error raised by task stops processing and is raised again.
+    """
+    jobs = get_jobs_number(jobs)
+    if heavy_jobs is None or heavy_jobs < 1:
+        heavy_jobs = jobs
+    function = get_run_stats().profiled(function)
+
+    ordered_list = tasks_list
+    if not keep_light_order:
+        ordered_list = sorted(tasks_list, key=lambda task: task[2], reverse=True)
+    heavy_queue = deque()
+    light_queue = deque()
+    for task in ordered_list:
+        if heavy_weight is not None and task[2] >= heavy_weight:
+            heavy_queue.append(task)
+        else:
+            light_queue.append(task)
+    if keep_light_order:
+        heavy_queue = deque(sorted(heavy_queue, key=lambda task: task[2], reverse=True))
+
+    condition = threading.Condition()
+    state = {"heavy_running": 0, "stop": False}
+    results_queue: queue.Queue = queue.Queue()
+
+    def take_task():
+        with condition:
+            while True:
+                if state["stop"]:
+                    return None, False
+                if heavy_queue and state["heavy_running"] < heavy_jobs:
+                    state["heavy_running"] += 1
+                    return heavy_queue.popleft(), True
+                if light_queue:
+                    return light_queue.popleft(), False
+                if not heavy_queue:
+                    return None, False
+                ## only heavy tasks left - wait for running heavy task to finish
+                condition.wait()
+
+    def worker():
+        while True:
+            task, is_heavy = take_task()
+            if task is None:
+                return
+            key, args, _weight = task
+            try:
+                result = function(*args)
+                results_queue.put((key, result, None))
+            except BaseException as exc:  # pylint: disable=W0718
+                results_queue.put((key, None, exc))
+            finally:
+                if is_heavy:
+                    with condition:
+                        state["heavy_running"] -= 1
+                        condition.notify_all()
+
+    workers_number = min(jobs, len(ordered_list))
+    workers_list = [threading.Thread(target=worker, daemon=True) for _ in range(0, workers_number)]
+    for worker_thread in workers_list:
+        worker_thread.start()
+
+    try:
+        for _ in range(0, len(ordered_list)):
+            key, result, exc = results_queue.get()
+            if exc is not None:
+                raise exc
+            yield key, result
+    finally:
+        with condition:
+            state["stop"] = True
+            condition.notify_all()
+        for worker_thread in workers_list:
+            worker_thread.join()
@@ -0,0 +1,205 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+##
+class TreeNode:
+    """Node of directories tree.
+
+    'children' is dict: name -> child node, created on first child (None for leaves).
+    """
+
+    __slots__ = ("name", "parent", "children", "value")
+
+    def __init__(self, name, parent=None, value=None):
+        self.name = name
+        self.parent = parent
+        self.children = None
+        self.value = value
+
+    def add_child(self, name, value=None):
+        child = TreeNode(name, self, value)
+        if self.children is None:
+            self.children = {}
+        self.children[name] = child
+        return child
+
+    ## returns list of names from top node to the node
+    def get_path_list(self):
+        ret_list = []
+        node = self
+        while node.parent is not None:
+            ret_list.append(node.name)
+            node = node.parent
+        ret_list.reverse()
+        return ret_list
+
+
+def build_tree(data_dict, split_string="/"):
+    """Build tree from dict: path -> value, returns top node (without name) containing first path components.
+
+    Tree is built iteratively. Nodes of added paths are indexed, so parent of path is found by single
+    lookup if parents are added before children (e.g. in order returned by 'walk_tree').
+    """
+    top_node = TreeNode(None)
+    nodes_dict = {}
+    for key, value in data_dict.items():
+        node = nodes_dict.get(key)
+        if node is None:
+            node = get_tree_node(top_node, nodes_dict, key, split_string)
+        node.value = value
+    return top_node
+
+
+## find node of given path, missing nodes are created
+def get_tree_node(top_node, nodes_dict, key, split_string="/"):
+    missing_list = []
+    node = None
+    path = key
+    while node is None:
+        sep_pos = path.rfind(split_string)
+        if sep_pos < 0:
+            missing_list.append((path, path))
+            node = top_node
+            break
+        missing_list.append((path, path[sep_pos + len(split_string) :]))
+        path = path[:sep_pos]
+        node = nodes_dict.get(path)
+    for path, name in reversed(missing_list):
+        node = node.add_child(name)
+        nodes_dict[path] = node
+    return node
+
+
+def iterate_tree(top_node):
+    """Iterate nodes of tree in pre-order (parent first) without recursion, top node is not yielded."""
+    stack = []
+    if top_node.children:
+        stack.extend(reversed(top_node.children.values()))
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.children:
+            stack.extend(reversed(node.children.values()))
+
+
+##
+class TreeBuilder:
+    """Incremental builder of directories tree pages.
+
+    Results of directories can be added in any order. Page of directory is emitted as soon as results
+    of the directory and all its subdirectories are received. Then data of the subtree is released,
+    only code lines of the directory are kept in its parent.
+
+    Node is created when result of directory or of its first subdirectory is received, so nodes
+    (and results) are kept only for directories with incomplete subtrees. Results added children first,
+    subtree after subtree (as yielded by counting functions of 'clocparser'), keep nodes only for ancestors
+    of current subtree, so number of nodes is bounded by depth of the tree and each node keeps code lines
+    of at most all its subdirectories. Results added out of that order (heavy directories counted first,
+    results of parallel workers completed out of order) are kept until their subtrees complete.
+    Besides nodes, number of missing results is kept for each not completed directory.
+
+    Children of nodes are dicts: name of completed subdirectory -> code lines.
+    """
+
+    def __init__(self, root_dir, dirs_list, root_name="index"):
+        self.root_dir = root_dir
+        self.root_name = root_name
+        ## directory -> number of missing results (of the directory and of its direct subdirectories)
+        self.pending = dict.fromkeys(dirs_list, 1)
+        for dir_path in dirs_list:
+            if dir_path == root_dir:
+                continue
+            parent_path = get_parent_path(dir_path, dir_path.rpartition(os.sep)[2])
+            if parent_path in self.pending:
+                self.pending[parent_path] += 1
+        ## directory -> node with received data of directory with incomplete subtree
+        self.nodes = {}
+
+    ## returns name of page of given directory, e.g. 'index/dir/subdir'
+    def get_page_name(self, dir_path):
+        rel_path = dir_path.removeprefix(self.root_dir)
+        return self.root_name + rel_path.replace(os.sep, "/")
+
+    def get_node(self, dir_path):
+        node = self.nodes.get(dir_path)
+        if node is None:
+            node = TreeNode(dir_path.rpartition(os.sep)[2])
+            self.nodes[dir_path] = node
+        return node
+
+    def add(self, dir_path, result):
+        """Add result of directory, returns list of completed pages.
+
+        Each page is tuple: (page name, dict: subdirectory name -> code lines, ClocResult).
+        Directories without code lines do not have pages.
+        """
+        if dir_path not in self.pending:
+            _LOGGER.warning("unexpected directory result: %s", dir_path)
+            return []
+        node = self.get_node(dir_path)
+        node.value = result
+
+        pages_list = []
+        while True:
+            pending = self.pending[dir_path] - 1
+            if pending > 0:
+                self.pending[dir_path] = pending
+                break
+            del self.pending[dir_path]
+            del self.nodes[dir_path]
+            code = 0
+            if node.value is not None:
+                code = node.value.code
+            if code > 0:
+                graph_dict = node.children
+                if graph_dict is None:
+                    graph_dict = {}
+                pages_list.append((self.get_page_name(dir_path), graph_dict, node.value))
+            if dir_path == self.root_dir:
+                break
+            parent_path = get_parent_path(dir_path, node.name)
+            if parent_path not in self.pending:
+                break
+            parent_node = self.get_node(parent_path)
+            if code > 0:
+                if parent_node.children is None:
+                    parent_node.children = {}
+                parent_node.children[node.name] = code
+            dir_path = parent_path
+            node = parent_node
+        return pages_list
+
+    def is_complete(self):
+        return not self.pending
+
+
+## faster equivalent of 'os.path.dirname' for normalized paths
+def get_parent_path(dir_path, dir_name):
+    return dir_path[: len(dir_path) - len(dir_name) - 1] or os.sep
+
+
+def iterate_tree_pages(root_dir, dirs_list, results_iter, root_name="index"):
+    """Build pages of directories tree from stream of results.
+
+    'results_iter' yields tuples (directory path, ClocResult) of directories from 'dirs_list'.
+    Yields pages in order of completion: (page name, dict: subdirectory name -> code lines, ClocResult).
+    """
+    builder = TreeBuilder(root_dir, dirs_list, root_name)
+    for dir_path, result in results_iter:
+        yield from builder.add(dir_path, result)
+    if not builder.is_complete():
+        _LOGGER.warning("missing results of %s directories", len(builder.pending))
@@ -0,0 +1,480 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Single page viewer: one HTML file drawing treemap or sunburst of directories tree in the browser.
+##
+## Tree is stored in chunks of JavaScript files (JSONP style, so viewer works also when opened directly
+## from disk). Node of tree is object: {"n": name, "c": code lines, "l": [[language, files, blank, comment,
+## code], ...], "k": [subdirectories]}. Subtree moved to separate chunk is replaced by stub: {"n": name,
+## "c": code lines, "r": chunk id}. Chunks are loaded on demand when user enters subtree.
+##
+
+import os
+import logging
+
+import json
+import html
+
+from clocdirtree.io import write_file
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## maximum number of nodes in single chunk (approximately)
+CHUNK_SIZE = 2000
+
+DATA_DIR_NAME = "viewer"
+
+
+##
+class ViewerWriter:
+    """Writes chunks of tree data from pages emitted in order of subtrees completion (children first).
+
+    Completed subtree is moved to separate chunk when its parent would exceed chunk size, so only
+    data of not yet written subtrees is kept in memory.
+    """
+
+    def __init__(self, out_dir, title="index", chunk_size=CHUNK_SIZE):
+        self.out_dir = out_dir
+        self.data_dir = os.path.join(out_dir, DATA_DIR_NAME)
+        self.title = title
+        self.chunk_size = chunk_size
+        ## page name -> (node, number of nodes in subtree)
+        self.pending = {}
+        self.chunks_num = 0
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        ## remove chunks of previous run
+        for file_name in os.listdir(self.data_dir):
+            if file_name.startswith("chunk-") and file_name.endswith(".js"):
+                os.remove(os.path.join(self.data_dir, file_name))
+
+    def add_page(self, page_name, graph_dict, cloc_result):
+        node = {"n": page_name.rpartition("/")[2], "c": cloc_result.code}
+        node["l"] = [[language, *counts] for language, counts in cloc_result.get_lang_dict().items()]
+
+        children_list = []
+        subtree_size = 1
+        for name in graph_dict:
+            child_data = self.pending.pop(page_name + "/" + name, None)
+            if child_data is None:
+                continue
+            children_list.append(child_data)
+            subtree_size += child_data[1]
+
+        if subtree_size > self.chunk_size:
+            ## move the largest subtrees to separate chunks
+            children_list.sort(key=lambda item: item[1], reverse=True)
+            for index, (child_node, child_size) in enumerate(children_list):
+                if subtree_size <= self.chunk_size or child_size < 2:
+                    break
+                children_list[index] = (self.write_chunk(self.chunks_num, child_node), 1)
+                self.chunks_num += 1
+                subtree_size -= child_size - 1
+
+        if children_list:
+            node["k"] = sorted((item[0] for item in children_list), key=lambda item: item["c"], reverse=True)
+        self.pending[page_name] = (node, subtree_size)
+
+    ## write subtree to chunk file, returns stub of subtree
+    def write_chunk(self, chunk_id, node):
+        content = json.dumps(node, separators=(",", ":"))
+        chunk_path = os.path.join(self.data_dir, f"chunk-{chunk_id}.js")
+        write_file(chunk_path, f"clocViewerChunk({json.dumps(chunk_id)},{content});\n")
+        return {"n": node["n"], "c": node["c"], "r": chunk_id}
+
+    def close(self):
+        root_node = None
+        if len(self.pending) == 1:
+            root_node = next(iter(self.pending.values()))[0]
+        elif self.pending:
+            ## incomplete tree - join remaining subtrees under artificial root
+            children_list = [item[0] for item in self.pending.values()]
+            root_node = {"n": self.title, "c": sum(item["c"] for item in children_list), "l": [], "k": children_list}
+        else:
+            root_node = {"n": self.title, "c": 0, "l": []}
+        root_node["n"] = self.title
+        self.pending = {}
+        self.write_chunk("root", root_node)
+        _LOGGER.info("viewer data chunks written: %s", self.chunks_num + 1)
+
+        content = VIEWER_TEMPLATE.replace("%TITLE%", html.escape(self.title))
+        content = content.replace("%DATA_DIR%", DATA_DIR_NAME)
+        out_file = os.path.join(self.out_dir, "index.html")
+        _LOGGER.info("writing viewer page: %s", out_file)
+        write_file(out_file, content)
+
+
+def generate_viewer(pages_iter, out_dir, title="index", chunk_size=CHUNK_SIZE):
+    """Generate single page viewer from pages yielded in order of subtrees completion.
+
+    'pages_iter' yields tuples: (page name, dict: subdirectory name -> code lines, ClocResult).
+    """
+    writer = ViewerWriter(out_dir, title, chunk_size)
+    for page_name, graph_dict, cloc_result in pages_iter:
+        writer.add_page(page_name, graph_dict, cloc_result)
+    writer.close()
+
+
+VIEWER_TEMPLATE = """\
+<!DOCTYPE HTML>
+<!--
+File was automatically generated using 'cloc-directory-tree' project.
+Project is distributed under the BSD 3-Clause license.
+-->
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>cloc view: %TITLE%</title>
+    <style>
+        body {  background-color: #bbbbbb;
+                font-family: sans-serif;
+             }
+        .section { margin-bottom: 12px; }
+        #chart { background-color: rgb(226, 226, 226); }
+        #chart text { pointer-events: none; font-size: 12px; }
+        #chart .node { cursor: pointer; stroke: #ffffff; }
+        #chart .files { fill: #999999; stroke: #ffffff; }
+        #summary { border-collapse: collapse; background-color: rgb(226, 226, 226); }
+        #summary td, #summary th { padding: 2px 12px; text-align: right; }
+        #summary td:first-child, #summary th:first-child { text-align: left; }
+    </style>
+</head>
+<body>
+    <div class="section">Directory: <span id="path"></span></div>
+    <div class="section">
+        View:
+        <label><input type="radio" name="view" value="treemap" checked> treemap</label>
+        <label><input type="radio" name="view" value="sunburst"> sunburst</label>
+    </div>
+    <div class="section"><svg id="chart" width="960" height="640"></svg></div>
+    <table id="summary" class="section"></table>
+
+    <script>
+    var DATA_DIR = "%DATA_DIR%";
+    var SVG_NS = "http://www.w3.org/2000/svg";
+    var chunks = {};
+    var chunkCallbacks = {};
+    var rootNode = null;
+    var currentPath = [];
+    var viewType = "treemap";
+
+    function clocViewerChunk(chunkId, node) {
+        chunks[chunkId] = node;
+        var callbacks = chunkCallbacks[chunkId] || [];
+        delete chunkCallbacks[chunkId];
+        callbacks.forEach(function(callback) { callback(node); });
+    }
+
+    function loadChunk(chunkId, callback) {
+        if (chunkId in chunks) {
+            callback(chunks[chunkId]);
+            return;
+        }
+        if (chunkId in chunkCallbacks) {
+            chunkCallbacks[chunkId].push(callback);
+            return;
+        }
+        chunkCallbacks[chunkId] = [callback];
+        var script = document.createElement("script");
+        script.src = DATA_DIR + "/chunk-" + chunkId + ".js";
+        document.head.appendChild(script);
+    }
+
+    // replace stub of subtree with loaded data
+    function resolveNode(node, callback) {
+        if (node.r === undefined || node.l) {
+            callback(node);
+            return;
+        }
+        loadChunk(node.r, function(chunkNode) {
+            node.l = chunkNode.l;
+            node.k = chunkNode.k;
+            linkParents(node);
+            callback(node);
+        });
+    }
+
+    // set links to parents in loaded part of subtree (iteratively - depth of tree is not limited)
+    function linkParents(node) {
+        var stack = [node];
+        while (stack.length > 0) {
+            var parent = stack.pop();
+            (parent.k || []).forEach(function(child) {
+                child.parent = parent;
+                stack.push(child);
+            });
+        }
+    }
+
+    function currentNode() {
+        return currentPath[currentPath.length - 1];
+    }
+
+    function nodeColor(node, depth) {
+        var language = (node.l && node.l.length > 0) ? node.l[0][0] : node.n;
+        var hash = 0;
+        for (var i = 0; i < language.length; ++i) {
+            hash = (hash * 31 + language.charCodeAt(i)) % 360;
+        }
+        return "hsl(" + hash + ", 45%, " + (70 - depth * 10) + "%)";
+    }
+
+    function addElement(parent, name, attribs) {
+        var element = document.createElementNS(SVG_NS, name);
+        for (var key in attribs) {
+            element.setAttribute(key, attribs[key]);
+        }
+        parent.appendChild(element);
+        return element;
+    }
+
+    function addNodeElement(parent, name, attribs, node, depth) {
+        attribs["class"] = "node";
+        attribs["fill"] = nodeColor(node, depth);
+        var element = addElement(parent, name, attribs);
+        var title = addElement(element, "title", {});
+        title.textContent = node.n + "\\n" + node.c;
+        element.addEventListener("click", function() { enterNode(node); });
+        return element;
+    }
+
+    // squarified treemap of children, returns list of [node, x, y, width, height]
+    function layoutTreemap(items, x, y, width, height) {
+        var ret = [];
+        var total = 0;
+        items.forEach(function(item) { total += item.c; });
+        if (total <= 0) {
+            return ret;
+        }
+        var scale = width * height / total;
+        var row = [];
+        var rowArea = 0;
+
+        function worstRatio(rowItems, area, side) {
+            var worst = 0;
+            rowItems.forEach(function(item) {
+                var itemArea = item.c * scale;
+                var length = area / side;
+                var ratio = Math.max(length * length / itemArea, itemArea / (length * length));
+                worst = Math.max(worst, ratio);
+            });
+            return worst;
+        }
+
+        function placeRow() {
+            if (width >= height) {
+                var rowWidth = rowArea / height;
+                var posY = y;
+                row.forEach(function(item) {
+                    var itemHeight = item.c * scale / rowWidth;
+                    ret.push([item, x, posY, rowWidth, itemHeight]);
+                    posY += itemHeight;
+                });
+                x += rowWidth;
+                width -= rowWidth;
+            } else {
+                var rowHeight = rowArea / width;
+                var posX = x;
+                row.forEach(function(item) {
+                    var itemWidth = item.c * scale / rowHeight;
+                    ret.push([item, posX, y, itemWidth, rowHeight]);
+                    posX += itemWidth;
+                });
+                y += rowHeight;
+                height -= rowHeight;
+            }
+            row = [];
+            rowArea = 0;
+        }
+
+        var index = 0;
+        while (index < items.length) {
+            var item = items[index];
+            var side = Math.min(width, height);
+            var itemArea = item.c * scale;
+            if (row.length === 0 ||
+                worstRatio(row.concat([item]), rowArea + itemArea, side) <= worstRatio(row, rowArea, side)) {
+                row.push(item);
+                rowArea += itemArea;
+                index += 1;
+            } else {
+                placeRow();
+            }
+        }
+        if (row.length > 0) {
+            placeRow();
+        }
+        return ret;
+    }
+
+    // children and pseudo-node of files placed directly in directory
+    function nodeItems(node) {
+        var items = (node.k || []).slice();
+        var childrenCode = 0;
+        items.forEach(function(item) { childrenCode += item.c; });
+        if (node.c > childrenCode) {
+            items.push({"n": ".", "c": node.c - childrenCode, "files": true});
+        }
+        items.sort(function(a, b) { return b.c - a.c; });
+        return items;
+    }
+
+    function drawTreemap(chart, node, x, y, width, height, depth) {
+        layoutTreemap(nodeItems(node), x, y, width, height).forEach(function(rect) {
+            var item = rect[0];
+            var attribs = {"x": rect[1], "y": rect[2], "width": Math.max(0, rect[3]), "height": Math.max(0, rect[4])};
+            if (item.files) {
+                attribs["class"] = "files";
+                var files = addElement(chart, "rect", attribs);
+                addElement(files, "title", {}).textContent = "files of directory\\n" + item.c;
+                return;
+            }
+            addNodeElement(chart, "rect", attribs, item, depth);
+            if (depth < 1 && item.k && rect[3] > 40 && rect[4] > 40) {
+                drawTreemap(chart, item, rect[1] + 4, rect[2] + 18, rect[3] - 8, rect[4] - 22, depth + 1);
+            }
+            if (rect[3] > 60 && rect[4] > 16) {
+                var label = addElement(chart, "text", {"x": rect[1] + 4, "y": rect[2] + 13});
+                label.textContent = item.n + " (" + item.c + ")";
+            }
+        });
+    }
+
+    function arcPath(cx, cy, inner, outer, start, end) {
+        if (end - start >= 2 * Math.PI) {
+            end = start + 2 * Math.PI - 0.0001;
+        }
+        var large = (end - start > Math.PI) ? 1 : 0;
+        function point(radius, angle) {
+            return (cx + radius * Math.sin(angle)) + "," + (cy - radius * Math.cos(angle));
+        }
+        return "M" + point(outer, start) + " A" + outer + "," + outer + " 0 " + large + " 1 " + point(outer, end) +
+               " L" + point(inner, end) +
+               " A" + inner + "," + inner + " 0 " + large + " 0 " + point(inner, start) + " Z";
+    }
+
+    function drawSunburst(chart, node, cx, cy, ring, start, end, depth) {
+        if (depth > 3 || node.c <= 0) {
+            return;
+        }
+        var angle = start;
+        nodeItems(node).forEach(function(item) {
+            var itemEnd = angle + (end - start) * item.c / node.c;
+            if (!item.files) {
+                var path = arcPath(cx, cy, ring * depth, ring * (depth + 1), angle, itemEnd);
+                addNodeElement(chart, "path", {"d": path}, item, depth - 1);
+                if (item.k) {
+                    drawSunburst(chart, item, cx, cy, ring, angle, itemEnd, depth + 1);
+                }
+            }
+            angle = itemEnd;
+        });
+    }
+
+    function drawSummary(node) {
+        var table = document.getElementById("summary");
+        var rows = ["<tr><th>Language</th><th>files</th><th>blank</th><th>comment</th><th>code</th></tr>"];
+        var sum = [0, 0, 0, 0];
+        (node.l || []).forEach(function(row) {
+            var cells = row.map(function(value) { return "<td>" + escapeHtml(String(value)) + "</td>"; });
+            rows.push("<tr>" + cells.join("") + "</tr>");
+            for (var i = 0; i < 4; ++i) {
+                sum[i] += row[i + 1];
+            }
+        });
+        rows.push("<tr><th>SUM:</th><th>" + sum.join("</th><th>") + "</th></tr>");
+        table.innerHTML = rows.join("");
+    }
+
+    function escapeHtml(text) {
+        return text.replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;");
+    }
+
+    function drawPath() {
+        var element = document.getElementById("path");
+        element.innerHTML = "";
+        currentPath.forEach(function(node, index) {
+            if (index > 0) {
+                element.appendChild(document.createTextNode(" / "));
+            }
+            var link = document.createElement("a");
+            link.href = "#";
+            link.textContent = node.n;
+            link.addEventListener("click", function(event) {
+                event.preventDefault();
+                currentPath = currentPath.slice(0, index + 1);
+                draw();
+            });
+            element.appendChild(link);
+        });
+    }
+
+    function draw() {
+        var node = currentNode();
+        var chart = document.getElementById("chart");
+        chart.innerHTML = "";
+        var width = chart.width.baseVal.value;
+        var height = chart.height.baseVal.value;
+        if (viewType === "sunburst") {
+            var ring = Math.min(width, height) / 2 / 5;
+            drawSunburst(chart, node, width / 2, height / 2, ring, 0, 2 * Math.PI, 1);
+        } else {
+            drawTreemap(chart, node, 0, 0, width, height, 0);
+        }
+        drawPath();
+        drawSummary(node);
+
+        // load data of displayed subdirectories
+        (node.k || []).forEach(function(child) {
+            if (child.r !== undefined && !child.l) {
+                resolveNode(child, function() {
+                    if (currentNode() === node) {
+                        draw();
+                    }
+                });
+            }
+        });
+    }
+
+    function enterNode(node) {
+        if (node.files) {
+            return;
+        }
+        resolveNode(node, function() {
+            // node can be drawn a few levels below current node - path is rebuilt from ancestors
+            var path = [];
+            for (var item = node; item; item = item.parent) {
+                path.unshift(item);
+            }
+            currentPath = path;
+            draw();
+        });
+    }
+
+    document.querySelectorAll("input[name=view]").forEach(function(input) {
+        input.addEventListener("change", function() {
+            viewType = input.value;
+            draw();
+        });
+    });
+
+    loadChunk("root", function(node) {
+        rootNode = node;
+        linkParents(rootNode);
+        currentPath = [rootNode];
+        draw();
+    });
+    </script>
+</body>
+</html>
+"""
@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+
+from clocdirtree.checkpoint import CountsJournal, PagesJournal, Quarantine
+from clocdirtree.clocresult import ClocResult
+
+
+class CountsJournalTest(unittest.TestCase):
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result = ClocResult.from_lang_dict({"Python": [1, 0, 0, 10]})
+            journal = CountsJournal(temp_dir, "src", {"engine": "cloc"})
+            results_list = list(journal.journal_results(iter([("src", result), ("src/aaa", ClocResult())])))
+            self.assertEqual(2, len(results_list))
+            journal.close()
+            ## line written partially
+            with open(journal.file_path, "a", encoding="utf-8") as out_file:
+                out_file.write('{"path": "bbb", "co')
+
+            journal = CountsJournal(temp_dir, "src", {"engine": "cloc"}, resume=True)
+            self.assertEqual(["src", os.path.join("src", "aaa")], list(journal.done_dict.keys()))
+            self.assertEqual(10, journal.done_dict["src"].code)
+            journal.add_result(os.path.join("src", "bbb"), result)
+            journal.close()
+
+            journal = CountsJournal(temp_dir, "src", {"engine": "cloc"}, resume=True)
+            self.assertEqual(3, len(journal.done_dict))
+            journal.close(remove=True)
+            self.assertFalse(os.path.exists(journal.file_path))
+
+    def test_params_changed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal = CountsJournal(temp_dir, "src", {"engine": "cloc"})
+            journal.add_result("src", ClocResult())
+            journal.close()
+
+            journal = CountsJournal(temp_dir, "src", {"engine": "native"}, resume=True)
+            self.assertEqual({}, journal.done_dict)
+            journal.close()
+
+    def test_no_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal = CountsJournal(temp_dir, "src", {"engine": "cloc"})
+            journal.add_result("src", ClocResult())
+            journal.close()
+
+            journal = CountsJournal(temp_dir, "src", {"engine": "cloc"})
+            self.assertEqual({}, journal.done_dict)
+            journal.close()
+            journal = CountsJournal(temp_dir, "src", {"engine": "cloc"}, resume=True)
+            self.assertEqual({}, journal.done_dict)
+            journal.close()
+
+
+class PagesJournalTest(unittest.TestCase):
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal = PagesJournal(temp_dir, {"engine": "neato"})
+            counts_journal = CountsJournal(temp_dir, "src", {"engine": "cloc"})
+            journal.add_page("index", "hash1")
+            journal.add_page("index/aaa", "hash2")
+            journal.close()
+
+            journal = PagesJournal(temp_dir, {"engine": "neato"}, resume=True)
+            self.assertEqual({"index": "hash1", "index/aaa": "hash2"}, journal.done_dict)
+            journal.close(remove=True)
+            ## checkpoint directory is removed with the last journal
+            checkpoint_dir = os.path.dirname(journal.file_path)
+            self.assertTrue(os.path.isdir(checkpoint_dir))
+            counts_journal.close(remove=True)
+            self.assertFalse(os.path.exists(checkpoint_dir))
+
+
+class QuarantineTest(unittest.TestCase):
+    def test_add(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "quarantine.json")
+            quarantine = Quarantine(file_path)
+            self.assertFalse(quarantine.contains("src/aaa"))
+            quarantine.add("src/aaa", "timeout")
+
+            quarantine = Quarantine(file_path)
+            self.assertTrue(quarantine.contains("src/aaa"))
+            self.assertEqual({"src/aaa": "timeout"}, quarantine.paths_dict)
+            self.assertEqual(["src/aaa"], quarantine.get_subtree("src"))
+            self.assertEqual([], quarantine.get_subtree("src/aa"))
+            self.assertEqual(["src/aaa"], quarantine.get_subtree("./"))
+            quarantine.clear()
+            self.assertFalse(os.path.exists(file_path))
+            self.assertFalse(Quarantine(file_path).contains("src/aaa"))
@@ -0,0 +1,55 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+import math
+import random
+
+from clocdirtree.circlepack import pack_circles, render_pack
+
+
+class CirclePackTest(unittest.TestCase):
+    def check_packing(self, radius_list):
+        circles_list, enclosing = pack_circles(radius_list)
+        self.assertEqual(radius_list, [circle.r for circle in circles_list])
+        for index, circle in enumerate(circles_list):
+            distance = math.hypot(circle.x - enclosing.x, circle.y - enclosing.y)
+            self.assertLessEqual(distance + circle.r, enclosing.r + 1e-6)
+            for other in circles_list[index + 1 :]:
+                distance = math.hypot(circle.x - other.x, circle.y - other.y)
+                self.assertGreaterEqual(distance, circle.r + other.r - 1e-6)
+        return enclosing
+
+    def test_pack_small(self):
+        self.assertEqual(0, pack_circles([])[1].r)
+        self.assertEqual(3, self.check_packing([3]).r)
+        self.assertEqual(5, self.check_packing([3, 2]).r)
+        self.check_packing([3, 2, 1])
+
+    def test_pack_many(self):
+        rand = random.Random(1)
+        radius_list = sorted((rand.uniform(1, 50) for _ in range(300)), reverse=True)
+        enclosing = self.check_packing(radius_list)
+        ## packing is reasonably dense
+        circles_area = sum(radius * radius for radius in radius_list)
+        self.assertGreater(circles_area / (enclosing.r * enclosing.r), 0.5)
+
+    def test_pack_deterministic(self):
+        radius_list = [10, 8, 8, 5, 3, 3, 2, 1]
+        circles_a, _ = pack_circles(radius_list)
+        circles_b, _ = pack_circles(radius_list)
+        self.assertEqual([(item.x, item.y) for item in circles_a], [(item.x, item.y) for item in circles_b])
+
+    def test_render_pack(self):
+        nodes_list = [(["aaa", "10"], 20, "index_aaa.html", "node: aaa"), (["b&b", "40"], 40, "index_bbb.html", "")]
+        svg_content, map_content = render_pack(nodes_list, "index")
+        self.assertTrue(svg_content.startswith("<svg "))
+        self.assertIn('xlink:href="index_aaa.html"', svg_content)
+        self.assertIn(">b&amp;b</text>", svg_content)
+        self.assertIn('<map id="index" name="index">', map_content)
+        self.assertEqual(2, map_content.count("<area "))
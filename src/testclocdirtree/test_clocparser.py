@@ -8,11 +8,23 @@
 
 import os
 import unittest
+import tempfile
+from unittest import mock
 
 
 from testclocdirtree.data import get_data_path
-from clocdirtree.clocparser import parse_cloc_raw
-from clocdirtree.io import read_file
+from clocdirtree.clocparser import parse_cloc_raw, parse_cloc_by_file, aggregate_files
+from clocdirtree.clocparser import cloc_dirs_cached, cloc_dirs_incremental, split_to_batches
+from clocdirtree.clocparser import run_cloc_command, configure_cloc_policy, ClocError
+from clocdirtree.clocparser import cloc_dirs, cloc_dirs_by_files, get_dirs_files
+from clocdirtree.clocparser import cloc_dirs_singlepass, execute_cloc_files
+from clocdirtree.checkpoint import Quarantine
+from clocdirtree.linecounter import count_files
+from clocdirtree.dirwalk import walk_tree, get_subtree_sizes
+from clocdirtree.countcache import FileCountCache
+from clocdirtree.io import read_file, write_file
+
+from benchclocdirtree.fakecloc import install_fake_cloc
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -35,3 +47,219 @@ class ClocParserTest(unittest.TestCase):
         self.assertEqual(
             "--------------------------------------------------------------------------------", output_lines[-1]
         )
+
+    def test_parse_cloc_by_file(self):
+        content_dict = {
+            "header": {"cloc_version": "1.98"},
+            "src/aaa.py": {"blank": 1, "comment": 2, "code": 3, "language": "Python"},
+            "SUM": {"blank": 1, "comment": 2, "code": 3, "nFiles": 1},
+        }
+        files_dict = parse_cloc_by_file(content_dict)
+        self.assertEqual({"src/aaa.py": ("Python", 1, 2, 3)}, files_dict)
+
+    def test_aggregate_files(self):
+        files_dict = {
+            "src/aaa.py": ("Python", 1, 2, 3),
+            "src/mod1/sub1/bbb.py": ("Python", 1, 1, 10),
+            "src/mod1/sub1/ccc.cpp": ("C++", 0, 0, 5),
+            "src/mod2/ddd.py": ("Python", 0, 0, 7),
+        }
+        dirs_data = aggregate_files(files_dict, "src")
+        self.assertEqual(
+            {
+                "src": {"Python": [3, 2, 3, 20], "C++": [1, 0, 0, 5]},
+                "src/mod1": {"Python": [1, 1, 1, 10], "C++": [1, 0, 0, 5]},
+                "src/mod1/sub1": {"Python": [1, 1, 1, 10], "C++": [1, 0, 0, 5]},
+                "src/mod2": {"Python": [1, 0, 0, 7]},
+            },
+            dirs_data,
+        )
+
+    def test_cloc_dirs_cached(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src_dir = os.path.join(temp_dir, "src")
+            sub_dir = os.path.join(src_dir, "sub")
+            os.makedirs(sub_dir)
+            src_path = os.path.join(sub_dir, "aaa.py")
+            write_file(src_path, "import os\n")
+            txt_path = os.path.join(sub_dir, "bbb.dat")
+            write_file(txt_path, "xxx\n")
+
+            db_path = os.path.join(temp_dir, "cache.sqlite")
+            with FileCountCache(db_path) as cache:
+                ## all files cached - cloc is not executed
+                cache.store({src_path: ("Python", 0, 0, 1), txt_path: None})
+                data_dict = dict(cloc_dirs_cached(src_dir, [src_dir, sub_dir], cache))
+
+        ## results are yielded children first
+        self.assertEqual([sub_dir, src_dir], list(data_dict.keys()))
+        self.assertEqual(1, data_dict[sub_dir].code)
+
+    def test_cloc_dirs_cached_interrupted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src_dir = os.path.join(temp_dir, "src")
+            os.makedirs(src_dir)
+            for index in range(5):
+                write_file(os.path.join(src_dir, f"file{index}.py"), "x = 1\n")
+            counted_list = []
+
+            def interrupted_counter(files_list):
+                if len(counted_list) >= 3:
+                    raise KeyboardInterrupt()
+                counted_list.extend(files_list)
+                return count_files(files_list)
+
+            db_path = os.path.join(temp_dir, "cache.sqlite")
+            with mock.patch("clocdirtree.clocparser.CACHE_STORE_CHUNK", 2):
+                with FileCountCache(db_path) as cache:
+                    with self.assertRaises(KeyboardInterrupt):
+                        list(cloc_dirs_cached(src_dir, [src_dir], cache, files_counter=interrupted_counter))
+                ## counts of finished chunks are kept in cache
+                with FileCountCache(db_path) as cache:
+                    self.assertEqual(sorted(counted_list), sorted(cache.load_dir(src_dir).keys()))
+                    counted_list.clear()
+                    data_dict = dict(cloc_dirs_cached(src_dir, [src_dir], cache, files_counter=interrupted_counter))
+            self.assertEqual(4, cache.hits)
+            self.assertEqual(1, len(counted_list))
+            self.assertEqual(5, data_dict[src_dir].code)
+
+    def test_cloc_dirs_incremental_removed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src_dir = os.path.join(temp_dir, "src")
+            sub_dir = os.path.join(src_dir, "sub")
+            os.makedirs(sub_dir)
+            src_path = os.path.join(src_dir, "aaa.py")
+            write_file(src_path, "import os\n")
+            removed_path = os.path.join(sub_dir, "bbb.py")
+            write_file(removed_path, "import os\nimport sys\n")
+
+            db_path = os.path.join(temp_dir, "cache.sqlite")
+            with FileCountCache(db_path) as cache:
+                cache.store({src_path: ("Python", 0, 0, 1), removed_path: ("Python", 0, 0, 2)})
+                os.remove(removed_path)
+                data_dict = dict(cloc_dirs_incremental(src_dir, [removed_path], cache))
+                loaded_dict = cache.load_dir(src_dir)
+
+        self.assertEqual([src_dir], list(data_dict.keys()))
+        self.assertEqual(1, data_dict[src_dir].code)
+        self.assertEqual({src_path: ("Python", 0, 0, 1)}, loaded_dict)
+
+    def test_split_to_batches(self):
+        dirs_list = ["/src", "/src/aaa", "/src/aaa/bbb", "/src/ccc", "/src/ddd", "/src/eee"]
+        size_dict = {"/src": 100, "/src/aaa": 5, "/src/aaa/bbb": 2, "/src/ccc": 4, "/src/ddd": 3, "/src/eee": 80}
+        single_list, batches_list = split_to_batches(dirs_list, size_dict, 10)
+
+        self.assertEqual(["/src", "/src/eee"], single_list)
+        self.assertEqual(
+            [{"/src/aaa": ["/src/aaa", "/src/aaa/bbb"], "/src/ccc": ["/src/ccc"]}, {"/src/ddd": ["/src/ddd"]}],
+            batches_list,
+        )
+
+    def test_run_cloc_command_retries(self):
+        configure_cloc_policy(timeout=None, retries=2, retry_delay=0.0)
+        try:
+            with self.assertRaises(ClocError):
+                run_cloc_command(["sh", "-c", "exit 3"], None)
+            output = run_cloc_command(["sh", "-c", "echo done"], None)
+            self.assertEqual("done\n", output)
+        finally:
+            configure_cloc_policy()
+
+    def test_run_cloc_command_timeout(self):
+        configure_cloc_policy(timeout=0.2, retries=0)
+        try:
+            with self.assertRaises(ClocError):
+                run_cloc_command(["sh", "-c", "sleep 5"], None)
+        finally:
+            configure_cloc_policy()
+
+
+class EnginesParityTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.env_backup = dict(os.environ)
+        bin_dir = install_fake_cloc(os.path.join(self.temp_dir.name, "bin"))
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.env_backup)
+        self.temp_dir.cleanup()
+
+    def test_vcs_dirs(self):
+        root_dir = os.path.join(self.temp_dir.name, "tree")
+        os.makedirs(os.path.join(root_dir, ".git", "hooks"))
+        os.makedirs(os.path.join(root_dir, "src", ".svn"))
+        write_file(os.path.join(root_dir, ".git", "hooks", "pre-commit.sample"), "#!/bin/sh\necho test\n")
+        write_file(os.path.join(root_dir, "src", ".svn", "entries.py"), "x = 1\n")
+        write_file(os.path.join(root_dir, "src", "aaa.py"), "x = 1\ny = 2\n")
+        write_file(os.path.join(root_dir, "run.sh"), "#!/bin/sh\necho test\n")
+
+        dirs_list = list(walk_tree(root_dir).keys())
+        self.assertEqual([root_dir, os.path.join(root_dir, "src")], dirs_list)
+        native_dict = dict(cloc_dirs_by_files(root_dir, dirs_list, count_files))
+        cloc_dict = dict(cloc_dirs(dirs_list, jobs=1))
+        self.assertEqual(cloc_dict, native_dict)
+        self.assertEqual(3, native_dict[root_dir].code)
+
+        ## directories of version control systems given explicitly
+        vcs_dirs = [os.path.join(root_dir, ".git", "hooks"), os.path.join(root_dir, "src", ".svn")]
+        self.assertEqual([], list(get_dirs_files(vcs_dirs)))
+
+    def test_quarantine_modes(self):
+        ## one failing file does not stop counting in any mode
+        configure_cloc_policy(retries=0)
+        self.addCleanup(configure_cloc_policy)
+        os.environ["FAKE_CLOC_FAIL"] = "bad.py"
+        root_dir = os.path.join(self.temp_dir.name, "tree")
+        sub_dir = os.path.join(root_dir, "sub")
+        os.makedirs(sub_dir)
+        write_file(os.path.join(root_dir, "aaa.py"), "x = 1\n")
+        write_file(os.path.join(sub_dir, "bad.py"), "x = 1\n")
+        write_file(os.path.join(sub_dir, "bbb.py"), "x = 1\ny = 2\n")
+        bad_path = os.path.join(sub_dir, "bad.py")
+        dirs_list = list(walk_tree(root_dir).keys())
+
+        with self.assertRaises(ClocError) as context:
+            execute_cloc_files([bad_path])
+        self.assertIn(f"list of 1 files (first: {bad_path})", str(context.exception))
+
+        quarantine = Quarantine(os.path.join(self.temp_dir.name, "singlepass", "quarantine.json"))
+        results_dict = dict(cloc_dirs_singlepass(root_dir, dirs_list, quarantine=quarantine))
+        self.assertEqual([bad_path], list(quarantine.paths_dict.keys()))
+        self.assertEqual(3, results_dict[root_dir].code)
+        self.assertEqual(2, results_dict[sub_dir].code)
+
+        quarantine = Quarantine(os.path.join(self.temp_dir.name, "cached", "quarantine.json"))
+        cache_path = os.path.join(self.temp_dir.name, "cache.sqlite")
+        with FileCountCache(cache_path) as count_cache:
+            results_dict = dict(cloc_dirs_cached(root_dir, dirs_list, count_cache, quarantine=quarantine))
+            self.assertEqual([bad_path], list(quarantine.paths_dict.keys()))
+            self.assertEqual(3, results_dict[root_dir].code)
+            ## quarantined file is not cached, so it is counted when quarantine is cleared
+            self.assertIsNone(count_cache.lookup(bad_path))
+
+            write_file(os.path.join(sub_dir, "bbb.py"), "x = 1\n")
+            results_dict = dict(
+                cloc_dirs_incremental(root_dir, [os.path.join(sub_dir, "bbb.py")], count_cache, quarantine=quarantine)
+            )
+            self.assertEqual(2, results_dict[root_dir].code)
+
+    def test_cloc_dirs_order(self):
+        root_dir = os.path.join(self.temp_dir.name, "tree")
+        for sub_path in ["aaa/bbb", "aaa/ccc", "ddd"]:
+            os.makedirs(os.path.join(root_dir, sub_path))
+            write_file(os.path.join(root_dir, sub_path, "src.py"), "x = 1\n")
+        dirs_dict = walk_tree(root_dir)
+        dirs_list = list(dirs_dict.keys())
+        size_dict = get_subtree_sizes(dirs_dict)
+
+        ## heavy directories first, other directories children first
+        results_list = list(cloc_dirs(dirs_list, jobs=1, size_dict=size_dict, heavy_size=2))
+        heavy_list = [root_dir, os.path.join(root_dir, "aaa")]
+        light_list = [dir_path for dir_path in reversed(dirs_list) if dir_path not in heavy_list]
+        self.assertEqual(heavy_list + light_list, [item[0] for item in results_list])
+
+        results_list = list(cloc_dirs(dirs_list, jobs=1, size_dict=size_dict, batch_size=10))
+        self.assertEqual(sorted(dirs_list), sorted(item[0] for item in results_list))
+        self.assertEqual(root_dir, results_list[-1][0])
@@ -0,0 +1,66 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from testclocdirtree.data import get_data_path
+from clocdirtree.clocresult import ClocResult, format_cloc_raw
+from clocdirtree.clocparser import parse_cloc_raw
+from clocdirtree.io import read_file
+
+
+class ClocResultTest(unittest.TestCase):
+    def test_from_lang_dict(self):
+        lang_dict = {"Python": [3, 2, 3, 20], "C++": [1, 0, 0, 5]}
+        result = ClocResult.from_lang_dict(lang_dict)
+
+        self.assertEqual(("Python", "C++"), result.languages)
+        self.assertEqual(25, result.code)
+        self.assertEqual([4, 2, 3, 25], result.get_sum())
+        self.assertEqual(lang_dict, result.get_lang_dict())
+
+    def test_from_cloc_json(self):
+        content_dict = {
+            "header": {"cloc_version": "1.98"},
+            "Python": {"nFiles": 2, "blank": 1, "comment": 2, "code": 3},
+            "SUM": {"nFiles": 2, "blank": 1, "comment": 2, "code": 3},
+        }
+        result = ClocResult.from_cloc_json(content_dict)
+        self.assertEqual({"Python": [2, 1, 2, 3]}, result.get_lang_dict())
+
+    def test_from_cloc_table(self):
+        cloc_output_path = get_data_path("cloc-log.txt")
+        cloc_output = read_file(cloc_output_path)
+
+        result = ClocResult.from_cloc_table(cloc_output)
+
+        self.assertEqual(1058181, result.code)
+        self.assertEqual(32, len(result.languages))
+        self.assertEqual([2710, 172723, 225471, 739165], result.get_lang_dict()["Python"])
+        self.assertEqual([1, 0, 1, 4], result.get_lang_dict()["Fortran 95"])
+
+    def test_empty(self):
+        result = ClocResult()
+        self.assertEqual(0, result.code)
+        self.assertEqual({}, result.get_lang_dict())
+
+    def test_format_cloc_raw(self):
+        lang_dict = {"Python": [3, 2, 3, 20], "C++": [1, 0, 0, 5]}
+        content = format_cloc_raw(lang_dict)
+
+        lines_count, output = parse_cloc_raw(content)
+        self.assertEqual(lines_count, 25)
+        output_lines = output.splitlines()
+        self.assertEqual(len(output_lines), 8)
+        self.assertEqual(
+            "Python                            3              2              3             20", output_lines[3]
+        )
+
+    def test_to_text(self):
+        result = ClocResult.from_lang_dict({"Python": [3, 2, 3, 20]})
+        self.assertEqual(format_cloc_raw({"Python": [3, 2, 3, 20]}), result.to_text())
@@ -0,0 +1,60 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+
+from clocdirtree.countcache import FileCountCache
+from clocdirtree.io import write_file
+
+
+class FileCountCacheTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.db_path = os.path.join(self.temp_dir.name, "cache.sqlite")
+        self.src_path = os.path.join(self.temp_dir.name, "aaa.py")
+        write_file(self.src_path, "import os\n")
+
+    def tearDown(self):
+        ## Called after testfunction was executed
+        self.temp_dir.cleanup()
+
+    def test_lookup_missing(self):
+        with FileCountCache(self.db_path) as cache:
+            self.assertEqual(None, cache.lookup(self.src_path))
+
+    def test_lookup_stored(self):
+        with FileCountCache(self.db_path) as cache:
+            cache.store({self.src_path: ("Python", 0, 0, 1)})
+        with FileCountCache(self.db_path) as cache:
+            self.assertEqual(("Python", 0, 0, 1), cache.lookup(self.src_path))
+
+    def test_lookup_ignored(self):
+        with FileCountCache(self.db_path) as cache:
+            cache.store({self.src_path: None})
+            self.assertEqual((None, 0, 0, 0), cache.lookup(self.src_path))
+
+    def test_lookup_modified(self):
+        with FileCountCache(self.db_path) as cache:
+            cache.store({self.src_path: ("Python", 0, 0, 1)})
+            write_file(self.src_path, "import os\nimport sys\n")
+            self.assertEqual(None, cache.lookup(self.src_path))
+
+    def test_lookup_touched(self):
+        with FileCountCache(self.db_path) as cache:
+            cache.store({self.src_path: ("Python", 0, 0, 1)})
+            os.utime(self.src_path, ns=(1, 1))
+            self.assertEqual(("Python", 0, 0, 1), cache.lookup(self.src_path))
+
+    def test_params_changed(self):
+        with FileCountCache(self.db_path, "aaa") as cache:
+            cache.store({self.src_path: ("Python", 0, 0, 1)})
+        with FileCountCache(self.db_path, "bbb") as cache:
+            self.assertEqual(None, cache.lookup(self.src_path))
@@ -0,0 +1,66 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+
+from clocdirtree.dirwalk import walk_tree, get_subtree_sizes
+from clocdirtree.excludefilter import ExcludeItemFilter
+from clocdirtree.io import write_file
+
+
+class DirWalkTest(unittest.TestCase):
+    def setUp(self):
+        ## Called before testfunction is executed
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.root_dir = self.temp_dir.name
+        for sub_dir in ["aaa/bbb", "aaa/skip/ccc", "ddd"]:
+            os.makedirs(os.path.join(self.root_dir, sub_dir))
+        write_file(os.path.join(self.root_dir, "aaa", "file1.txt"), "")
+        write_file(os.path.join(self.root_dir, "aaa", "file2.txt"), "")
+        write_file(os.path.join(self.root_dir, "aaa", "skip", "ccc", "file3.txt"), "")
+
+    def tearDown(self):
+        ## Called after testfunction was executed
+        self.temp_dir.cleanup()
+
+    def get_rel_dict(self, dirs_dict):
+        return {os.path.relpath(key, self.root_dir): val for key, val in dirs_dict.items()}
+
+    def test_walk_tree(self):
+        dirs_dict = walk_tree(self.root_dir)
+        rel_dict = self.get_rel_dict(dirs_dict)
+        self.assertEqual({".": 0, "aaa": 2, "aaa/bbb": 0, "aaa/skip": 0, "aaa/skip/ccc": 1, "ddd": 0}, rel_dict)
+
+        dirs_list = list(rel_dict.keys())
+        self.assertLess(dirs_list.index("aaa"), dirs_list.index("aaa/skip"))
+        self.assertLess(dirs_list.index("aaa/skip"), dirs_list.index("aaa/skip/ccc"))
+
+    def test_walk_tree_excluded(self):
+        exclude_filter = ExcludeItemFilter(["*/skip"])
+        dirs_dict = walk_tree(self.root_dir, exclude_filter)
+        rel_dict = self.get_rel_dict(dirs_dict)
+        self.assertEqual({".": 0, "aaa": 2, "aaa/bbb": 0, "ddd": 0}, rel_dict)
+
+    def test_walk_tree_parallel(self):
+        dirs_dict = walk_tree(self.root_dir, jobs=3)
+        self.assertEqual(walk_tree(self.root_dir), dirs_dict)
+
+    def test_get_subtree_sizes(self):
+        dirs_dict = walk_tree(self.root_dir)
+        size_dict = get_subtree_sizes(dirs_dict)
+        rel_dict = self.get_rel_dict(size_dict)
+        self.assertEqual({".": 3, "aaa": 3, "aaa/bbb": 0, "aaa/skip": 1, "aaa/skip/ccc": 1, "ddd": 0}, rel_dict)
+
+    def test_walk_tree_vcs(self):
+        os.makedirs(os.path.join(self.root_dir, ".git", "hooks"))
+        os.makedirs(os.path.join(self.root_dir, "ddd", "CVS"))
+        dirs_dict = walk_tree(self.root_dir)
+        rel_dict = self.get_rel_dict(dirs_dict)
+        self.assertEqual({".": 0, "aaa": 2, "aaa/bbb": 0, "aaa/skip": 0, "aaa/skip/ccc": 1, "ddd": 0}, rel_dict)
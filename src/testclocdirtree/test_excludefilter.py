@@ -6,9 +6,13 @@
 # LICENSE file in the root directory of this source tree.
 #
 
+import os
+import re
 import unittest
+import tempfile
 
-from clocdirtree.excludefilter import ExcludeItemFilter
+from clocdirtree.excludefilter import ExcludeItemFilter, load_exclude_file, wildcard_to_regex, exclude_to_cloc_regex
+from clocdirtree.io import write_file
 
 
 class ExcludeItemFilterTest(unittest.TestCase):
@@ -38,3 +42,73 @@ class ExcludeItemFilterTest(unittest.TestCase):
 
         is_excluded = filter_obj.excluded("/aaa/xxx/ccc")
         self.assertEqual(False, is_excluded)
+
+    def test_excluded_tree(self):
+        excluded = ["/aaa/bbb", "*/tmp"]
+        filter_obj = ExcludeItemFilter(excluded)
+
+        self.assertEqual(True, filter_obj.excluded_tree("/aaa/bbb/ccc", "/aaa"))
+        self.assertEqual(True, filter_obj.excluded_tree("/aaa/tmp/ccc/ddd", "/aaa"))
+        self.assertEqual(False, filter_obj.excluded_tree("/aaa/xxx/ccc", "/aaa"))
+        self.assertEqual(False, filter_obj.excluded_tree("/aaa/bbb/ccc", "/aaa/bbb/ccc"))
+
+    def test_excluded_escaped(self):
+        excluded = ["*/.git*", "*/a+b"]
+        filter_obj = ExcludeItemFilter(excluded)
+
+        self.assertEqual(True, filter_obj.excluded("/aaa/.git"))
+        self.assertEqual(False, filter_obj.excluded("/aaa/xgit"))
+        self.assertEqual(True, filter_obj.excluded("/aaa/a+b"))
+        self.assertEqual(False, filter_obj.excluded("/aaa/aab"))
+        self.assertEqual(True, filter_obj.excluded("/aaa/a+b/ccc"))
+
+    def test_excluded_prefix(self):
+        ## wildcard pattern matches beginning of path
+        filter_obj = ExcludeItemFilter(["*/build"])
+
+        self.assertEqual(True, filter_obj.excluded("/src/build"))
+        self.assertEqual(True, filter_obj.excluded("/src/build/aaa"))
+        self.assertEqual(True, filter_obj.excluded("/src/buildx"))
+        self.assertEqual(False, filter_obj.excluded("/src/xbuild"))
+        self.assertEqual(False, filter_obj.excluded("/src/aaa"))
+        self.assertEqual(True, filter_obj.excluded_tree("/src/buildx/aaa", "/src"))
+
+    def test_excluded_literal(self):
+        filter_obj = ExcludeItemFilter(["/aaa/bbb"])
+
+        self.assertEqual(True, filter_obj.excluded("/aaa/bbb"))
+        self.assertEqual(False, filter_obj.excluded("/aaa/bbb/ccc"))
+        self.assertEqual(True, filter_obj.excluded_tree("/aaa/bbb/ccc", "/aaa"))
+        self.assertEqual(False, filter_obj.excluded_tree("/aaa/bbbccc", "/aaa"))
+
+    def test_wildcard_to_regex(self):
+        self.assertEqual(r".*/tmp/[^/]\.txt", wildcard_to_regex("*/tmp/?.txt"))
+
+    def test_exclude_to_cloc_regex(self):
+        ## cloc excludes the same paths as filter
+        exclude_list = ["*/build", "/src/a+b", "*/tmp/?.txt"]
+        cloc_regex = re.compile(exclude_to_cloc_regex(exclude_list))
+        filter_obj = ExcludeItemFilter(exclude_list)
+        paths_list = [
+            "/src/build",
+            "/src/buildx/aaa",
+            "/src/xbuild",
+            "/src/a+b",
+            "/src/a+b/ccc",
+            "/src/a+bc",
+            "/src/aab",
+            "/src/tmp/a.txt",
+            "/src/tmp/ab.txt",
+            "/other/src/a+b",
+        ]
+        for path in paths_list:
+            excluded = filter_obj.excluded_tree(path, "/src")
+            self.assertEqual(excluded, cloc_regex.search(path) is not None, path)
+        self.assertIsNone(exclude_to_cloc_regex([]))
+
+    def test_load_exclude_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "exclude.txt")
+            write_file(file_path, "# comment\n\nnode_modules/\n*.pyc\n/build\ndoc/**/tmp\n!keep\n")
+            exclude_list = load_exclude_file(file_path, "/src")
+        self.assertEqual(["*/node_modules", "*/*.pyc", "/src/build", "/src/doc/*/tmp"], exclude_list)
@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+import json
+
+from clocdirtree.export import export_results, load_columns, get_column_path, load_jsonl, get_import_path
+from clocdirtree.export import NPY_MAGIC, NPY_HEADER_SIZE
+from clocdirtree.clocresult import ClocResult
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.results_list = [
+            ("/src", ClocResult.from_lang_dict({"Python": [3, 2, 3, 20], "C++": [1, 0, 0, 5]})),
+            ("/src/mod1", ClocResult.from_lang_dict({"C++": [1, 0, 0, 5]})),
+            ("/src/empty", ClocResult()),
+            ("/src/mod2/sub", ClocResult.from_lang_dict({"Python": [3, 2, 3, 20]})),
+        ]
+
+    def test_export_jsonl(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            passed_list = list(export_results(iter(self.results_list), temp_dir, ["jsonl"], "/src"))
+            with open(os.path.join(temp_dir, "tree.jsonl"), "r", encoding="utf-8") as in_file:
+                items_list = [json.loads(line) for line in in_file]
+
+        self.assertEqual(self.results_list, passed_list)
+        self.assertEqual(3, len(items_list))
+        self.assertEqual(
+            {"path": ".", "code": 25, "languages": {"Python": [3, 2, 3, 20], "C++": [1, 0, 0, 5]}}, items_list[0]
+        )
+        self.assertEqual("mod2/sub", items_list[2]["path"])
+
+    def test_load_jsonl(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list(export_results(iter(self.results_list), temp_dir, ["jsonl"], "/src"))
+            loaded_list = list(load_jsonl(os.path.join(temp_dir, "tree.jsonl")))
+
+        expected_list = [item for item in self.results_list if item[1].code > 0]
+        self.assertEqual(expected_list, [(get_import_path(path, "/src"), result) for path, result in loaded_list])
+
+    def test_export_npy(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            list(export_results(iter(self.results_list), temp_dir, ["npy"], "/src"))
+            columns_dir = os.path.join(temp_dir, "columns")
+
+            with open(os.path.join(columns_dir, "code.npy"), "rb") as in_file:
+                header = in_file.read(NPY_HEADER_SIZE)
+            columns_dict = load_columns(columns_dir)
+
+            self.assertTrue(header.startswith(NPY_MAGIC))
+            self.assertIn(b"'shape': (4,)", header)
+            self.assertEqual(["Python", "C++"], columns_dict["languages"])
+            self.assertEqual([0, 1, 5, 13], columns_dict["path_offsets"].tolist())
+            self.assertEqual(["mod1", "mod2/sub"], [get_column_path(columns_dict, index) for index in (1, 2)])
+            self.assertEqual([25, 5, 20], columns_dict["dir_code"].tolist())
+            self.assertEqual([0, 2, 3, 4], columns_dict["lang_offsets"].tolist())
+            self.assertEqual([0, 1, 1, 0], columns_dict["lang_id"].tolist())
+            self.assertEqual([20, 5, 5, 20], columns_dict["code"].tolist())
+            self.assertEqual([3, 1, 1, 3], columns_dict["files"].tolist())
+            columns_dict.clear()
@@ -6,9 +6,53 @@
 # LICENSE file in the root directory of this source tree.
 #
 
+import os
 import unittest
+import tempfile
+import subprocess  # nosec
+from unittest import mock
 
 from clocdirtree.graph import generate_graph, split_to_multi_dict, split_to_level_dict
+from clocdirtree.graph import render_graph_svg, store_graph_to_html
+
+
+SVG_OUTPUT = """\
+<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN"
+ "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">
+<svg width="62pt" height="62pt" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+<g id="node1" class="node">
+<g id="a_node1"><a xlink:href="index-aaa.html" xlink:title="node: aaa">
+<ellipse cx="27" cy="27" rx="27" ry="27"/>
+</a></g>
+</g>
+</svg>
+"""
+
+
+class FakeGraph:
+    """Graph with minimal interface used by rendering functions."""
+
+    def __init__(self, name="index"):
+        self.name = name
+
+    def empty(self):
+        return False
+
+    def getName(self):  # pylint: disable=C0103
+        return self.name
+
+    def toString(self):  # pylint: disable=C0103
+        return "digraph G {\naaa;\n}\n"
+
+
+## emulate graphviz writing output files given after '-o'
+def write_outputs(command, _graph):
+    for index, item in enumerate(command):
+        if item == "-o":
+            with open(command[index + 1], "w", encoding="utf-8") as out_file:
+                out_file.write(command[index - 1])
+    return ""
 
 
 class GraphTest(unittest.TestCase):
@@ -37,3 +81,42 @@ bbb [color=gray, fixedsize=true, label="bbb\\n30", shape=circle, width=8.0];
         data_dict = {"/aaa/bbb/ccc": 1, "/aaa/ddd": 2, "/aaa": 3, "/aaa/eee": 4}
         split_dict = split_to_level_dict(data_dict)
         self.assertEqual({2: {"/aaa": 3}, 3: {"/aaa/ddd": 2, "/aaa/eee": 4}, 4: {"/aaa/bbb/ccc": 1}}, split_dict)
+
+
+class RenderGraphTest(unittest.TestCase):
+    def test_render_graph_svg(self):
+        with mock.patch("clocdirtree.graph.execute_graphviz", return_value=SVG_OUTPUT) as execute_mock:
+            content = render_graph_svg(FakeGraph())
+        execute_mock.assert_called_once()
+        self.assertIn("-Tsvg", execute_mock.call_args[0][0])
+        ## XML prolog and doctype are not allowed inside HTML
+        self.assertTrue(content.startswith("<svg"))
+        self.assertNotIn("<?xml", content)
+        self.assertNotIn("<!DOCTYPE", content)
+        self.assertIn('<a xlink:href="index-aaa.html" xlink:title="node: aaa">', content)
+
+    def test_store_graph_to_html(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with mock.patch("clocdirtree.graph.execute_graphviz", side_effect=write_outputs) as execute_mock:
+                store_graph_to_html(FakeGraph(), temp_dir, "index-aaa")
+
+            ## image and map are written by single graphviz run
+            execute_mock.assert_called_once()
+            command = execute_mock.call_args[0][0]
+            self.assertIn("-Tpng", command)
+            self.assertIn("-Tcmapx", command)
+            self.assertEqual(["index-aaa.map", "index-aaa.png"], sorted(os.listdir(temp_dir)))
+            with open(os.path.join(temp_dir, "index-aaa.map"), "r", encoding="utf-8") as map_file:
+                self.assertEqual("-Tcmapx", map_file.read())
+
+    def test_store_graph_to_html_error(self):
+        def fail_graphviz(command, graph):
+            write_outputs(command, graph)
+            raise subprocess.CalledProcessError(1, command)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with mock.patch("clocdirtree.graph.execute_graphviz", side_effect=fail_graphviz):
+                with self.assertRaises(subprocess.CalledProcessError):
+                    store_graph_to_html(FakeGraph(), temp_dir, "index-aaa")
+            ## partially written files are removed
+            self.assertEqual([], os.listdir(temp_dir))
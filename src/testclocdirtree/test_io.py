@@ -0,0 +1,34 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+
+from clocdirtree.io import write_file, read_file, get_temp_path, commit_temp_files
+
+
+class IOTest(unittest.TestCase):
+    def test_write_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "page.html")
+            write_file(file_path, "content1")
+            write_file(file_path, "content2")
+            self.assertEqual("content2", read_file(file_path))
+            ## temporary file is renamed
+            self.assertEqual(["page.html"], os.listdir(temp_dir))
+
+    def test_commit_temp_files_failed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "page.png")
+            write_file(file_path, "content1")
+            temp_path = get_temp_path(file_path)
+            write_file(temp_path, "partial")
+            commit_temp_files([(temp_path, file_path)], success=False)
+            self.assertEqual("content1", read_file(file_path))
+            self.assertEqual(["page.png"], os.listdir(temp_dir))
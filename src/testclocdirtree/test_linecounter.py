@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+
+from clocdirtree.linecounter import count_lines, classify_file, count_file, count_files
+from clocdirtree.io import write_file
+
+
+class LineCounterTest(unittest.TestCase):
+    def test_classify_file(self):
+        self.assertEqual("Python", classify_file("/aaa/bbb.py"))
+        self.assertEqual("C/C++ Header", classify_file("/aaa/bbb.H"))
+        self.assertEqual("make", classify_file("/aaa/Makefile"))
+        self.assertEqual(None, classify_file("/aaa/bbb.unknown"))
+
+    def test_count_lines_c(self):
+        content = """\
+/* header
+ * comment
+ */
+
+int main() {  // line comment
+    /* inline */ return 0;
+
+    // comment
+}
+"""
+        counts = count_lines(content.splitlines(), "C")
+        self.assertEqual((2, 4, 3), counts)
+
+    def test_count_lines_python(self):
+        content = '''\
+#!/usr/bin/env python3
+"""Docstring."""
+
+import os
+
+
+def func():
+    """
+    Multiline docstring.
+    """
+    return os.getcwd()  # comment
+'''
+        counts = count_lines(content.splitlines(), "Python")
+        self.assertEqual((3, 5, 3), counts)
+
+    def test_count_file_shebang(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "script")
+            write_file(file_path, "#!/bin/bash\n\necho 'aaa'\n")
+            counts = count_file(file_path)
+        self.assertEqual(("Bourne Again Shell", 1, 1, 1), counts)
+
+    def test_count_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            py_path = os.path.join(temp_dir, "aaa.py")
+            write_file(py_path, "import os\n")
+            js_path = os.path.join(temp_dir, "bbb.js")
+            write_file(js_path, "var x = 1;\n")
+            empty_path = os.path.join(temp_dir, "ccc.py")
+            write_file(empty_path, "")
+            files_dict = count_files([py_path, js_path, empty_path], exclude_langs={"JavaScript"})
+        self.assertEqual({py_path: ("Python", 0, 0, 1)}, files_dict)
+
+    def test_count_files_pool_warning(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files_list = []
+            for index in range(80):
+                file_path = os.path.join(temp_dir, f"file{index}.py")
+                write_file(file_path, "import os\n")
+                files_list.append(file_path)
+            missing_path = os.path.join(temp_dir, "missing.py")
+            files_list.append(missing_path)
+            ## warning about unreadable file is logged by parent process
+            with self.assertLogs("clocdirtree.linecounter", level="WARNING") as logs:
+                files_dict = count_files(files_list, jobs=2)
+        self.assertEqual(80, len(files_dict))
+        self.assertNotIn(missing_path, files_dict)
+        self.assertEqual(1, len(logs.output))
+        self.assertIn(missing_path, logs.output[0])
@@ -0,0 +1,305 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+import argparse
+import subprocess  # nosec
+from unittest import mock
+
+from clocdirtree.main import generate_site, generate_page, get_render_settings, count_dirs, insert_default_tool
+from clocdirtree.clocparser import cloc_dirs, configure_cloc_policy
+from clocdirtree.clocresult import ClocResult
+from clocdirtree.checkpoint import Quarantine
+from clocdirtree.countcache import FileCountCache
+from clocdirtree.dirwalk import walk_tree
+from clocdirtree.excludefilter import ExcludeItemFilter
+from clocdirtree.io import write_file, read_file
+
+from benchclocdirtree.fakecloc import install_fake_cloc
+
+
+class InsertDefaultToolTest(unittest.TestCase):
+    def test_insert_default_tool(self):
+        tools_list = ["generate", "render"]
+        global_options = ["-h", "--help", "-la", "--logall"]
+        ## command line of versions without tools
+        argv = insert_default_tool(["-la", "--clocdir", "src", "--outdir", "out"], tools_list, global_options)
+        self.assertEqual(["-la", "generate", "--clocdir", "src", "--outdir", "out"], argv)
+        argv = insert_default_tool(["render", "--outdir", "out"], tools_list, global_options)
+        self.assertEqual(["render", "--outdir", "out"], argv)
+        self.assertEqual(["-h"], insert_default_tool(["-h"], tools_list, global_options))
+        self.assertEqual([], insert_default_tool([], tools_list, global_options))
+
+
+class GenerateSiteTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.env_backup = dict(os.environ)
+        bin_dir = install_fake_cloc(os.path.join(self.temp_dir.name, "bin"))
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+        configure_cloc_policy(retries=0)
+
+    def tearDown(self):
+        configure_cloc_policy()
+        os.environ.clear()
+        os.environ.update(self.env_backup)
+        self.temp_dir.cleanup()
+
+    def test_quarantined_file(self):
+        ## cloc fails on file deep in the tree
+        os.environ["FAKE_CLOC_FAIL"] = "bad.py"
+        root_dir = os.path.join(self.temp_dir.name, "tree")
+        deep_dir = os.path.join(root_dir, "dir0", "dir1")
+        os.makedirs(deep_dir)
+        os.makedirs(os.path.join(root_dir, "dir2"))
+        write_file(os.path.join(root_dir, "main.py"), "x = 1\n")
+        write_file(os.path.join(root_dir, "dir0", "aaa.py"), "x = 1\ny = 2\n")
+        write_file(os.path.join(deep_dir, "bad.py"), "x = 1\n")
+        write_file(os.path.join(deep_dir, "good.py"), "x = 1\ny = 2\nz = 3\n")
+        write_file(os.path.join(root_dir, "dir2", "bbb.py"), "x = 1\n")
+
+        out_dir = os.path.join(self.temp_dir.name, "out")
+        quarantine = Quarantine(os.path.join(out_dir, "quarantine.json"))
+        dirs_list = list(walk_tree(root_dir).keys())
+        results_dict = dict(cloc_dirs(dirs_list, jobs=2, quarantine=quarantine))
+
+        self.assertEqual([os.path.join(deep_dir, "bad.py")], list(quarantine.paths_dict.keys()))
+        self.assertEqual(7, results_dict[root_dir].code)
+        self.assertEqual(5, results_dict[os.path.join(root_dir, "dir0")].code)
+        self.assertEqual(3, results_dict[deep_dir].code)
+
+        render_settings = get_render_settings()
+        render_settings["layout"] = "pack"
+        generate_site(out_dir, root_dir, dirs_list, iter(results_dict.items()), render_settings=render_settings)
+        self.assertTrue(os.path.isfile(os.path.join(out_dir, "graphs", "index.html")))
+        self.assertTrue(os.path.isfile(os.path.join(out_dir, "graphs", "index-dir0-dir1.html")))
+        self.assertTrue(os.path.isfile(os.path.join(out_dir, "index.html")))
+
+    def test_remove_stale_pages(self):
+        root_dir = os.path.join(self.temp_dir.name, "tree")
+        os.makedirs(os.path.join(root_dir, "dir0", "dir1"))
+        os.makedirs(os.path.join(root_dir, "dir2"))
+        out_dir = os.path.join(self.temp_dir.name, "out")
+        render_settings = get_render_settings()
+        render_settings["layout"] = "pack"
+        render_settings["page_layout"] = "tree"
+        dirs_list = list(walk_tree(root_dir).keys())
+        results_iter = ((dir_path, ClocResult.from_lang_dict({"Python": [1, 0, 0, 1]})) for dir_path in dirs_list)
+        generate_site(out_dir, root_dir, dirs_list, results_iter, render_settings=render_settings)
+        graphs_dir = os.path.join(out_dir, "graphs")
+        self.assertTrue(os.path.isfile(os.path.join(graphs_dir, "index", "dir0", "dir1.html")))
+
+        ## directory removed from analyzed tree
+        dirs_list = [root_dir, os.path.join(root_dir, "dir2")]
+        results_iter = ((dir_path, ClocResult.from_lang_dict({"Python": [1, 0, 0, 1]})) for dir_path in dirs_list)
+        generate_site(out_dir, root_dir, dirs_list, results_iter, render_settings=render_settings)
+        self.assertFalse(os.path.exists(os.path.join(graphs_dir, "index", "dir0.html")))
+        self.assertFalse(os.path.exists(os.path.join(graphs_dir, "index", "dir0")))
+        self.assertTrue(os.path.isfile(os.path.join(graphs_dir, "index", "dir2.html")))
+        self.assertTrue(os.path.isfile(os.path.join(graphs_dir, "index.html")))
+
+    def test_pack_png_warning(self):
+        root_dir = os.path.join(self.temp_dir.name, "tree")
+        os.makedirs(os.path.join(root_dir, "dir0", "dir1"))
+        out_dir = os.path.join(self.temp_dir.name, "out")
+        render_settings = get_render_settings()
+        render_settings["layout"] = "pack"
+        dirs_list = list(walk_tree(root_dir).keys())
+        results_iter = ((dir_path, ClocResult.from_lang_dict({"Python": [1, 0, 0, 1]})) for dir_path in dirs_list)
+        with self.assertLogs("clocdirtree.main", level="WARNING") as logs:
+            generate_site(out_dir, root_dir, dirs_list, results_iter, render_settings=render_settings)
+        ## warning is logged once, not for every page
+        self.assertEqual(1, len(logs.output))
+        self.assertIn("pack layout produces SVG images", logs.output[0])
+        self.assertTrue(os.path.isfile(os.path.join(out_dir, "graphs", "index.svg")))
+
+    def test_no_root_page(self):
+        root_dir = os.path.join(self.temp_dir.name, "tree")
+        os.makedirs(os.path.join(root_dir, "dir0"))
+        out_dir = os.path.join(self.temp_dir.name, "out")
+        dirs_list = [root_dir, os.path.join(root_dir, "dir0")]
+        results_iter = ((dir_path, ClocResult()) for dir_path in dirs_list)
+        generate_site(out_dir, root_dir, dirs_list, results_iter)
+        ## redirect to not existing page is not written
+        self.assertFalse(os.path.exists(os.path.join(out_dir, "index.html")))
+
+
+class FakeGraph:
+    """Graph with minimal interface used by 'generate_page', nodes links are stored in 'links_dict'."""
+
+    def __init__(self, graph_dict):
+        self.graph_dict = graph_dict
+        self.name = None
+        self.links_dict = {}
+
+    def setName(self, name):  # pylint: disable=C0103
+        self.name = name
+
+    def empty(self):
+        return not self.graph_dict
+
+    def toString(self):  # pylint: disable=C0103
+        return "digraph G {}\n"
+
+
+def set_fake_links(graph, _local_dir, links_dict=None):
+    graph.links_dict = links_dict
+
+
+## emulate graphviz: SVG to standard output, other formats to files given after '-o'
+def fake_graphviz(command, graph):
+    nodes_content = ""
+    for name, link in graph.links_dict.items():
+        nodes_content += f'<g class="node"><a xlink:href="{link}" xlink:title="node: {name}"></a></g>\n'
+    if "-Tsvg" in command:
+        return f"""\
+<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN"
+ "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+{nodes_content}</svg>
+"""
+    for index, item in enumerate(command):
+        if item == "-o":
+            content = ""
+            if command[index - 1] == "-Tcmapx":
+                content = f'<map id="{graph.name}" name="{graph.name}">{nodes_content}</map>'
+            write_file(command[index + 1], content)
+    return ""
+
+
+class GeneratePageTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.patchers = [
+            mock.patch("clocdirtree.main.generate_graph", side_effect=FakeGraph),
+            mock.patch("clocdirtree.main.set_node_html_attribs", side_effect=set_fake_links),
+            mock.patch("clocdirtree.graph.execute_graphviz", side_effect=fake_graphviz),
+        ]
+        self.execute_mock = [patcher.start() for patcher in self.patchers][2]
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.temp_dir.cleanup()
+
+    def generate(self, image_format):
+        render_settings = get_render_settings()
+        render_settings["layout"] = "neato"
+        render_settings["image_format"] = image_format
+        generate_page("index", {"aaa": 10, "bbb": 30}, ClocResult(), self.temp_dir.name, render_settings)
+        return read_file(os.path.join(self.temp_dir.name, "index.html"))
+
+    def test_svg(self):
+        page_content = self.generate("svg")
+        ## graph is inlined into page, links of nodes are preserved
+        self.execute_mock.assert_called_once()
+        self.assertIn('<svg xmlns="http://www.w3.org/2000/svg"', page_content)
+        self.assertNotIn("<?xml", page_content)
+        self.assertNotIn("<!DOCTYPE svg", page_content)
+        self.assertIn('<a xlink:href="index-aaa.html" xlink:title="node: aaa">', page_content)
+        self.assertIn('<a xlink:href="index-bbb.html" xlink:title="node: bbb">', page_content)
+        self.assertEqual(["index.html"], os.listdir(self.temp_dir.name))
+
+    def test_png(self):
+        page_content = self.generate("png")
+        ## image and map are written by single graphviz run
+        self.execute_mock.assert_called_once()
+        command = self.execute_mock.call_args[0][0]
+        self.assertIn("-Tpng", command)
+        self.assertIn("-Tcmapx", command)
+        self.assertIn('<img src="index.png" alt="graph" usemap="#index">', page_content)
+        self.assertIn('<map id="index" name="index">', page_content)
+        self.assertIn('<a xlink:href="index-aaa.html"', page_content)
+        self.assertEqual(["index.html", "index.map", "index.png"], sorted(os.listdir(self.temp_dir.name)))
+
+
+def execute_git(repo_dir, args_list):
+    command = ["git", "-C", repo_dir, "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    command.extend(args_list)
+    output = subprocess.run(command, capture_output=True, check=True)  # nosec
+    return output.stdout.decode("utf-8").strip()
+
+
+class IncrementalCountTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.repo_dir = os.path.join(self.temp_dir.name, "repo")
+        os.makedirs(os.path.join(self.repo_dir, "vendor"))
+        os.makedirs(os.path.join(self.repo_dir, "build"))
+        os.makedirs(os.path.join(self.repo_dir, "node_modules", "ccc"))
+        write_file(os.path.join(self.repo_dir, ".gitignore"), "build/\nnode_modules/\n")
+        write_file(os.path.join(self.repo_dir, "aaa.py"), "x = 1\n")
+        write_file(os.path.join(self.repo_dir, "vendor", "bbb.py"), "x = 1\ny = 2\n")
+        write_file(os.path.join(self.repo_dir, "build", "out.py"), "x = 1\ny = 2\nz = 3\n")
+        write_file(os.path.join(self.repo_dir, "node_modules", "ccc", "ddd.js"), "var x = 1;\n")
+        execute_git(self.repo_dir, ["init", "-q"])
+        execute_git(self.repo_dir, ["add", "."])
+        execute_git(self.repo_dir, ["commit", "-q", "-m", "first"])
+        ## analyzed directory is current directory (paths of walked directories start with './')
+        self.prev_dir = os.getcwd()
+        os.chdir(self.repo_dir)
+
+    def tearDown(self):
+        os.chdir(self.prev_dir)
+        self.temp_dir.cleanup()
+
+    def count(self, since=None):
+        args = argparse.Namespace(
+            cache_dir=None,
+            use_cache=True,
+            since=since,
+            outdir=os.path.join(self.temp_dir.name, "out"),
+            engine="native",
+            include_lang=[],
+            exclude_lang=[],
+            jobs=1,
+            walk_jobs=1,
+        )
+        exclude_filter = ExcludeItemFilter(["*/vendor", "*/node_modules"])
+        dirs_list, results_iter, update_set = count_dirs(args, ".", exclude_filter, {})
+        results_dict = {os.path.normpath(dir_path): result for dir_path, result in results_iter}
+        self.assertEqual(len(dirs_list), len(results_dict))
+        return results_dict, update_set
+
+    def test_since(self):
+        results_dict, _ = self.count()
+        self.assertEqual(4, results_dict["."].code)
+        self.assertNotIn("vendor", results_dict)
+
+        ## change excluded file and file ignored by git
+        write_file(os.path.join("vendor", "bbb.py"), "x = 1\n")
+        write_file(os.path.join("build", "out.py"), "x = 1\ny = 2\nz = 3\nw = 4\n")
+        results_dict, update_set = self.count(since="")
+        self.assertNotIn("vendor", results_dict)
+        self.assertEqual(5, results_dict["."].code)
+        self.assertEqual(4, results_dict["build"].code)
+        self.assertEqual({"index", "index/build"}, update_set)
+
+    def test_since_ignored_excluded(self):
+        self.count()
+        ## files of excluded directories ignored by git are not validated against cache
+        with mock.patch.object(FileCountCache, "get_changed", autospec=True, side_effect=FileCountCache.get_changed) \
+                as get_changed:
+            results_dict, _ = self.count(since="")
+        checked_list = get_changed.call_args[0][1]
+        self.assertEqual([os.path.join("build", "out.py")], checked_list)
+        self.assertNotIn("node_modules", results_dict)
+        self.assertEqual(4, results_dict["."].code)
+
+    def test_since_revision(self):
+        self.count()
+        write_file("aaa.py", "x = 1\ny = 2\n")
+        execute_git(self.repo_dir, ["commit", "-q", "-a", "-m", "second"])
+        head_rev = execute_git(self.repo_dir, ["rev-parse", "HEAD"])
+
+        ## file changed between baseline and given revision is recounted
+        results_dict, _ = self.count(since=head_rev)
+        self.assertEqual(5, results_dict["."].code)
@@ -0,0 +1,70 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import posixpath
+
+from clocdirtree.pagelayout import PageLayout, encode_page_name, MAX_NAME_LENGTH
+
+
+class EncodePageNameTest(unittest.TestCase):
+    def test_encode(self):
+        self.assertEqual("index-a_b-c.txt", encode_page_name("index/a_b/c.txt"))
+        self.assertEqual("index-a~2db", encode_page_name("index/a-b"))
+        self.assertEqual("a~20b~7e", encode_page_name("a b~"))
+        self.assertEqual("~c5~bc", encode_page_name("\u017c"))
+        self.assertEqual("~2e.", encode_page_name(".."))
+
+    def test_collisions(self):
+        names_list = ["a-b/c", "a_b/c", "a/b/c", "a|b/c", "a/b-c", "a~2db/c", "a b/c"]
+        files_set = {encode_page_name(name) for name in names_list}
+        self.assertEqual(len(names_list), len(files_set))
+
+    def test_long(self):
+        name = "/".join(["directory"] * 100)
+        file_name = encode_page_name(name)
+        self.assertEqual(MAX_NAME_LENGTH, len(file_name))
+        self.assertEqual(file_name, encode_page_name(name))
+        self.assertNotEqual(file_name, encode_page_name(name + "x"))
+        self.assertIn("~~", file_name)
+
+
+class PageLayoutTest(unittest.TestCase):
+    def test_flat(self):
+        layout = PageLayout("flat")
+        self.assertEqual("index-a~2db-c", layout.get_page_path("index/a-b/c"))
+        self.assertEqual("index-a.html", layout.get_link("index", "index/a"))
+        self.assertEqual("index.html", layout.get_link("index/a/b", "index"))
+        self.assertEqual(os.path.join("out", "index-a"), layout.get_page_file("out", "index/a"))
+
+    def test_tree(self):
+        layout = PageLayout("tree")
+        self.assertEqual("index/a~2db/c", layout.get_page_path("index/a-b/c"))
+        self.assertEqual("index/a~2db/d", layout.get_page_path("index/a-b/d"))
+        self.assertEqual(os.path.join("out", "index", "a"), layout.get_page_file("out", "index/a"))
+        self.assertEqual("index/a.html", layout.get_link("index", "index/a"))
+        self.assertEqual("a/b.html", layout.get_link("index/a", "index/a/b"))
+        self.assertEqual("../a.html", layout.get_link("index/a/b", "index/a"))
+        self.assertEqual("../../index.html", layout.get_link("index/a/b", "index"))
+        self.assertEqual("b.html", layout.get_link("index/a/b", "index/a/b"))
+
+    def test_hash(self):
+        layout = PageLayout("hash")
+        page_path = layout.get_page_path("index/a")
+        shard, file_name = page_path.split("/")
+        self.assertEqual(2, len(shard))
+        self.assertEqual("index-a", file_name)
+        self.assertEqual(page_path, layout.get_page_path("index/a"))
+        ## link resolved against directory of source page points to target page
+        link = layout.get_link("index", "index/a")
+        index_dir = posixpath.dirname(layout.get_page_path("index"))
+        self.assertEqual(page_path + ".html", posixpath.normpath(posixpath.join(index_dir, link)))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, PageLayout, "unknown")
@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+
+from clocdirtree.pagemanifest import PageManifest, get_page_hash
+from clocdirtree.clocresult import ClocResult
+from clocdirtree.io import write_file
+
+
+class PageManifestTest(unittest.TestCase):
+    def test_get_page_hash(self):
+        result = ClocResult.from_lang_dict({"Python": [1, 0, 0, 10]})
+        page_hash = get_page_hash("index", {"aaa": 5, "bbb": 5}, result, {"engine": "neato"})
+        self.assertEqual(page_hash, get_page_hash("index", {"bbb": 5, "aaa": 5}, result, {"engine": "neato"}))
+        self.assertNotEqual(page_hash, get_page_hash("index", {"aaa": 5, "bbb": 6}, result, {"engine": "neato"}))
+        self.assertNotEqual(page_hash, get_page_hash("index", {"aaa": 5, "bbb": 5}, result, {"engine": "dot"}))
+
+    def test_is_changed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            page_path = os.path.join(temp_dir, "index.html")
+            manifest = PageManifest(temp_dir)
+            self.assertTrue(manifest.is_changed("index", "hash1", page_path))
+            write_file(page_path, "content")
+            manifest.save()
+
+            manifest = PageManifest(temp_dir)
+            self.assertFalse(manifest.is_changed("index", "hash1", page_path))
+            self.assertTrue(manifest.is_changed("index", "hash2", page_path))
+            os.remove(page_path)
+            manifest = PageManifest(temp_dir)
+            ## page file removed
+            self.assertTrue(manifest.is_changed("index", "hash1", page_path))
+            self.assertEqual(0, manifest.skipped)
+
+    def test_save_merge(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = PageManifest(temp_dir)
+            manifest.is_changed("index", "hash1", "")
+            manifest.is_changed("index/aaa", "hash2", "")
+            manifest.save()
+
+            manifest = PageManifest(temp_dir)
+            manifest.is_changed("index/aaa", "hash3", "")
+            manifest.save(merge=True)
+            self.assertEqual({"index": "hash1", "index/aaa": "hash3"}, PageManifest(temp_dir).stored_dict)
+
+            manifest = PageManifest(temp_dir)
+            manifest.is_changed("index", "hash1", "")
+            manifest.save()
+            self.assertEqual({"index": "hash1"}, PageManifest(temp_dir).stored_dict)
+
+    def test_get_stale_pages(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = PageManifest(temp_dir)
+            manifest.is_changed("index", "hash1", "")
+            manifest.is_changed("index/aaa", "hash2", "")
+            manifest.save()
+
+            manifest = PageManifest(temp_dir)
+            manifest.is_changed("index", "hash1", "")
+            self.assertEqual(["index/aaa"], manifest.get_stale_pages())
@@ -0,0 +1,48 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from clocdirtree.progress import ProgressTracker, track_progress, format_duration
+
+
+class ProgressTrackerTest(unittest.TestCase):
+    def test_state(self):
+        progress = ProgressTracker("counting", total=10, mode="none")
+        progress.add_pending(4)
+        progress.update(3)
+        state_dict = progress.get_state()
+        self.assertEqual(3, state_dict["done"])
+        self.assertEqual(1, state_dict["pending"])
+        self.assertEqual(10, state_dict["total"])
+        self.assertGreater(state_dict["rate"], 0)
+        self.assertIsNotNone(state_dict["eta"])
+        text = progress.format_state(state_dict)
+        self.assertTrue(text.startswith("counting: 3/10 (30.0%), 1 pending"), text)
+        self.assertIn("ETA", text)
+
+    def test_unknown_total(self):
+        progress = ProgressTracker("rendering", mode="none")
+        progress.update()
+        state_dict = progress.get_state()
+        self.assertIsNone(state_dict["eta"])
+        self.assertTrue(progress.format_state(state_dict).startswith("rendering: 1 done"))
+
+    def test_log_mode(self):
+        with self.assertLogs("clocdirtree.progress", level="INFO") as logs:
+            with ProgressTracker("rendering", mode="log", interval=0.01) as progress:
+                progress.update()
+        self.assertIn("rendering finished: 1 units", logs.output[-1])
+
+    def test_track_progress(self):
+        self.assertEqual([1, 2, 3], list(track_progress(iter([1, 2, 3]), "counting", total=3)))
+
+    def test_format_duration(self):
+        self.assertEqual("5s", format_duration(5.5))
+        self.assertEqual("2m05s", format_duration(125))
+        self.assertEqual("1h01m", format_duration(3660))
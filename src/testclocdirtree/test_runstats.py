@@ -0,0 +1,81 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+import json
+import pstats
+
+from clocdirtree.runstats import RunStats, REPORT_FILE_NAME, PROFILE_FILE_NAME, reset_run_stats
+from clocdirtree.taskpool import execute_bounded
+
+
+class RunStatsTest(unittest.TestCase):
+    def test_measure(self):
+        run_stats = RunStats(slowest_num=2)
+        for item in ["aaa", "bbb", "ccc"]:
+            with run_stats.measure("count", item):
+                pass
+        with run_stats.measure("walk"):
+            pass
+        run_stats.add("pages_written")
+        run_stats.add("pages_written", 2)
+
+        report_dict = run_stats.to_dict()
+        self.assertEqual(3, report_dict["stages"]["count"]["calls"])
+        self.assertEqual(1, report_dict["stages"]["walk"]["calls"])
+        self.assertEqual({"pages_written": 3}, report_dict["counters"])
+        slowest_list = report_dict["slowest"]["count"]
+        self.assertEqual(2, len(slowest_list))
+        self.assertGreaterEqual(slowest_list[0]["wall"], slowest_list[1]["wall"])
+        self.assertNotIn("walk", report_dict["slowest"])
+
+    def test_measure_error(self):
+        run_stats = RunStats()
+        with self.assertRaises(ValueError):
+            with run_stats.measure("count", "aaa"):
+                raise ValueError("error")
+        self.assertEqual(1, run_stats.to_dict()["stages"]["count"]["calls"])
+
+    def test_save_profile(self):
+        run_stats = RunStats()
+        run_stats.enable_profiling()
+        results_list = []
+        function = run_stats.profiled(results_list.append)
+        execute_bounded(function, [[1], [2], [3]], jobs=2)
+        self.assertEqual([1, 2, 3], sorted(results_list))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            run_stats.save(temp_dir)
+            with open(os.path.join(temp_dir, REPORT_FILE_NAME), "r", encoding="utf-8") as report_file:
+                report_dict = json.load(report_file)
+            self.assertIn("stages", report_dict)
+            profile_stats = pstats.Stats(os.path.join(temp_dir, PROFILE_FILE_NAME))
+            self.assertGreater(profile_stats.total_calls, 0)
+
+    def test_profile_workers(self):
+        ## pool wraps tasks using statistics of run
+        run_stats = reset_run_stats()
+        try:
+            run_stats.enable_profiling()
+            results_list = []
+
+            def profiled_task(value):
+                results_list.append(sum(range(value)))
+
+            execute_bounded(profiled_task, [[value] for value in range(100)], jobs=4)
+            self.assertEqual(100, len(results_list))
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                run_stats.save(temp_dir)
+                profile_stats = pstats.Stats(os.path.join(temp_dir, PROFILE_FILE_NAME))
+            functions_list = [function_key[2] for function_key in profile_stats.stats]
+            self.assertIn("profiled_task", functions_list)
+        finally:
+            reset_run_stats()
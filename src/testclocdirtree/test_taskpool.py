@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+import threading
+
+from clocdirtree.taskpool import execute_bounded, execute_prioritized
+
+
+class TaskPoolTest(unittest.TestCase):
+    def test_execute_bounded(self):
+        results_list = []
+        lock = threading.Lock()
+
+        def task(value):
+            with lock:
+                results_list.append(value * 2)
+
+        execute_bounded(task, ([item] for item in range(0, 100)), jobs=4)
+        self.assertEqual(list(range(0, 200, 2)), sorted(results_list))
+
+    def test_execute_bounded_queue(self):
+        consumed_list = []
+
+        def args_iter():
+            for item in range(0, 20):
+                consumed_list.append(item)
+                yield [item]
+
+        def task(_value):
+            ## at most 'queue_size' items (plus one waiting for free slot) can be taken from iterator
+            self.assertLessEqual(len(consumed_list), len(done_list) + 3)
+            done_list.append(1)
+
+        done_list = []
+        execute_bounded(task, args_iter(), jobs=1, queue_size=2)
+        self.assertEqual(20, len(done_list))
+
+    def test_execute_bounded_error(self):
+        def task(value):
+            if value == 3:
+                raise RuntimeError("task failed")
+
+        with self.assertRaises(RuntimeError):
+            execute_bounded(task, ([item] for item in range(0, 10)), jobs=2)
+
+    def test_execute_prioritized_order(self):
+        tasks_list = [("aaa", [1], 1), ("bbb", [2], 5), ("ccc", [3], 3)]
+        results_list = list(execute_prioritized(lambda value: value * 2, tasks_list, jobs=1))
+        self.assertEqual([("bbb", 4), ("ccc", 6), ("aaa", 2)], results_list)
+
+    def test_execute_prioritized_light_order(self):
+        tasks_list = [("aaa", [1], 1), ("bbb", [2], 5), ("ccc", [3], 3), ("ddd", [4], 10), ("eee", [5], 20)]
+        results_list = list(
+            execute_prioritized(lambda value: value, tasks_list, jobs=1, heavy_weight=10, keep_light_order=True)
+        )
+        self.assertEqual(["eee", "ddd", "aaa", "bbb", "ccc"], [item[0] for item in results_list])
+
+    def test_execute_prioritized_heavy(self):
+        lock = threading.Lock()
+        state = {"heavy": 0, "max_heavy": 0}
+
+        def task(is_heavy):
+            if is_heavy:
+                with lock:
+                    state["heavy"] += 1
+                    state["max_heavy"] = max(state["max_heavy"], state["heavy"])
+            threading.Event().wait(0.01)
+            if is_heavy:
+                with lock:
+                    state["heavy"] -= 1
+            return is_heavy
+
+        tasks_list = [(index, [index < 6], 100 if index < 6 else 1) for index in range(0, 12)]
+        results_dict = dict(execute_prioritized(task, tasks_list, jobs=4, heavy_jobs=2, heavy_weight=100))
+        self.assertEqual(12, len(results_dict))
+        self.assertEqual(2, state["max_heavy"])
+
+    def test_execute_prioritized_error(self):
+        def task(value):
+            if value == 3:
+                raise RuntimeError("task failed")
+            return value
+
+        tasks_list = [(index, [index], index) for index in range(0, 10)]
+        with self.assertRaises(RuntimeError):
+            list(execute_prioritized(task, tasks_list, jobs=2))
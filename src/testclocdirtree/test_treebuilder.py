@@ -0,0 +1,130 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from clocdirtree.treebuilder import TreeBuilder, iterate_tree_pages, build_tree, iterate_tree
+from clocdirtree.clocresult import ClocResult
+
+
+def make_result(code):
+    if code < 1:
+        return ClocResult()
+    return ClocResult.from_lang_dict({"Python": [1, 0, 0, code]})
+
+
+class TreeBuilderTest(unittest.TestCase):
+    def test_pages_parent_first(self):
+        dirs_list = ["/src", "/src/aaa", "/src/aaa/bbb", "/src/ccc"]
+        codes_dict = {"/src": 30, "/src/aaa": 20, "/src/aaa/bbb": 5, "/src/ccc": 10}
+        results_iter = ((dir_path, make_result(codes_dict[dir_path])) for dir_path in dirs_list)
+
+        pages_list = list(iterate_tree_pages("/src", dirs_list, results_iter))
+
+        pages_dict = {page[0]: page[1] for page in pages_list}
+        self.assertEqual(["index/aaa/bbb", "index/aaa", "index/ccc", "index"], [page[0] for page in pages_list])
+        self.assertEqual({"aaa": 20, "ccc": 10}, pages_dict["index"])
+        self.assertEqual({"bbb": 5}, pages_dict["index/aaa"])
+        self.assertEqual({}, pages_dict["index/ccc"])
+        self.assertEqual(30, pages_list[-1][2].code)
+
+    def test_release_subtree(self):
+        dirs_list = ["/src", "/src/aaa", "/src/aaa/bbb", "/src/ccc"]
+        builder = TreeBuilder("/src", dirs_list)
+
+        self.assertEqual([], builder.add("/src/aaa", make_result(20)))
+        pages_list = builder.add("/src/aaa/bbb", make_result(5))
+        self.assertEqual(["index/aaa/bbb", "index/aaa"], [page[0] for page in pages_list])
+        ## only code lines of completed subtree are kept in parent
+        self.assertEqual(["/src"], list(builder.nodes.keys()))
+        self.assertEqual({"/src": 2, "/src/ccc": 1}, builder.pending)
+        self.assertEqual({"aaa": 20}, builder.nodes["/src"].children)
+        self.assertFalse(builder.is_complete())
+
+        self.assertEqual([], builder.add("/src/ccc", make_result(0)))
+        pages_list = builder.add("/src", make_result(20))
+        self.assertEqual(["index"], [page[0] for page in pages_list])
+        self.assertEqual({"aaa": 20}, pages_list[0][1])
+        self.assertTrue(builder.is_complete())
+        self.assertEqual({}, builder.nodes)
+
+    def test_nodes_bound(self):
+        ## tree of depth 4 and fan-out 3
+        depth = 4
+        dirs_list = ["/src"]
+        level_list = ["/src"]
+        for _ in range(1, depth):
+            level_list = [f"{dir_path}/d{index}" for dir_path in level_list for index in range(0, 3)]
+            dirs_list.extend(level_list)
+        leaves_set = set(level_list)
+        size_dict = {}
+        for dir_path in dirs_list:
+            size_dict[dir_path] = len([item for item in dirs_list if (item + "/").startswith(dir_path + "/")])
+
+        ## the largest directories first - results of non-leaf directories are kept until subtrees complete
+        builder = TreeBuilder("/src", dirs_list)
+        max_nodes = 0
+        pages_num = 0
+        for dir_path in sorted(dirs_list, key=lambda item: size_dict[item], reverse=True):
+            pages_num += len(builder.add(dir_path, make_result(1)))
+            max_nodes = max(max_nodes, len(builder.nodes))
+            ## completed subtrees are released
+            self.assertTrue(leaves_set.isdisjoint(builder.nodes))
+        self.assertEqual(len(dirs_list) - len(leaves_set), max_nodes)
+        self.assertEqual(len(dirs_list), pages_num)
+        self.assertEqual({}, builder.nodes)
+        self.assertEqual({}, builder.pending)
+
+        ## subtree after subtree, children first - nodes are kept only for ancestors of current subtree
+        builder = TreeBuilder("/src", dirs_list)
+        max_nodes = 0
+        walk_list = sorted(dirs_list)
+        for dir_path in reversed(walk_list):
+            builder.add(dir_path, make_result(1))
+            max_nodes = max(max_nodes, len(builder.nodes))
+            self.assertLessEqual(sum(len(node.children or {}) for node in builder.nodes.values()), depth * 3)
+        self.assertLessEqual(max_nodes, depth)
+        self.assertTrue(builder.is_complete())
+
+        ## order of 'cloc_dirs': heavy directories first (the largest first), then children first
+        heavy_list = sorted([item for item in dirs_list if size_dict[item] >= 13], key=size_dict.get, reverse=True)
+        light_list = [item for item in reversed(walk_list) if size_dict[item] < 13]
+        builder = TreeBuilder("/src", dirs_list)
+        max_nodes = 0
+        for dir_path in heavy_list + light_list:
+            builder.add(dir_path, make_result(1))
+            max_nodes = max(max_nodes, len(builder.nodes))
+        self.assertEqual(4, len(heavy_list))
+        self.assertLessEqual(max_nodes, len(heavy_list) + depth)
+        self.assertTrue(builder.is_complete())
+
+    def test_build_tree(self):
+        data_dict = {"/aaa/bbb/ccc": 1, "/aaa/ddd": 2, "/aaa": 3, "/aaa/eee": 4}
+        top_node = build_tree(data_dict)
+
+        self.assertEqual([""], list(top_node.children.keys()))
+        aaa_node = top_node.children[""].children["aaa"]
+        self.assertEqual(3, aaa_node.value)
+        self.assertEqual(["bbb", "ddd", "eee"], list(aaa_node.children.keys()))
+        ccc_node = aaa_node.children["bbb"].children["ccc"]
+        self.assertEqual(1, ccc_node.value)
+        self.assertEqual(["", "aaa", "bbb", "ccc"], ccc_node.get_path_list())
+
+        nodes_list = [("/".join(node.get_path_list()), node.value) for node in iterate_tree(top_node)]
+        self.assertEqual(
+            [("", None), ("/aaa", 3), ("/aaa/bbb", None), ("/aaa/bbb/ccc", 1), ("/aaa/ddd", 2), ("/aaa/eee", 4)],
+            nodes_list,
+        )
+
+    def test_build_tree_deep(self):
+        ## deeper than recursion limit
+        path = "/".join(["d"] * 5000)
+        top_node = build_tree({path: 1})
+        nodes_list = list(iterate_tree(top_node))
+        self.assertEqual(5000, len(nodes_list))
+        self.assertEqual(1, nodes_list[-1].value)
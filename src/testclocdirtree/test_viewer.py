@@ -0,0 +1,123 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import re
+import shutil
+import unittest
+import tempfile
+import json
+import subprocess  # nosec
+
+from clocdirtree.viewer import ViewerWriter, generate_viewer, VIEWER_TEMPLATE
+from clocdirtree.clocresult import ClocResult
+from clocdirtree.io import read_file
+
+
+def read_chunk(data_dir, chunk_id):
+    content = read_file(os.path.join(data_dir, f"chunk-{chunk_id}.js"))
+    content = content.strip()
+    prefix = f"clocViewerChunk({json.dumps(chunk_id)},"
+    assert content.startswith(prefix)
+    return json.loads(content[len(prefix) : -2])
+
+
+class ViewerWriterTest(unittest.TestCase):
+    def test_single_chunk(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pages_list = [
+                ("index/aaa", {}, ClocResult.from_lang_dict({"Python": [1, 2, 3, 10]})),
+                ("index", {"aaa": 10}, ClocResult.from_lang_dict({"Python": [2, 2, 3, 15]})),
+            ]
+            generate_viewer(iter(pages_list), temp_dir, title="project")
+
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "index.html")))
+            data_dir = os.path.join(temp_dir, "viewer")
+            self.assertEqual(["chunk-root.js"], os.listdir(data_dir))
+            root_node = read_chunk(data_dir, "root")
+            self.assertEqual("project", root_node["n"])
+            self.assertEqual(15, root_node["c"])
+            self.assertEqual([["Python", 2, 2, 3, 15]], root_node["l"])
+            self.assertEqual([{"n": "aaa", "c": 10, "l": [["Python", 1, 2, 3, 10]]}], root_node["k"])
+
+    def test_split_chunks(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = ViewerWriter(temp_dir, chunk_size=3)
+            result = ClocResult.from_lang_dict({"Python": [1, 0, 0, 1]})
+            writer.add_page("index/aaa/x", {}, result)
+            writer.add_page("index/aaa/y", {}, result)
+            writer.add_page("index/aaa", {"x": 1, "y": 1}, result)
+            writer.add_page("index/bbb", {}, result)
+            writer.add_page("index", {"aaa": 3, "bbb": 1}, result)
+            writer.close()
+
+            data_dir = os.path.join(temp_dir, "viewer")
+            self.assertEqual(["chunk-0.js", "chunk-root.js"], sorted(os.listdir(data_dir)))
+            root_node = read_chunk(data_dir, "root")
+            self.assertEqual({"n": "aaa", "c": 1, "r": 0}, root_node["k"][0])
+            chunk_node = read_chunk(data_dir, 0)
+            self.assertEqual("aaa", chunk_node["n"])
+            self.assertEqual(["x", "y"], sorted(child["n"] for child in chunk_node["k"]))
+
+            ## stale chunks are removed
+            writer = ViewerWriter(temp_dir)
+            writer.close()
+            self.assertEqual(["chunk-root.js"], os.listdir(data_dir))
+
+
+## minimal DOM required to run script of viewer outside of browser
+DOM_STUB = """
+function Element() {
+    this.width = {"baseVal": {"value": 500}};
+    this.height = {"baseVal": {"value": 500}};
+}
+Element.prototype.setAttribute = function() {};
+Element.prototype.appendChild = function(child) { return child; };
+Element.prototype.addEventListener = function() {};
+var elements = {};
+var document = {
+    "head": new Element(),
+    "createElement": function() { return new Element(); },
+    "createElementNS": function() { return new Element(); },
+    "createTextNode": function() { return new Element(); },
+    "getElementById": function(id) { return elements[id] || (elements[id] = new Element()); },
+    "querySelectorAll": function() { return []; }
+};
+"""
+
+
+@unittest.skipUnless(shutil.which("node"), "node not found")
+class ViewerScriptTest(unittest.TestCase):
+    def run_script(self, test_script):
+        viewer_script = re.search(r"<script>(.*)</script>", VIEWER_TEMPLATE, re.DOTALL).group(1)
+        script = DOM_STUB + viewer_script + test_script
+        result = subprocess.run(["node", "-e", script], capture_output=True, check=True)  # nosec
+        return result.stdout.decode("utf-8").splitlines()
+
+    def test_enter_node(self):
+        ## node three rings out in sunburst, its subtree is stored in separate chunk
+        test_script = """
+        function printPath() {
+            console.log(currentPath.map(function(node) { return node.n; }).join("/"));
+        }
+        viewType = "sunburst";
+        clocViewerChunk("root", {"n": "root", "c": 10, "k": [
+            {"n": "aaa", "c": 10, "k": [{"n": "bbb", "c": 10, "k": [{"n": "ccc", "c": 10, "r": 0}]}]}
+        ]});
+        clocViewerChunk(0, {"n": "ccc", "c": 10, "l": [], "k": [{"n": "ddd", "c": 10}]});
+        printPath();
+        var cccNode = rootNode.k[0].k[0].k[0];
+        enterNode(cccNode);
+        printPath();
+        enterNode(cccNode.k[0]);
+        printPath();
+        enterNode(rootNode.k[0]);
+        printPath();
+        """
+        paths_list = self.run_script(test_script)
+        self.assertEqual(["root", "root/aaa/bbb/ccc", "root/aaa/bbb/ccc/ddd", "root/aaa"], paths_list)